@@ -0,0 +1,273 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+import pygame
+
+ATLAS_MAGIC = b"SCAT"
+ATLAS_VERSION = 2
+ATLAS_WIDTH = 1024
+ATLAS_HEADER = "<4sII"
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def file_stat(path):
+    """[modification time in ns, size] of a file, to notice changes without reading it."""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def entry_key(path, size):
+    return f"{os.path.normpath(path).replace(os.sep, '/')}|{size[0]}x{size[1]}"
+
+def is_opaque(surface):
+    """True if every pixel is fully opaque, so the texture can drop its alpha channel."""
+    w, h = surface.get_size()
+    return pygame.mask.from_surface(surface, 254).count() == w * h
+
+def to_display_format(surface, opaque):
+    """Convert to the display pixel format so blits skip per-pixel format conversion.
+    Opaque textures lose their alpha channel entirely, which makes them cheaper still."""
+    return surface.convert() if opaque else surface.convert_alpha()
+
+def surface_bytes(surface):
+    w, h = surface.get_size()
+    return w * h * surface.get_bytesize()
+
+def pack_shelves(sizes, width=ATLAS_WIDTH):
+    """Shelf-pack rectangles. sizes: {key: (w, h)} -> ({key: (x, y)}, total_height)"""
+    positions = {}
+    x = y = shelf_height = 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda kv: (-kv[1][1], kv[0])):
+        if x + w > width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        positions[key] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+class Atlas:
+    """Pre-scaled texture atlas cached on disk and keyed by source file hashes.
+
+    The cache file is memory-mapped and only the rows of a texture that is actually
+    requested are read, so a warm start costs one index parse and no PNG decoding.
+    Sources are checked by modification time and size; only a source whose stat
+    changed is read and hashed, and it's reused if the hash still matches.
+    Textures that are missing or whose source changed are decoded and scaled normally;
+    call save() (e.g. on exit) to fold them into the cache for the next start. Their
+    pixels aren't kept until then (that's the TextureRegistry's budget), save() decodes
+    them again.
+    """
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.file = None
+        self.mm = None
+        self.index = {}
+        self.width = 0
+        self.data_offset = 0
+        self.hashes = {}   # {key: source hash} computed this session
+        self.stats = {}    # {key: source file_stat()} checked this session
+        self.restamped = set()  # keys whose source was touched but not changed, their stat is stale in the cache
+        self.pending = {}  # {key: (path, size, bounds, opaque)} decoded from source, not in the cache yet
+        self.open_cache()
+
+    def open_cache(self):
+        try:
+            self.file = open(self.cache_path, "rb")
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_len = struct.unpack_from(ATLAS_HEADER, self.mm, 0)
+            if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+                raise ValueError("stale atlas cache")
+            offset = struct.calcsize(ATLAS_HEADER)
+            index = json.loads(self.mm[offset:offset + index_len].decode())
+            self.width = index["size"][0]
+            self.index = index["entries"]
+            self.data_offset = offset + index_len
+        except (OSError, ValueError, KeyError, struct.error):
+            self.close_cache()
+
+    def close_cache(self):
+        if self.mm is not None:
+            self.mm.close()
+        if self.file is not None:
+            self.file.close()
+        self.mm = self.file = None
+        self.index = {}
+
+    def source_hash(self, key, path):
+        if key not in self.hashes:
+            self.hashes[key] = file_hash(path)
+        return self.hashes[key]
+
+    def source_stat(self, key, path):
+        if key not in self.stats:
+            self.stats[key] = file_stat(path)
+        return self.stats[key]
+
+    def cached_entry(self, path, size):
+        """Index entry for a texture if the cache holds it and its source is unchanged."""
+        key = entry_key(path, size)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        if entry["stat"] == self.source_stat(key, path):
+            return entry
+        if entry["hash"] != self.source_hash(key, path):
+            return None
+        self.restamped.add(key)
+        return entry
+
+    def read_entry(self, entry):
+        """Read a texture's pixels out of the mapped sheet, row by row."""
+        x, y, w, h = entry["rect"]
+        stride = self.width * 4
+        start = self.data_offset + y * stride + x * 4
+        rows = b"".join(self.mm[start + r * stride:start + r * stride + w * 4] for r in range(h))
+        return pygame.image.frombytes(rows, (w, h), "RGBA")
+
+    def decode(self, path, size):
+        return pygame.transform.scale(pygame.image.load(path), size)
+
+    def load(self, path, size):
+        """Return a new display-format surface of the texture at `path` scaled to `size`."""
+        key = entry_key(path, size)
+        if key in self.pending:
+            return to_display_format(self.decode(path, size), self.pending[key][3])
+        entry = self.cached_entry(path, size)
+        if entry is not None:
+            return to_display_format(self.read_entry(entry), entry["opaque"])
+        scaled = self.decode(path, size)
+        opaque = is_opaque(scaled)
+        self.source_hash(key, path)
+        self.source_stat(key, path)
+        self.pending[key] = (path, size, tuple(first_mask_bounds(scaled)), opaque)
+        return to_display_format(scaled, opaque)
+
+    def mask_bounds(self, path, size):
+        """Bounding rect of the first opaque region of a texture (same as mask.get_bounding_rects()[0])."""
+        entry = self.cached_entry(path, size)
+        if entry is not None:
+            return pygame.Rect(entry["bounds"])
+        key = entry_key(path, size)
+        if key not in self.pending:
+            self.load(path, size)
+        return pygame.Rect(self.pending[key][2])
+
+    def save(self):
+        """Repack the cached textures plus any newly decoded ones and rewrite the cache."""
+        if not self.pending and not self.restamped:
+            return
+        textures = {}
+        for key, entry in self.index.items():
+            if key not in self.pending:
+                stat = self.stats[key] if key in self.restamped else entry["stat"]
+                textures[key] = (self.read_entry(entry), entry["hash"], stat, entry["bounds"], entry["opaque"])
+        for key, (path, size, bounds, opaque) in self.pending.items():
+            textures[key] = (self.decode(path, size), self.hashes[key], self.stats[key], list(bounds), opaque)
+
+        positions, height = pack_shelves({key: t[0].get_size() for key, t in textures.items()})
+        sheet = pygame.Surface((ATLAS_WIDTH, max(1, height)), pygame.SRCALPHA)
+        entries = {}
+        for key, (surface, source_hash, stat, bounds, opaque) in textures.items():
+            x, y = positions[key]
+            # BLEND_RGBA_MAX onto a cleared sheet copies pixels exactly, alpha included
+            sheet.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+            entries[key] = {
+                "hash": source_hash,
+                "stat": stat,
+                "rect": [x, y, *surface.get_size()],
+                "bounds": bounds,
+                "opaque": opaque,
+            }
+        index = json.dumps({"size": list(sheet.get_size()), "entries": entries}).encode()
+
+        # The mapping has to be released before the file can be replaced (Windows)
+        self.close_cache()
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack(ATLAS_HEADER, ATLAS_MAGIC, ATLAS_VERSION, len(index)))
+            f.write(index)
+            f.write(pygame.image.tobytes(sheet, "RGBA"))
+        os.replace(tmp_path, self.cache_path)
+        self.pending.clear()
+        self.restamped.clear()
+        self.open_cache()
+
+class TextureRegistry:
+    """Decodes textures the first time they are drawn and keeps them in an LRU cache.
+
+    Once the decoded textures exceed `budget_bytes`, the least recently drawn ones are
+    dropped and will be decoded again from the atlas if they come back on screen.
+    """
+    def __init__(self, atlas, budget_bytes):
+        self.atlas = atlas
+        self.budget_bytes = budget_bytes
+        self.cache = OrderedDict()  # {(path, size, alpha): surface}, least recently used first
+        self.used_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, path, size, alpha=None):
+        key = (path, size, alpha)
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+            return surface
+        surface = self.atlas.load(path, size)
+        if alpha is not None:
+            surface.set_alpha(alpha)
+        self.cache[key] = surface
+        self.used_bytes += surface_bytes(surface)
+        self.loads += 1
+        self.evict()
+        return surface
+
+    def evict(self):
+        while self.used_bytes > self.budget_bytes and len(self.cache) > 1:
+            _, surface = self.cache.popitem(last=False)
+            self.used_bytes -= surface_bytes(surface)
+            self.evictions += 1
+
+    def group(self, files, size, alpha=None):
+        return TextureGroup(self, files, size, alpha)
+
+class TextureGroup:
+    """Dict (or list) of texture files that reads like a dict of surfaces.
+    Surfaces are fetched from the registry on access."""
+    def __init__(self, registry, files, size, alpha=None):
+        self.registry = registry
+        self.files = files
+        self.size = size
+        self.alpha = alpha
+
+    def __getitem__(self, key):
+        return self.registry.get(self.files[key], self.size, self.alpha)
+
+    def get(self, key, default=None):
+        if key not in self.files:
+            return default
+        return self[key]
+
+    def __contains__(self, key):
+        return key in self.files
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def keys(self):
+        return self.files.keys()
+
+def first_mask_bounds(surface):
+    rects = pygame.mask.from_surface(surface).get_bounding_rects()
+    if not rects:
+        return pygame.Rect(0, 0, *surface.get_size())
+    return rects[0]
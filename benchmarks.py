@@ -0,0 +1,399 @@
+import argparse
+import collections
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+# Benchmarks run without a visible window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import assets
+import noise
+
+SCREEN_SIZE = (1280, 720)
+SEED = 1234
+# Results are compared against the baseline with this much slack before they count as a regression
+DEFAULT_TOLERANCE = 0.15
+# Timings depend on the machine, so the baseline is kept per checkout: the first run
+# writes it, later runs compare against it and add benchmarks it doesn't have yet
+DEFAULT_BASELINE = os.path.join(".cache", "benchmark_baseline.json")
+MIN_ANIMAL_STEPS = 3  # steps timed per herd size even when one step is slow, the fastest counts
+TEXTURE_DIRS = {
+    "tiles": ("tiles", 100),
+    "plants": ("plants", 80),
+    "items": ("resources", 40),
+    "animals": ("animals", 80),
+    "structures": ("structures", 80),
+}
+
+def load_textures(convert):
+    """Load every texture the game uses, scaled like main.py does, optionally in display format."""
+    textures = []
+    for path, size in TEXTURE_DIRS.values():
+        files = sorted(glob.glob(os.path.join(path, "*.png")) + glob.glob(os.path.join(path, "*", "*.png")))
+        for file in files:
+            if os.sep + "unused" + os.sep in file:
+                continue
+            surface = pygame.transform.scale(pygame.image.load(file), (size, size))
+            if convert:
+                surface = assets.to_display_format(surface, assets.is_opaque(surface))
+            textures.append(surface)
+    return textures
+
+def time_blits(target, textures, blits):
+    """Blit textures round-robin onto target, return blits per second."""
+    w, h = target.get_size()
+    positions = [((i * 37) % (w - 100), (i * 53) % (h - 100)) for i in range(len(textures))]
+    count = len(textures)
+    start = time.perf_counter()
+    for i in range(blits):
+        j = i % count
+        target.blit(textures[j], positions[j])
+    return blits / (time.perf_counter() - start)
+
+def bench_blit(blits=50000):
+    """Blit throughput of unconverted (as loaded) vs display-format textures."""
+    target = pygame.display.get_surface()
+    raw = time_blits(target, load_textures(convert=False), blits)
+    converted = time_blits(target, load_textures(convert=True), blits)
+    return {
+        "raw_blits_per_sec": raw,
+        "converted_blits_per_sec": converted,
+        "speedup": converted / raw,
+    }
+
+def best_time(fn, repeats=5):
+    """Fastest of `repeats` runs of fn(), in seconds."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+_game = None
+
+def load_game():
+    """Import main.py (which sets up a world on import) with fixed seeds."""
+    global _game
+    if _game is None:
+        random.seed(SEED)
+        import main
+        _game = main
+    return _game
+
+def reset_world(game):
+    """Drop every chunk and entity so each benchmark starts from the same empty world."""
+    game.WORLD.clear()
+    game.NOISE_FIELDS.clear()
+    game.WORLD_TILE_ITEMS.clear()
+    game.REGIONS.clear()
+    for finder in game.PATHFINDERS.values():
+        finder.clear()
+    game.PLANTED_TILE.clear()
+    del game.items[:]
+    del game.plants[:]
+    del game.animals[:]
+    del game.structures[:]
+    random.seed(SEED)
+
+def load_area(game, chunks=8):
+    """Generate a square of chunks x chunks centred on the origin."""
+    half = chunks // 2
+    for cy in range(-half, chunks - half):
+        for cx in range(-half, chunks - half):
+            game.get_chunk(cx, cy)
+    return half * game.CHUNK_SIZE * game.TILE_SIZE
+
+def bench_noise(points=20000):
+    """Noise function calls per second over a fixed grid of sample points."""
+    functions = {
+        "perlin": noise.make_perlin(SEED),
+        "simplex": noise.make_simplex(SEED),
+        "fractal": noise.make_fractal(SEED),
+        "fractal_mask": noise.make_fractal_mask(SEED),
+        "ore_patches": noise.make_ore_patches(SEED, [0.05, 0.1], [0.4, 0.5]),
+        "random_ores": noise.make_random_ores(SEED, [0.1, 0.05]),
+    }
+    side = int(points ** 0.5)
+    coords = [(x * 0.37, y * 0.37) for y in range(side) for x in range(side)]
+    result = {}
+    for name, fn in functions.items():
+        def run():
+            for x, y in coords:
+                fn(x, y)
+        result[f"{name}_calls_per_sec"] = len(coords) / best_time(run)
+    return result
+
+def bench_generate_chunk(chunks=64):
+    """Chunks generated per second, starting from an empty world each time,
+    regenerated per second (with their noise fields still cached) and reloaded per
+    second (unloaded to their region files and read back)."""
+    game = load_game()
+    side = int(chunks ** 0.5)
+
+    def generate():
+        for cy in range(side):
+            for cx in range(side):
+                game.generate_chunk(cx + 100, cy + 100)
+
+    def run():
+        reset_world(game)
+        generate()
+
+    def regenerate():
+        game.WORLD.clear()
+        generate()
+    def reload():
+        for cy in range(side):
+            for cx in range(side):
+                game.unload_chunk(cx + 100, cy + 100)
+        for cy in range(side):
+            for cx in range(side):
+                game.WORLD.chunk(cx + 100, cy + 100)
+    result = {"chunks_per_sec": side * side / best_time(run),
+              "regen_chunks_per_sec": side * side / best_time(regenerate)}
+    for cy in range(side):
+        for cx in range(side):
+            game.WORLD.chunk(cx + 100, cy + 100)
+    result["reload_chunks_per_sec"] = side * side / best_time(reload)
+    return result
+
+def spawn_herd(game, count):
+    """Load the benchmark area and spread `count` animals of every type over it."""
+    reset_world(game)
+    extent = load_area(game)
+    types = sorted(game.ANIMAL_PROPS)
+    del game.animals[:]
+    game.animals.extend(
+        game.spawn_animal(types[i % len(types)],
+                          random.uniform(-extent, extent), random.uniform(-extent, extent))
+        for i in range(count))
+
+def bench_update_animals(counts=(100, 1000), animal_steps=10000, dt=1 / 60):
+    """Milliseconds of the fastest update_animals(dt) step with 100/1k animals (10k for
+    update_animals_10k) on generated land. Bigger herds run fewer steps, about animal_steps animal updates
+    per count but never fewer than MIN_ANIMAL_STEPS."""
+    game = load_game()
+    result = {}
+    for count in counts:
+        spawn_herd(game, count)
+        steps = max(MIN_ANIMAL_STEPS, animal_steps // count)
+        result[f"update_animals_{count}_ms"] = best_time(lambda: game.update_animals(dt), repeats=steps) * 1000
+    return result
+
+def bench_sharding(count=1000, worker_counts=(2, 4), steps=MIN_ANIMAL_STEPS, dt=1 / 60):
+    """CPU milliseconds of the fastest step_world(dt) step with `count` animals on generated
+    land, in this process and sharded over 2/4 worker processes. A sharded step counts this
+    process's CPU time plus the busiest worker's: its time when every process has a core,
+    however many this machine has. sharded_N_total_ms adds up every process, its cost on one core."""
+    game = load_game()
+    keys = collections.defaultdict(bool)
+
+    def step():
+        start = time.process_time()
+        game.step_world(dt, keys)
+        elapsed = time.process_time() - start
+        if game.SHARDS is None:
+            return elapsed, elapsed
+        return elapsed + max(game.SHARDS.step_cpu), elapsed + sum(game.SHARDS.step_cpu)
+
+    spawn_herd(game, count)
+    single = min(step()[0] for _ in range(steps))
+    result = {"single_ms": single * 1000}
+    for workers in worker_counts:
+        spawn_herd(game, count)
+        game.start_sharding(workers)
+        try:
+            step()  # hands every entity to the workers
+            times = [step() for _ in range(steps)]
+        finally:
+            game.stop_sharding()
+        sharded = min(core for core, _ in times)
+        result[f"sharded_{workers}_ms"] = sharded * 1000
+        result[f"sharded_{workers}_total_ms"] = min(total for _, total in times) * 1000
+        result[f"sharded_{workers}_speedup"] = single / sharded
+    return result
+
+def bench_pathfinding(searches=200):
+    """find_path() and flow field build times between random walkable tiles of generated land."""
+    game = load_game()
+    reset_world(game)
+    load_area(game)
+    finder = next(iter(game.PATHFINDERS.values()))
+    extent = 4 * game.CHUNK_SIZE
+    walkable = [(x, y) for y in range(-extent, extent) for x in range(-extent, extent) if finder.walkable(x, y)]
+    pairs = [(random.choice(walkable), random.choice(walkable)) for _ in range(searches)]
+    goals = [goal for _, goal in pairs[:20]]
+
+    def run_paths():
+        for start, goal in pairs:
+            finder.find_path(start, goal)
+
+    def run_flow():
+        finder.flow_fields.clear()
+        for goal in goals:
+            finder.flow_field(goal)
+    return {
+        "find_path_ms": best_time(run_paths, repeats=3) / searches * 1000,
+        "flow_field_ms": best_time(run_flow, repeats=3) / len(goals) * 1000,
+    }
+
+def bench_quadtree(items=5000, queries=2000):
+    """rebuild_quadtree() time and screen-sized Quadtree.query_range() throughput."""
+    game = load_game()
+    reset_world(game)
+    extent = 5 * game.CHUNK_SIZE * game.TILE_SIZE
+    types = sorted(game.ITEM_IMAGE_FILES)
+    game.items.extend(
+        game.make_item(types[i % len(types)], random.uniform(-extent, extent), random.uniform(-extent, extent))
+        for i in range(items))
+    rebuild = best_time(game.rebuild_quadtree)
+    rects = [pygame.Rect(random.uniform(-extent, extent), random.uniform(-extent, extent), *SCREEN_SIZE)
+             for _ in range(queries)]
+
+    def run():
+        for rect in rects:
+            game.QT_ROOT.query_range(rect)
+    return {
+        f"rebuild_quadtree_{items}_ms": rebuild * 1000,
+        "query_range_per_sec": queries / best_time(run),
+    }
+
+def bench_draw(frames=60, lights=8):
+    """draw_world and draw_lighting frames per second, drawn to an offscreen surface."""
+    game = load_game()
+    reset_world(game)
+    extent = load_area(game)
+    cameras = [(-extent + i * (2 * extent - SCREEN_SIZE[0]) / frames, -SCREEN_SIZE[1] // 2) for i in range(frames)]
+    for i in range(lights):
+        game.structures.append(game.get_structure("fire_place", i * 150 - lights * 75, 0))
+    game.update_structure_lighting()
+
+    window = game.WIN
+    game.WIN = pygame.Surface((game.WIDTH, game.HEIGHT))
+    try:
+        for camera in cameras:
+            # Warm up: texture decoding is not what's measured
+            game.draw_world(*camera)
+
+        def run_world():
+            for camera in cameras:
+                game.draw_world(*camera)
+
+        def run_lighting():
+            for camera in cameras:
+                game.draw_lighting(*camera)
+        world = best_time(run_world)
+        lighting = best_time(run_lighting)
+    finally:
+        game.WIN = window
+    return {
+        "draw_world_frames_per_sec": frames / world,
+        "draw_lighting_frames_per_sec": frames / lighting,
+    }
+
+BENCHMARKS = {
+    "blit": bench_blit,
+    "noise": bench_noise,
+    "generate_chunk": bench_generate_chunk,
+    "update_animals": bench_update_animals,
+    "sharding": bench_sharding,
+    "pathfinding": bench_pathfinding,
+    "quadtree": bench_quadtree,
+    "draw": bench_draw,
+}
+# Only run when named: these take minutes
+SLOW_BENCHMARKS = {
+    "update_animals_10k": lambda: bench_update_animals(counts=(10000,)),
+}
+
+def lower_is_better(metric):
+    return metric.endswith("_ms")
+
+def compare(results, baseline, tolerance):
+    """Compare results against baseline results: {"name.metric": {...}} for every shared metric."""
+    comparison = {}
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if not base:
+                continue
+            # Positive change means slower
+            change = (value - base) / base if lower_is_better(metric) else (base - value) / base
+            comparison[f"{name}.{metric}"] = {
+                "baseline": base,
+                "value": value,
+                "slowdown": change,
+                "regression": change > tolerance,
+            }
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description="Sciencervival performance benchmarks")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS),
+                        help=f"benchmarks to run (default: all but {', '.join(SLOW_BENCHMARKS)})")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON (usable as a --compare baseline)")
+    parser.add_argument("--compare", metavar="PATH", default=DEFAULT_BASELINE,
+                        help="JSON results of an earlier run to check for regressions; written from this run "
+                             f"if it doesn't exist, and given benchmarks it lacks (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="replace the --compare results of the benchmarks run with this run's, "
+                             "e.g. after an intended change")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown allowed before a result counts as a regression")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+    results = {}
+    for name in args.names:
+        random.seed(SEED)
+        results[name] = (BENCHMARKS.get(name) or SLOW_BENCHMARKS[name])()
+        print(name)
+        for key, value in results[name].items():
+            print(f"  {key}: {value:.2f}")
+    if _game is not None:
+        # Like the game on exit, so the next run starts with a warm texture cache
+        _game.ATLAS.save()
+    pygame.quit()
+
+    report = {"seed": SEED, "results": results}
+    regressions = []
+    baseline = {}
+    if os.path.exists(args.compare):
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    if baseline and not args.update_baseline:
+        report["comparison"] = compare(results, baseline, args.tolerance)
+        print(f"compared to {args.compare}")
+        for key, entry in report["comparison"].items():
+            status = "REGRESSION" if entry["regression"] else "ok"
+            print(f"  {key}: {entry['baseline']:.2f} -> {entry['value']:.2f} ({-entry['slowdown']:+.1%}) {status}")
+            if entry["regression"]:
+                regressions.append(key)
+    if args.update_baseline:
+        new = results
+    else:
+        new = {name: metrics for name, metrics in results.items() if name not in baseline}
+    if new:
+        baseline.update(new)
+        os.makedirs(os.path.dirname(args.compare) or ".", exist_ok=True)
+        with open(args.compare, "w") as f:
+            json.dump({"seed": SEED, "results": baseline}, f, indent=2, sort_keys=True)
+        print(f"baseline for {', '.join(new)} saved to {args.compare}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if regressions:
+        print("regressions: " + ", ".join(regressions))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
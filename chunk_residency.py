@@ -0,0 +1,72 @@
+from collections import deque
+
+import world_events
+
+CHURN_WINDOW = 60  # seconds covered by the load/eviction counters
+
+class ChunkResidency:
+    """Decides which chunks stay in memory, with hysteresis so chunks near the player
+    don't get loaded and dropped over and over.
+
+    Chunks within load_radius of the player chunk are loaded ahead of time. A chunk
+    is only unloaded once it has stayed beyond unload_radius for grace seconds, or
+    earlier if more than max_chunks are loaded, oldest first, but never one inside
+    load_radius. Radii are in chunks, measured as max(|dx|, |dy|).
+    """
+    def __init__(self, world, bus, unload, load_radius=2, unload_radius=4, grace=10.0, max_chunks=150):
+        self.world = world
+        self.unload = unload  # unload(chunk_x, chunk_y): drop and save a chunk
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius
+        self.grace = grace
+        self.max_chunks = max_chunks
+        self.last_near = {}  # {(chunk_x, chunk_y): last time it was within unload_radius}
+        self.loads = deque()  # times chunks were loaded (generated or read back), over the last CHURN_WINDOW
+        self.evictions = deque()
+        self.now = 0.0
+        bus.subscribe(world_events.CHUNK_LOADED, self.on_loaded)
+
+    def on_loaded(self, chunk):
+        # Chunks also get loaded outside update(), e.g. when drawn or written to
+        self.last_near[chunk] = self.now
+        self.loads.append(self.now)
+
+    def update(self, player_cx, player_cy, now):
+        """Load the chunks around the player and unload the ones that have been far long enough."""
+        self.now = now
+        radius = self.load_radius
+        for cy in range(player_cy - radius, player_cy + radius + 1):
+            for cx in range(player_cx - radius, player_cx + radius + 1):
+                self.world.chunk(cx, cy)
+
+        far = []
+        for chunk in tuple(self.world.chunks):
+            distance = max(abs(chunk[0] - player_cx), abs(chunk[1] - player_cy))
+            if distance <= self.unload_radius:
+                self.last_near[chunk] = now
+            elif now - self.last_near.get(chunk, now) > self.grace:
+                self.evict(chunk)
+                continue
+            if distance > self.load_radius:
+                far.append(chunk)
+
+        excess = len(self.world.chunks) - self.max_chunks
+        if excess > 0:
+            far.sort(key=lambda chunk: self.last_near.get(chunk, now))
+            for chunk in far[:excess]:
+                self.evict(chunk)
+        self.trim_counters()
+
+    def evict(self, chunk):
+        self.last_near.pop(chunk, None)
+        self.evictions.append(self.now)
+        self.unload(*chunk)
+
+    def trim_counters(self):
+        for times in (self.loads, self.evictions):
+            while times and self.now - times[0] > CHURN_WINDOW:
+                times.popleft()
+
+    def churn(self):
+        """(loads, evictions) over the last minute."""
+        return len(self.loads), len(self.evictions)
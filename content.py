@@ -0,0 +1,317 @@
+import hashlib
+import json
+import os
+import pickle
+
+CONTENT_PATH = "content"
+CONTENT_FILES = ("items", "plants", "animals", "structures", "recipes")
+CONTENT_VERSION = 4  # bump when the compiled form changes
+
+ITEM_FIELDS = {"image", "max_dur", "convert", "convert_label", "food", "food_converts",
+               "consume", "tile_interaction", "mining"}
+PLANT_FIELDS = {"stages", "only_tiles", "can_collide", "images"}
+ANIMAL_FIELDS = {"textures", "max_health", "max_hunger", "heal_speed", "heal_threshold",
+                 "hunger_decay", "move_speed"}
+STRUCTURE_FIELDS = {"image", "item_interactions", "stats", "specials"}
+
+class AnimalKind:
+    """An animal type's properties flattened into one record, so per-frame code reads
+    attributes instead of chains of dict lookups with defaults.
+
+    Diets are kept both as {type: conversion} dicts and as bitmasks over the integer
+    ids of the plant, item and animal types they cover (bit `id` set: eats/attacks it).
+    plant_diet maps a plant type to (bitmask of edible stage indices, conversion).
+    """
+    __slots__ = (
+        "id", "name", "goes_idle", "max_health", "max_hunger", "heal_speed", "heal_threshold",
+        "hunger_decay", "move_speed", "sine_min_speed", "sine_speed", "collision_radius",
+        "death_drop", "plant_diet", "plant_mask", "item_diet", "item_mask", "prey", "prey_mask",
+        "avoid_tiles", "animated", "animation_spf", "frame_count",
+    )
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    # Records are pickled with the compiled content; slotted classes need explicit state
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+def type_mask(names, ids):
+    mask = 0
+    for name in names:
+        mask |= 1 << ids[name]
+    return mask
+
+def plant_stage_names(plant):
+    """Every growth stage of a plant in order: its timed stages, then flowering and
+    fruited for plants that have them. Plants store their stage as an index into this."""
+    names = [stage["name"] for stage in plant.get("stages", ())]
+    names += [plant[key] for key in ("last_stage", "last_stage_last") if plant.get(key)]
+    return tuple(names)
+
+def compile_plant_stages(plant):
+    """(next stage index, minutes spent in the stage before moving on, max health) per
+    stage index. The last stage has next index -1 and no time."""
+    stages = plant["stages"]
+    count = len(plant_stage_names(plant))
+    next_stage = tuple(i + 1 if i + 1 < count else -1 for i in range(count))
+    times = [stage["timer_mins"] for stage in stages]
+    if count > len(stages) + 1:
+        times.append(plant.get("fruit_time"))  # flowering -> fruited
+    times += [None] * (count - len(times))
+    health = [stage["max_health"] for stage in stages] + [1] * (count - len(stages))
+    return next_stage, tuple(times), tuple(health)
+
+def compile_animal(name, animal, ids):
+    sine = animal.get("sine_movement")
+    textures = animal["textures"]
+    # Edible stages as a bitmask over the plant's stage indices
+    plant_diet = {plant: (type_mask(conv.get("edible_stages", ()), ids["plant_stage"][plant]), conv)
+                  for plant, conv in animal.get("convert_plant", {}).items()}
+    return AnimalKind(
+        id=ids["animal"][name],
+        name=name,
+        goes_idle=animal.get("goes_idle", False),
+        max_health=animal["max_health"],
+        max_hunger=animal["max_hunger"],
+        heal_speed=animal.get("heal_speed", 0),
+        heal_threshold=animal.get("heal_threshold", 0),
+        hunger_decay=animal.get("hunger_decay", 0),
+        move_speed=animal.get("move_speed", 0),
+        # None without sine movement, otherwise its base speed and amplitude
+        sine_min_speed=None if sine is None else sine.get("min_move_speed", animal.get("move_speed", 0)),
+        sine_speed=None if sine is None else sine.get("sine_speed", 0),
+        collision_radius=animal.get("collision_radius", 10),
+        death_drop=tuple(animal.get("death_drop", ())),
+        plant_diet=plant_diet,
+        plant_mask=type_mask(plant_diet, ids["plant"]),
+        item_diet=dict(animal.get("convert_item", {})),
+        item_mask=type_mask(animal.get("convert_item", {}), ids["item"]),
+        prey=dict(animal.get("convert_animal", {})),
+        prey_mask=type_mask(animal.get("convert_animal", {}), ids["animal"]),
+        avoid_tiles=tuple(animal.get("avoid_tiles", ())),  # tile names it paths around
+        animated=textures.get("animated", False),
+        animation_spf=textures.get("animation_spf", 1.0),
+        frame_count=len(textures.get("frames", ())),
+    )
+
+def recipe_key(types):
+    """Canonical key of a set of crafting input types, in any order."""
+    return tuple(sorted(types))
+
+def source_hash(directory):
+    digest = hashlib.sha1(str(CONTENT_VERSION).encode())
+    for name in CONTENT_FILES:
+        with open(os.path.join(directory, name + ".json"), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def read_definitions(directory):
+    definitions = {}
+    for name in CONTENT_FILES:
+        with open(os.path.join(directory, name + ".json"), encoding="utf-8") as f:
+            definitions[name] = json.load(f)
+    return definitions
+
+def validate(definitions):
+    """Raise ValueError listing every problem found: unknown fields, missing required
+    fields and references to item, plant or structure types that aren't defined."""
+    items = definitions["items"]
+    plants = definitions["plants"]
+    animals = definitions["animals"]
+    structures = definitions["structures"]
+    recipes = definitions["recipes"]
+    problems = []
+
+    def check_refs(kind, known, names, where):
+        for name in names:
+            if name is not None and name not in known:
+                problems.append(f"{where}: unknown {kind} {name!r}")
+
+    for name, item in items.items():
+        for field in set(item) - ITEM_FIELDS:
+            problems.append(f"item {name}: unknown field {field!r}")
+        if "convert" in item:
+            check_refs("item", items, [item["convert"]["into"]], f"item {name} convert")
+        check_refs("item", items, [item.get("food_converts")], f"item {name} food_converts")
+        for tile, interaction in item.get("tile_interaction", {}).items():
+            check_refs("item", items, [interaction.get("item_converts")], f"item {name} tile_interaction")
+        for plant, mining in item.get("mining", {}).get("plants", {}).items():
+            check_refs("plant", plants, [plant], f"item {name} mining")
+            for drops in mining.get("item_drop", {}).values():
+                check_refs("item", items, drops, f"item {name} mining drop")
+        for ore in item.get("mining", {}).get("ores", {}).values():
+            check_refs("item", items, ore.get("item_drop", []), f"item {name} mining drop")
+
+    for name, plant in plants.items():
+        for field in PLANT_FIELDS - set(plant):
+            problems.append(f"plant {name}: missing field {field!r}")
+        for stage in plant_stage_names(plant):
+            if stage not in plant.get("images", {}):
+                problems.append(f"plant {name}: no image for stage {stage!r}")
+
+    for name, animal in animals.items():
+        for field in ANIMAL_FIELDS - set(animal):
+            problems.append(f"animal {name}: missing field {field!r}")
+        check_refs("plant", plants, animal.get("convert_plant", {}), f"animal {name} convert_plant")
+        for plant, conv in animal.get("convert_plant", {}).items():
+            if plant in plants:
+                check_refs(f"{plant} stage", plant_stage_names(plants[plant]), conv.get("edible_stages", ()),
+                           f"animal {name} convert_plant")
+        check_refs("item", items, animal.get("convert_item", {}), f"animal {name} convert_item")
+        check_refs("animal", animals, animal.get("convert_animal", {}), f"animal {name} convert_animal")
+        check_refs("item", items, animal.get("death_drop", []), f"animal {name} death_drop")
+        check_refs("item", items, [animal.get("pickup_item")], f"animal {name} pickup_item")
+
+    for name, structure in structures.items():
+        for field in set(structure) - STRUCTURE_FIELDS:
+            problems.append(f"structure {name}: unknown field {field!r}")
+        if "image" not in structure:
+            problems.append(f"structure {name}: missing field 'image'")
+        for item, interaction in structure.get("item_interactions", {}).items():
+            check_refs("item", items, [item, interaction.get("item_convert")], f"structure {name} item_interactions")
+            check_refs("structure", structures, [interaction.get("structure_convert")],
+                       f"structure {name} item_interactions")
+        specials = structure.get("specials", {})
+        check_refs("item", items, specials.get("mined_with", {}), f"structure {name} mined_with")
+        check_refs("item", items, specials.get("broken_drop", []), f"structure {name} broken_drop")
+        if "timer_convertion" in specials:
+            _, items_convert, structures_convert = specials["timer_convertion"]
+            check_refs("item", items, items_convert, f"structure {name} timer_convertion")
+            check_refs("structure", structures, structures_convert, f"structure {name} timer_convertion")
+        for fuel, data in specials.get("fuelers", {}).items():
+            check_refs("item", items, [fuel, data.get("return_item")], f"structure {name} fuelers")
+        for cooked, data in specials.get("cooks", {}).items():
+            check_refs("item", items, [cooked, data["cooks_into"]], f"structure {name} cooks")
+
+    for kind, output_field in (("craft", "outputs"), ("structures", "structure")):
+        seen = set()
+        for recipe in recipes[kind]:
+            key = recipe_key(recipe["inputs"])
+            where = f"{kind} recipe {list(key)}"
+            if key in seen:
+                problems.append(f"{where}: defined more than once")
+            seen.add(key)
+            check_refs("item", items, recipe["inputs"], where)
+            if kind == "craft":
+                check_refs("item", items, recipe["outputs"], where)
+                for tool, _ in recipe.get("durs", ()):
+                    if tool not in recipe["inputs"]:
+                        problems.append(f"{where}: durability change for {tool!r}, which isn't an input")
+            else:
+                check_refs("structure", structures, [recipe[output_field]], where)
+
+    if problems:
+        raise ValueError("invalid content definitions:\n  " + "\n  ".join(problems))
+
+def image_path(path):
+    # Definition files use "/" paths; match the os.path.join paths textures are keyed by
+    return os.path.normpath(path)
+
+def compile_content(definitions):
+    """Flatten validated definitions into the lookup tables the game uses."""
+    items = definitions["items"]
+    plants = definitions["plants"]
+    animals = definitions["animals"]
+    structures = definitions["structures"]
+    recipes = definitions["recipes"]
+
+    def fields(records, field):
+        return {name: record[field] for name, record in records.items() if field in record}
+
+    compiled = {
+        # Integer ids, by sorted type name, for compact per-entity data
+        "item_names": tuple(sorted(items)),
+        "plant_names": tuple(sorted(plants)),
+        "animal_names": tuple(sorted(animals)),
+        "structure_names": tuple(sorted(structures)),
+
+        "item_image_files": {name: image_path(path) for name, path in fields(items, "image").items()},
+        "max_item_dur": fields(items, "max_dur"),
+        "item_convert": {name: [convert["seconds"], convert["into"]]
+                         for name, convert in fields(items, "convert").items()},
+        "item_convert_labels": fields(items, "convert_label"),
+        "food_stats": fields(items, "food"),
+        "food_converts": fields(items, "food_converts"),
+        "consume_types": fields(items, "consume"),
+        "item_tile_interaction": fields(items, "tile_interaction"),
+        "mining_tools": fields(items, "mining"),
+
+        "plant_stats": {name: {key: value for key, value in plant.items() if key != "images"}
+                        for name, plant in plants.items()},
+        "plant_image_files": {name: {stage: image_path(path) for stage, path in plant["images"].items()}
+                              for name, plant in plants.items()},
+
+        "animal_props": {name: {key: value for key, value in animal.items() if key != "textures"}
+                         for name, animal in animals.items()},
+        "animal_images": {},
+
+        "structure_image_files": {name: image_path(structure["image"]) for name, structure in structures.items()},
+        "structure_item_interactions": fields(structures, "item_interactions"),
+        "structure_stats": fields(structures, "stats"),
+        "structure_specials": fields(structures, "specials"),
+
+        "craft_index": {recipe_key(recipe["inputs"]): (tuple(recipe["outputs"]), tuple(map(tuple, recipe.get("durs", ()))))
+                        for recipe in recipes["craft"]},
+        "structure_index": {recipe_key(recipe["inputs"]): recipe["structure"] for recipe in recipes["structures"]},
+    }
+    ids = {}
+    for kind in ("item", "plant", "animal", "structure"):
+        ids[kind] = compiled[kind + "_ids"] = {name: i for i, name in enumerate(compiled[kind + "_names"])}
+
+    # Growth stage tables indexed by a plant's integer stage
+    compiled["plant_stage_names"] = {name: plant_stage_names(plant) for name, plant in plants.items()}
+    ids["plant_stage"] = compiled["plant_stage_ids"] = {
+        name: {stage: i for i, stage in enumerate(stages)} for name, stages in compiled["plant_stage_names"].items()}
+    compiled["plant_next_stage"] = {}
+    compiled["plant_stage_times"] = {}
+    compiled["plant_stage_health"] = {}
+    for name, plant in plants.items():
+        next_stage, times, health = compile_plant_stages(plant)
+        compiled["plant_next_stage"][name] = next_stage
+        compiled["plant_stage_times"][name] = times
+        compiled["plant_stage_health"][name] = health
+
+    compiled["animal_kinds"] = {name: compile_animal(name, animal, ids) for name, animal in animals.items()}
+    for name, animal in animals.items():
+        textures = dict(animal["textures"])
+        if "image" in textures:
+            textures["image"] = image_path(textures["image"])
+        if "frames" in textures:
+            textures["frames"] = [image_path(frame) for frame in textures["frames"]]
+        compiled["animal_images"][name] = textures
+
+    # Derived lookups, so per-frame code can skip types a rule never applies to
+    specials = compiled["structure_specials"].values()
+    compiled["fuel_items"] = frozenset(item for spec in specials for item in spec.get("fuelers", ()))
+    compiled["cookable_items"] = frozenset(item for spec in specials for item in spec.get("cooks", ()))
+    compiled["tile_interacting_items"] = frozenset(compiled["item_tile_interaction"])
+    compiled["tool_items"] = frozenset(compiled["max_item_dur"])
+    return compiled
+
+def load(directory=CONTENT_PATH, cache_path=None):
+    """Read, validate and compile the definition files. With cache_path the compiled
+    form is pickled there and reused while the definition files are unchanged."""
+    digest = source_hash(directory)
+    if cache_path is not None:
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached["hash"] == digest:
+                return cached["content"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, AttributeError):
+            pass
+
+    definitions = read_definitions(directory)
+    validate(definitions)
+    compiled = compile_content(definitions)
+    if cache_path is not None:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump({"hash": digest, "content": compiled}, f, pickle.HIGHEST_PROTOCOL)
+    return compiled
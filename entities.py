@@ -0,0 +1,92 @@
+class Entity:
+    """World entity with its fields in __slots__ instead of a per-object dict.
+
+    Entities still read like the dicts they replaced (entity["x"], "timer" in entity,
+    entity.get("dur")), so older code keeps working, while hot loops use attributes
+    (entity.x) directly. Optional fields are left unset until first assigned, so
+    `"timer" in item` and `del item["timer"]` behave like they did on dicts.
+    """
+    __slots__ = ()
+    entity = None  # kind of entity: "item", "plant", "animal" or "structure"
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def setdefault(self, key, default=None):
+        if not hasattr(self, key):
+            setattr(self, key, default)
+        return getattr(self, key)
+
+    def pop(self, key, *default):
+        if hasattr(self, key):
+            value = getattr(self, key)
+            delattr(self, key)
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.keys())
+        return f"{type(self).__name__}({fields})"
+
+class Item(Entity):
+    __slots__ = ("type", "x", "y", "dur", "timer", "cook_timer", "contents", "sid")
+    entity = "item"
+
+class Plant(Entity):
+    """A plant's growth stage is stored as `stage`, an index into stage_names[type];
+    growth_stage reads and assigns it by name."""
+    __slots__ = ("type", "x", "y", "stage", "growth_timer", "health", "sid")
+    entity = "plant"
+    stage_names = {}  # {plant type: stage names in growth order}, set once content is loaded
+    stage_ids = {}  # {plant type: {stage name: index}}
+
+    @property
+    def growth_stage(self):
+        return self.stage_names[self.type][self.stage]
+
+    @growth_stage.setter
+    def growth_stage(self, name):
+        self.stage = self.stage_ids[self.type][name]
+
+class Animal(Entity):
+    __slots__ = (
+        "type", "x", "y", "prev_x", "prev_y", "health", "hunger", "state", "state_timer",
+        "target", "patience", "attack_timer", "recently_damaged", "death_drop",
+        "frame", "frame_timer", "sine_offset", "texture_angle", "last_tile_convert_time", "chunk", "path",
+        "sid",
+    )
+    entity = "animal"
+
+class Structure(Entity):
+    __slots__ = ("type", "x", "y", "timer")
+    entity = "structure"
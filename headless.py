@@ -0,0 +1,129 @@
+import argparse
+import os
+import random
+import time
+
+# The world is stepped without a visible window, so this also runs on servers
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+# Directions walked in turn with --walk, each held for WALK_LEG_SECONDS of game time
+WALK_KEYS = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w]
+WALK_LEG_SECONDS = 20
+
+class ScriptedKeys:
+    """Stand-in for pygame.key.get_pressed() that holds down the given keys."""
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+def load_chunks_around(game, x, y):
+    """Generate the chunks a window centred on (x, y) would show, like draw_world does."""
+    chunk_pixels = game.CHUNK_SIZE * game.TILE_SIZE
+    start_x = int((x - game.WIDTH // 2) // chunk_pixels)
+    start_y = int((y - game.HEIGHT // 2) // chunk_pixels)
+    end_x = int((x + game.WIDTH // 2) // chunk_pixels)
+    end_y = int((y + game.HEIGHT // 2) // chunk_pixels)
+    for cy in range(start_y, end_y + 1):
+        for cx in range(start_x, end_x + 1):
+            game.get_chunk(cx, cy)
+
+def world_stats(game):
+    loaded, evicted = game.CHUNKS.churn()
+    return {
+        "chunks": len(game.world_chunks),
+        "loaded_last_min": loaded,
+        "evicted_last_min": evicted,
+        "items": len(game.items),
+        "plants": len(game.plants),
+        "animals": len(game.animals),
+        "structures": len(game.structures),
+    }
+
+def run(game, ticks, dt, walk=False, keep_alive=False, report_every=0, core_times=None):
+    """Step the world `ticks` times as fast as possible. Returns the step timings in seconds.
+    The step times with a core per process (this process's CPU time, plus the busiest
+    worker's when sharded) are appended to core_times if given."""
+    keys = ScriptedKeys()
+    step_times = []
+    for tick in range(ticks):
+        if walk:
+            leg = int(tick * dt // WALK_LEG_SECONDS) % len(WALK_KEYS)
+            keys.pressed = {WALK_KEYS[leg]}
+        if keep_alive:
+            game.hunger = game.MAX_HUNGER
+            game.thirst = game.MAX_THIRST
+
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        game.PROFILER.begin_frame()
+        game.PROFILER.phase("load_chunks")
+        load_chunks_around(game, game.player_x, game.player_y)
+        game.step_world(dt, keys)
+        game.maintain_world()
+        game.PROFILER.end_frame()
+        step_times.append(time.perf_counter() - start)
+        if core_times is not None:
+            cpu = time.process_time() - start_cpu
+            if game.SHARDS is not None:
+                cpu += max(game.SHARDS.step_cpu)
+            core_times.append(cpu)
+
+        if game.dead:
+            print(f"player died at tick {tick} ({tick * dt:.1f}s game time)")
+            break
+        if report_every and (tick + 1) % report_every == 0:
+            recent = step_times[-report_every:]
+            stats = " ".join(f"{key}={value}" for key, value in world_stats(game).items())
+            print(f"tick {tick + 1}: {len(recent) / sum(recent):.0f} ticks/s {stats}"
+                  f" player=({game.player_x:.0f}, {game.player_y:.0f})")
+    return step_times
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Sciencervival world without a window")
+    parser.add_argument("--ticks", type=int, default=3600, help="simulation steps to run")
+    parser.add_argument("--dt", type=float, help="game seconds per step (default: the game's SIM_DT)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for spawning and animal behaviour")
+    parser.add_argument("--walk", action="store_true", help="walk the player around in a square")
+    parser.add_argument("--keep-alive", action="store_true", help="keep hunger and thirst full")
+    parser.add_argument("--report-every", type=int, default=600, help="print world stats every N ticks (0: never)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="step animals, plants and items on this many processes, sharded by chunk region")
+    parser.add_argument("--trace", metavar="PATH", help="write the last ticks' phase timings as a Chrome trace")
+    args = parser.parse_args()
+
+    # Seed before importing, the spawn location and first chunks are set up on import
+    random.seed(args.seed)
+    import main as game
+    dt = args.dt or game.SIM_DT
+    if args.workers:
+        game.start_sharding(args.workers)
+
+    core_times = []
+    try:
+        step_times = run(game, args.ticks, dt, args.walk, args.keep_alive, args.report_every, core_times)
+    finally:
+        game.stop_sharding()
+    total = sum(step_times)
+    print(f"{len(step_times)} ticks ({len(step_times) * dt:.1f}s game time) in {total:.2f}s:"
+          f" {len(step_times) / total:.0f} ticks/s, mean {total / len(step_times) * 1000:.3f} ms,"
+          f" max {max(step_times) * 1000:.3f} ms")
+    if core_times:
+        # What the run takes when every process has a core to itself, whatever this machine has
+        total = sum(core_times)
+        print(f"with a core per process: {len(core_times) / total:.0f} ticks/s,"
+              f" mean {total / len(core_times) * 1000:.3f} ms, max {max(core_times) * 1000:.3f} ms")
+    print(" ".join(f"{key}={value}" for key, value in world_stats(game).items()))
+    for name, (_, p95, peak) in game.PROFILER.stats().items():
+        print(f"  {name}: p95 {p95:.3f} ms, max {peak:.3f} ms")
+    if args.trace:
+        game.PROFILER.dump_chrome_trace(args.trace)
+    # Like the game on exit, so the next run starts with a warm texture cache
+    game.ATLAS.save()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
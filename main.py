@@ -2,33 +2,52 @@ import pygame
 import math
 import random
 import noise
+import assets
+import entities
+import world_grid
+import world_events
+import content
+import chunk_residency
+import region_files
+import pathfinding
+import sharding
+import noise_fields
+import profiler
 import hashlib
+import json
 import sys
 import os
 import time
 import pygame
-import ctypes
-from ctypes import wintypes
 from pygame import mask
 
 pygame.init()
 
-# Get screen and work area sizes
-user32 = ctypes.windll.user32
-SPI_GETWORKAREA = 0x0030
-rect = wintypes.RECT()
-ctypes.windll.user32.SystemParametersInfoW(SPI_GETWORKAREA, 0, ctypes.byref(rect), 0)
+DEFAULT_WINDOW_SIZE = (1280, 720)
 
-work_x = rect.left
-work_y = rect.top
-work_width = rect.right - rect.left
-work_height = rect.bottom - rect.top
+if sys.platform == "win32" and os.environ.get("SDL_VIDEODRIVER") != "dummy":
+    import ctypes
+    from ctypes import wintypes
 
-# Set window position before creating it
-os.environ['SDL_VIDEO_WINDOW_POS'] = f"{work_x},{work_y}"
+    # Get screen and work area sizes
+    user32 = ctypes.windll.user32
+    SPI_GETWORKAREA = 0x0030
+    rect = wintypes.RECT()
+    ctypes.windll.user32.SystemParametersInfoW(SPI_GETWORKAREA, 0, ctypes.byref(rect), 0)
 
-# Create borderless window that fits the work area (taskbar visible)
-WIN = pygame.display.set_mode((work_width, work_height), pygame.NOFRAME)
+    work_x = rect.left
+    work_y = rect.top
+    work_width = rect.right - rect.left
+    work_height = rect.bottom - rect.top
+
+    # Set window position before creating it
+    os.environ['SDL_VIDEO_WINDOW_POS'] = f"{work_x},{work_y}"
+
+    # Create borderless window that fits the work area (taskbar visible)
+    WIN = pygame.display.set_mode((work_width, work_height), pygame.NOFRAME)
+else:
+    # Other platforms, or headless runs on the SDL dummy driver
+    WIN = pygame.display.set_mode(DEFAULT_WINDOW_SIZE)
 WIDTH, HEIGHT = WIN.get_size()
 pygame.display.set_caption("Sciencervival")
 
@@ -36,6 +55,19 @@ pygame.display.set_caption("Sciencervival")
 LIGHT_SURFACE = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
 LIGHT_COLOR = (0, 0, 0, 180)  # Dark overlay with alpha
 
+# === TEXTURES ===
+# Pre-scaled textures are cached on disk in an atlas; each texture is only decoded the
+# first time it is drawn and the least recently drawn ones are dropped over budget
+TEXTURE_BUDGET_BYTES = 16 * 1024 * 1024
+ATLAS = assets.Atlas(os.path.join(".cache", "atlas.bin"))
+TEXTURES = assets.TextureRegistry(ATLAS, TEXTURE_BUDGET_BYTES)
+
+# === CONTENT ===
+# Item, plant, animal, structure and recipe definitions live in content/*.json. They
+# are validated and compiled into lookup tables once, then loaded from the cache
+# until the definition files change.
+CONTENT = content.load(content.CONTENT_PATH, os.path.join(".cache", "content.pickle"))
+
 # === FONT ===
 font = pygame.font.Font("font.ttf", 20)
 
@@ -49,6 +81,12 @@ DARK_GRAY = (150, 150, 150)
 # === CLOCK ===
 clock = pygame.time.Clock()
 
+# === PROFILER ===
+# Per-phase frame timings; F4 shows them, F5 writes the buffered frames as a Chrome trace
+PROFILER = profiler.FrameProfiler()
+TRACE_PATH = os.path.join(".cache", "frame_trace.json")
+profiler_visible = False
+
 # === QUADTREE ===
 class Quadtree:
     def __init__(self, x, y, w, h, capacity=8, depth=0, max_depth=12):
@@ -111,11 +149,8 @@ QT_WORLD_BOUNDS = (-2000000, -2000000, 4000000, 4000000)
 last_unload_time = 0
 UNLOAD_INTERVAL = 5  # seconds
 
-# New: throttle quadtree rebuilds and chunk unloads
-last_qt_rebuild_time = 0
-QT_REBUILD_INTERVAL = 0.5  # seconds (tweak as needed)
-last_items_count = 0
-last_structures_count = 0
+# New: throttle chunk unloads; the quadtree is rebuilt when items or structures change
+quadtree_dirty = True
 
 last_unload_chunks_time = 0
 UNLOAD_CHUNK_INTERVAL = 0.5  # seconds
@@ -145,7 +180,7 @@ player_vel_y = 0
 player_acceleration = player_speed  # Acceleration rate
 player_friction = 0.5  # Friction coefficient
 
-player_texture = pygame.transform.scale(pygame.image.load(os.path.join("other", "character.png")), (player_size, player_size))
+player_texture = TEXTURES.get(os.path.join("other", "character.png"), (player_size, player_size))
 
 # === PLAYER STATS ===
 MAX_HEALTH = 100
@@ -164,118 +199,196 @@ THIRST_DECAY = 2      # per 10 seconds
 STAMINA_RECOVER = 1   # per second (when not moving)
 STAMINA_DRAIN = 0.1     # per second (when moving)
 
-MAX_DELTA_TIME = 0.2  # Maximum allowed delta time (seconds)
 MAX_VELOCITY = 5000    # Maximum velocity for player movement
+sim_time = 0.0  # game seconds simulated so far, what world timers (unloading, grace periods) run on
+
+# === SIMULATION TIMING ===
+# The world advances in fixed steps of SIM_DT, independent of the frame rate. Frames
+# run as many steps as the time since the last frame covers and draw moving entities
+# interpolated between the last two steps.
+MAX_FPS = 60
+SIM_TICK_RATE = 60  # simulation steps per second; can be lower than MAX_FPS to save CPU
+SIM_DT = 1 / SIM_TICK_RATE
+MAX_SIM_STEPS_PER_FRAME = 5  # catch-up limit, after a longer stall the world slows down instead
+PLAYER_MOVE_RATE = 60  # player_acceleration and player_friction are applied this many times per second
+sim_accumulator = 0.0
+prev_player_x = prev_player_y = 0
 
 # === TILE SETTINGS ===
 TILE_SIZE = 100
-ITEMED_TILE = {}
 PLANTED_TILE = {}
 
 # === LOAD TILE TEXTURES ===
 TILE_PATH = "tiles"
-TILE_IMAGES = {
-    "grass": pygame.image.load(os.path.join(TILE_PATH, "grass.png")),
-    "sand": pygame.image.load(os.path.join(TILE_PATH, "sand.png")),
-    "dirt": pygame.image.load(os.path.join(TILE_PATH, "dirt.png")),
-    "stone": pygame.image.load(os.path.join(TILE_PATH, "stone.png")),
-    "sedimentary_stone": pygame.image.load(os.path.join(TILE_PATH, "sedimentary_stone.png")),
-    "water": pygame.image.load(os.path.join(TILE_PATH, "saltwater.png")),
-    "sedimentary_iron": pygame.image.load(os.path.join(TILE_PATH, "sedimentary_iron.png")),
-    "laterite_soil": pygame.image.load(os.path.join(TILE_PATH, "laterite_soil.png")),
-    "freshwater": pygame.image.load(os.path.join(TILE_PATH, "freshwater.png")),
-    "iob": pygame.image.load(os.path.join(TILE_PATH, "iob.png")),
-    "earthworm_dirt": pygame.image.load(os.path.join(TILE_PATH, "earthworm_dirt.png")),
+TILE_IMAGE_FILES = {
+    "grass": os.path.join(TILE_PATH, "grass.png"),
+    "sand": os.path.join(TILE_PATH, "sand.png"),
+    "dirt": os.path.join(TILE_PATH, "dirt.png"),
+    "stone": os.path.join(TILE_PATH, "stone.png"),
+    "sedimentary_stone": os.path.join(TILE_PATH, "sedimentary_stone.png"),
+    "water": os.path.join(TILE_PATH, "saltwater.png"),
+    "sedimentary_iron": os.path.join(TILE_PATH, "sedimentary_iron.png"),
+    "laterite_soil": os.path.join(TILE_PATH, "laterite_soil.png"),
+    "freshwater": os.path.join(TILE_PATH, "freshwater.png"),
+    "iob": os.path.join(TILE_PATH, "iob.png"),
+    "earthworm_dirt": os.path.join(TILE_PATH, "earthworm_dirt.png"),
 }
+TILE_IMAGES = TEXTURES.group(TILE_IMAGE_FILES, (TILE_SIZE, TILE_SIZE))
+# Chunks store tiles as one-byte IDs into this palette
+TILE_PALETTE = tuple(TILE_IMAGE_FILES)  # tile id -> tile name
+TILE_IDS = {name: tile_id for tile_id, name in enumerate(TILE_PALETTE)}  # tile name -> tile id
+TILE_ID_IMAGES = TEXTURES.group([TILE_IMAGE_FILES[name] for name in TILE_PALETTE], (TILE_SIZE, TILE_SIZE))
 ORE_TYPES = [
     {"name": "sedimentary_iron", "rarity": 0.4},
     {"name": "laterite_soil", "rarity": 0.5}
 ]
-PLANT_STATS = {
-    "mung_bean": {
-        "pollination": "self",
-        "fruit_time": 2,
-        "lastlast_drop": ["mung_beans"],
-        "last_drop": None,
-        "prelast_drop": ["mung_beans"],
-        "stages": [
-            {"name": "ve", "timer_mins": 1, "max_health": 1},
-            {"name": "v1", "timer_mins": 1, "max_health": 1},
-            {"name": "v2", "timer_mins": 1, "max_health": 1},
-            {"name": "v3", "timer_mins": 3, "max_health": 1},
-            {"name": "v6", "timer_mins": 3, "max_health": 1},
-        ],
-        "last_stage": "flowering", # max_health = prelast_max_health averaged
-        "last_stage_last": "fruited", # max_health = prelast_max_health averaged
-        "only_tiles": ["grass", "dirt"],
-        "can_collide": False,
-        "harvest": {
-            "ve": "harvest",
-            "v1": "harvest",
-            "v2": "harvest",
-            "v3": "harvest",
-            "v6": "harvest",
-            "flowering": "harvest",
-            "fruited": "harvest",
-        }
-    },
-    "bamboo": {
-        "pollination": None,
-        "fruit_time": None,
-        "lastlast_drop": [],
-        "last_drop": [],
-        "prelast_drop": ["bamboo_shoot"],
-        "stages": [
-            {"name": "shoot", "timer_mins": 4, "max_health": 5},
-            {"name": "grown_shoot", "timer_mins": 4, "max_health": 10},
-            {"name": "v1", "timer_mins": 10, "max_health": 20},
-            {"name": "v2", "timer_mins": 10, "max_health": 40},
-            {"name": "v3", "timer_mins": 10, "max_health": 60},
-        ],
-        "last_stage": None,
-        "last_stage_last": None,
-        "only_tiles": ["grass", "dirt"],
-        "can_collide": True,
-        "harvest": {
-            "shoot": "harvest",
-            "grown_shoot": "harvest",
-            "v1": "chop",
-            "v2": "chop",
-            "v3": "chop",
-        }
-    }
+PLANT_STATS = CONTENT["plant_stats"]
+# Growth stage tables, indexed by a plant's integer stage (entities.Plant.stage)
+PLANT_STAGE_NAMES = CONTENT["plant_stage_names"]
+PLANT_STAGE_IDS = CONTENT["plant_stage_ids"]
+PLANT_NEXT_STAGE = CONTENT["plant_next_stage"]  # index of the stage that follows, -1 for the last
+PLANT_STAGE_TIMES = CONTENT["plant_stage_times"]  # minutes before moving on to the next stage
+PLANT_STAGE_HEALTH = CONTENT["plant_stage_health"]
+entities.Plant.stage_names = PLANT_STAGE_NAMES
+entities.Plant.stage_ids = PLANT_STAGE_IDS
+
+# only_tiles as tile ids, so growth checks read chunk data without name lookups
+PLANT_ONLY_TILE_IDS = {
+    plant_type: frozenset(TILE_IDS[tile] for tile in stats["only_tiles"])
+    for plant_type, stats in PLANT_STATS.items()
 }
 
-# Scale tiles to match TILE_SIZE
-for key in TILE_IMAGES:
-    TILE_IMAGES[key] = pygame.transform.scale(TILE_IMAGES[key], (TILE_SIZE, TILE_SIZE))
-
 CHUNK_SIZE = 16
 WORLD_SEED = 9
 NOISE = noise.combine_noise_smooth(noise.make_fractal_mask(WORLD_SEED, ),noise.make_perlin(WORLD_SEED))
 ORE_NOISE = noise.make_ore_patches(WORLD_SEED+1, [0.05, 0.1], [0.4, 0.5])
 LAKE_NOISE = noise.make_ore_patches(WORLD_SEED+2, [0.05], [0.52])
-world_chunks = {}
+# Ore veins running through stone, off by default so existing worlds keep their terrain
+ENABLE_ORE_VEINS = False
+VEIN_ORE_TYPES = [
+    {"name": "sedimentary_iron", "rarity": 0.05}
+]
+ORE_VEINS = noise.make_ore_veins(WORLD_SEED+3, ore_types=VEIN_ORE_TYPES)
+# Terrain noise is read through this cache, so regenerating a chunk doesn't recompute it
+NOISE_FIELDS = noise_fields.NoiseFields(CHUNK_SIZE)
+NOISE_FIELDS.add_layer("height", lambda x, y: NOISE(x / 100, y / 100))
+NOISE_FIELDS.add_layer("lake", LAKE_NOISE, "B")
+NOISE_FIELDS.add_layer("ore", ORE_NOISE, "B")
+world_chunks = {}  # {(chunk_x, chunk_y): bytearray of CHUNK_SIZE*CHUNK_SIZE tile ids, row by row}
 items = []
 plants = []
 animals = []
-WORLD_TILE_ITEMS = {}  # {(tile_x, tile_y): item_dict} — deferred/generated items not yet in `items`
-
-def spawn_plant(plant_type, x, y, growth_stage="ve", growth_timer=0):
-    stages = PLANT_STATS[plant_type]["stages"]
-    stage = None
-    for s in stages:
-        if s["name"] == growth_stage:
-            stage = s
-
-    plant = {
-        "type": plant_type,
-        "x": x,
-        "y": y,
-        "growth_stage": growth_stage,
-        "growth_timer": growth_timer,
-        "health": 1 if stage is None else stage["max_health"]
+WORLD_TILE_ITEMS = {}  # {(chunk_x, chunk_y): {(tile_x, tile_y): item_dict}} — deferred/generated items not yet in `items`, loaded chunks only
+# Unloaded chunks are written to region files and read back instead of regenerated.
+# Nothing else of the world is saved between runs yet, so they start empty each run.
+REGIONS = region_files.RegionFiles(os.path.join(".cache", "regions"))
+if not sharding.in_worker():
+    # Shard workers import this module too, the files are the game process's
+    REGIONS.clear()
+
+def chunk_tile_positions(cx, cy):
+    """World tile coordinates of a chunk's tiles, row by row."""
+    x0 = cx * CHUNK_SIZE
+    y0 = cy * CHUNK_SIZE
+    return [(x0 + tx, y0 + ty) for ty in range(CHUNK_SIZE) for tx in range(CHUNK_SIZE)]
+
+def take_chunk_entities(collection, chunk):
+    """Remove and return the entities of a collection that are in a chunk."""
+    taken = []
+    kept = []
+    for entity in collection:
+        if chunk_of(entity.x, entity.y) == chunk:
+            taken.append(entity)
+            WORLD_EVENTS.publish(world_events.ENTITY_REMOVED, chunk, entity)
+        else:
+            kept.append(entity)
+    collection[:] = kept
+    return taken
+
+def entity_state(entity):
+    # Targets may point at other entities, animals pick a new one (and path to it) after loading
+    return {key: entity[key] for key in entity.keys() if key not in ("target", "chunk", "path", "sid")}
+
+def item_state(item):
+    """entity_state() of an item, with the items stored in it (storage contents) too."""
+    state = entity_state(item)
+    if "contents" in state:
+        state["contents"] = [None if stored is None else item_state(stored) for stored in state["contents"]]
+    return state
+
+def restore_item(state):
+    """The item saved by item_state()."""
+    if "contents" in state:
+        state["contents"] = [None if stored is None else restore_item(stored) for stored in state["contents"]]
+    return entities.Item(**state)
+
+def save_chunk_state(cx, cy, tiles):
+    """Write a chunk being unloaded to its region file: tiles, which tiles were planted
+    and have deferred items (as bitsets), and the deferred items, dropped items, plants
+    and animals on it, which leave the world until the chunk is loaded again."""
+    if SHARDS is not None:
+        # Shard workers only send back what's shown every step, get the rest first
+        SHARDS.fetch([(cx, cy)])
+    positions = chunk_tile_positions(cx, cy)
+    chunk_items = WORLD_TILE_ITEMS.pop((cx, cy), {})
+    planted = region_files.pack_bits([PLANTED_TILE.pop(pos, False) for pos in positions])
+    has_item = region_files.pack_bits([pos in chunk_items for pos in positions])
+    state = {
+        "tile_items": [(chunk_items[pos].type, chunk_items[pos].x, chunk_items[pos].y)
+                       for pos in positions if pos in chunk_items],
+        "items": [item_state(item) for item in take_chunk_entities(items, (cx, cy))],
+        "plants": [entity_state(plant) for plant in take_chunk_entities(plants, (cx, cy))],
+        "animals": [entity_state(animal) for animal in take_chunk_entities(animals, (cx, cy))],
+    }
+    record = region_files.pack_record([tiles, planted, has_item, json.dumps(state).encode()])
+    REGIONS.write(cx, cy, record)
+
+def load_chunk_state(cx, cy):
+    """Restore a chunk saved by save_chunk_state(). Returns its tiles, or None if it was never saved."""
+    record = REGIONS.read(cx, cy)
+    if record is None:
+        return None
+    tiles, planted, has_item, state = region_files.unpack_record(record)
+    state = json.loads(bytes(state))
+    positions = chunk_tile_positions(cx, cy)
+    count = len(positions)
+    for pos, flag in zip(positions, region_files.unpack_bits(planted, count)):
+        if flag:
+            PLANTED_TILE[pos] = True
+    item_positions = [pos for pos, flag in zip(positions, region_files.unpack_bits(has_item, count)) if flag]
+    WORLD_TILE_ITEMS[(cx, cy)] = {
+        pos: make_item(item_type, x, y) for pos, (item_type, x, y) in zip(item_positions, state["tile_items"])
     }
+    for fields in state["items"]:
+        add_entity(items, restore_item(fields))
+    for fields in state["plants"]:
+        add_entity(plants, entities.Plant(**fields))
+    for fields in state["animals"]:
+        add_entity(animals, entities.Animal(target=None, chunk=(cx, cy), **fields))
+    return bytearray(tiles)
+
+def pop_tile_item(tile_x, tile_y):
+    """Remove and return the deferred item generated on a tile, or None."""
+    chunk_items = WORLD_TILE_ITEMS.get((tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE))
+    if chunk_items is None:
+        return None
+    return chunk_items.pop((tile_x, tile_y), None)
+
+def make_item(item_type, x, y, **fields):
+    """Create a world item; extra fields (e.g. dur, timer) are added as given."""
+    return entities.Item(type=item_type, x=x, y=y, **fields)
+
+def spawn_plant(plant_type, x, y, growth_stage=None, growth_timer=0):
+    """Create a plant at the named growth stage, its first stage by default."""
+    stage = 0 if growth_stage is None else PLANT_STAGE_IDS[plant_type][growth_stage]
+    plant = entities.Plant(
+        type=plant_type,
+        x=x,
+        y=y,
+        stage=stage,
+        growth_timer=growth_timer,
+        health=PLANT_STAGE_HEALTH[plant_type][stage],
+    )
     return plant
 
 def generate_item(tile_type, _x, _y):
@@ -286,27 +399,27 @@ def generate_item(tile_type, _x, _y):
     
     if tile_type == "grass":
         if h < 0.04:
-            return {"type": "rattan", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("rattan", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.05:
-            return {"type": "carrot", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("carrot", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.06:
-            return {"type": "cotton_plant", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("cotton_plant", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.1:
-            return {"type": "stick", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("stick", x * TILE_SIZE, y * TILE_SIZE)
 
     elif tile_type == "dirt":
         if h < 0.02:
-            return {"type": "limestone", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("limestone", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.05:
-            return {"type": "clay", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("clay", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.06:
-            return {"type": "magnesite", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("magnesite", x * TILE_SIZE, y * TILE_SIZE)
 
     elif tile_type == "sand":
         if h < 0.04:
-            return {"type": "rock", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("rock", x * TILE_SIZE, y * TILE_SIZE)
         elif h < 0.06:
-            return {"type": "clam", "x": x * TILE_SIZE, "y": y * TILE_SIZE}
+            return make_item("clam", x * TILE_SIZE, y * TILE_SIZE)
 
     return None
 
@@ -327,8 +440,10 @@ def generate_plant(tile, world_x, world_y):
             stage = stages[int(sh*(len(stages)-1))]
             return spawn_plant("bamboo", px, py, stage["name"], stage["timer_mins"]*th)
         
-def get_tile(world_x, world_y):
-    r = NOISE(world_x / 100, world_y / 100)
+def get_tile(world_x, world_y, vein=None):
+    """Tile name at a world tile. `vein` is the ore vein id there if already known
+    (from ORE_VEINS.block), otherwise it's looked up when veins are enabled."""
+    r = NOISE_FIELDS.get("height", world_x, world_y)
 
     if r < 0.3:
         tile = "water"
@@ -338,10 +453,10 @@ def get_tile(world_x, world_y):
         tile = "dirt"
     elif r < 0.6:
         tile = "grass"
-        lake = LAKE_NOISE(world_x, world_y)
+        lake = NOISE_FIELDS.get("lake", world_x, world_y)
         if lake != 0:
             tile = "freshwater"
-            ore = ORE_NOISE(world_x, world_y)
+            ore = NOISE_FIELDS.get("ore", world_x, world_y)
             if ore != 0:
                 ore_name = ORE_TYPES[ore - 1]["name"]
                 if ore_name == "sedimentary_iron":
@@ -354,10 +469,15 @@ def get_tile(world_x, world_y):
         tile = "dirt"
     elif r < 0.8:
         tile = "stone"
-        ore = ORE_NOISE(world_x, world_y)
+        ore = NOISE_FIELDS.get("ore", world_x, world_y)
         if ore != 0:
             ore_name = ORE_TYPES[ore - 1]["name"]
             tile = ore_name
+        elif ENABLE_ORE_VEINS:
+            if vein is None:
+                vein = ORE_VEINS(world_x, world_y)
+            if vein != 0:
+                tile = VEIN_ORE_TYPES[vein - 1]["name"]
     else:
         tile = "sedimentary_stone"
 
@@ -365,249 +485,182 @@ def get_tile(world_x, world_y):
 
 def generate_chunk(cx, cy):
     """Generate a single chunk of terrain and spawn items into global items list."""
-    chunk_tiles = []
-    
+    chunk_tiles = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+    chunk_items = WORLD_TILE_ITEMS.setdefault((cx, cy), {})
+    # Rasterize the veins crossing this chunk in one go instead of per tile
+    veins = None
+    if ENABLE_ORE_VEINS:
+        veins = ORE_VEINS.block(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+
     for ty in range(CHUNK_SIZE):
-        row = []
         for tx in range(CHUNK_SIZE):
             world_x = cx * CHUNK_SIZE + tx
             world_y = cy * CHUNK_SIZE + ty
-            tile = get_tile(world_x, world_y)
+            tile = get_tile(world_x, world_y, veins[ty * CHUNK_SIZE + tx] if veins else None)
             
-            row.append(tile)
+            chunk_tiles[ty * CHUNK_SIZE + tx] = TILE_IDS[tile]
             
             # Spawn animals (with very low probability)
             if random.random() < 0.1:  # Adjust probability as needed
                 if tile == "grass":
                     if random.random() < 0.8:
-                        animals.append(spawn_animal("earthworm", 
+                        add_entity(animals, spawn_animal("earthworm", 
                             world_x * TILE_SIZE + TILE_SIZE//2,
                             world_y * TILE_SIZE + TILE_SIZE//2))
                     else:
-                        animals.append(spawn_animal("pigeon",
+                        add_entity(animals, spawn_animal("pigeon",
                             world_x * TILE_SIZE + TILE_SIZE//2,
                             world_y * TILE_SIZE + TILE_SIZE//2))
                         
             # === Generate item directly into global items list ===
             item = generate_item(tile, world_x, world_y)
-            if item and (world_x, world_y) not in ITEMED_TILE:
+            if item:
                 # store by tile coordinates so it's not active until picked up
-                WORLD_TILE_ITEMS[(world_x, world_y)] = item
+                chunk_items[(world_x, world_y)] = item
             plant = generate_plant(tile, world_x, world_y)
             if plant and (world_x, world_y) not in PLANTED_TILE:
-                plants.append(plant)
-            ITEMED_TILE[(world_x, world_y)] = True
+                add_entity(plants, plant)
             PLANTED_TILE[(world_x, world_y)] = True
 
-        chunk_tiles.append(row)
-
     return chunk_tiles
 
+def load_chunk(cx, cy):
+    """Read a chunk back from its region file if it was saved before, otherwise generate it."""
+    tiles = load_chunk_state(cx, cy)
+    if tiles is None:
+        return generate_chunk(cx, cy)
+    return tiles
+
+# All tile reads and writes go through WORLD
+WORLD = world_grid.WorldGrid(world_chunks, CHUNK_SIZE, load_chunk)
+
+# === WORLD EVENTS ===
+# Tile and entity changes are published here (see world_events) so caches of world
+# state can update incrementally. Entities are added and removed with add_entity()
+# and remove_entity() rather than on the lists directly, and fields set outside the
+# world step (update_animals, update_plants, update_items) go through change_entity().
+WORLD_EVENTS = world_events.EventBus()
+
+def chunk_of(x, y):
+    """Chunk containing a world pixel position."""
+    return (int(x // TILE_SIZE) // CHUNK_SIZE, int(y // TILE_SIZE) // CHUNK_SIZE)
+
+def publish_tile_change(tile_x, tile_y, old_id, new_id):
+    chunk = (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE)
+    WORLD_EVENTS.publish(world_events.TILE_CHANGED, chunk, tile_x, tile_y, old_id, new_id)
+
+WORLD.add_listener(publish_tile_change)
+
+def publish_chunk_loaded(cx, cy):
+    WORLD_EVENTS.publish(world_events.CHUNK_LOADED, (cx, cy))
+
+WORLD.add_load_listener(publish_chunk_loaded)
+
+def add_entity(collection, entity):
+    collection.append(entity)
+    WORLD_EVENTS.publish(world_events.ENTITY_ADDED, chunk_of(entity.x, entity.y), entity)
+
+def remove_entity(collection, entity):
+    collection.remove(entity)
+    WORLD_EVENTS.publish(world_events.ENTITY_REMOVED, chunk_of(entity.x, entity.y), entity)
+
+def change_entity(entity, *fields):
+    """Publish ENTITY_CHANGED for fields just set on an entity in the world."""
+    WORLD_EVENTS.publish(world_events.ENTITY_CHANGED, chunk_of(entity.x, entity.y), entity, fields)
+
+def publish_moves(collection):
+    """Publish ENTITY_MOVED for entities that crossed into another chunk since the last call."""
+    for entity in collection:
+        chunk = chunk_of(entity.x, entity.y)
+        if chunk != entity.chunk:
+            old_chunk = entity.chunk
+            entity.chunk = chunk
+            WORLD_EVENTS.publish(world_events.ENTITY_MOVED, chunk, entity, old_chunk)
+
+def mark_quadtree_dirty(chunk, entity):
+    global quadtree_dirty
+    if entity.entity in ("item", "structure"):
+        quadtree_dirty = True
+
+WORLD_EVENTS.subscribe(world_events.ENTITY_ADDED, mark_quadtree_dirty)
+WORLD_EVENTS.subscribe(world_events.ENTITY_REMOVED, mark_quadtree_dirty)
+
 def get_chunk(cx, cy):
-    if (cx, cy) not in world_chunks:
-        world_chunks[(cx, cy)] = generate_chunk(cx, cy)
-    return world_chunks[(cx, cy)]
+    return WORLD.chunk(cx, cy)
+
+def set_tile(tile_x, tile_y, tile):
+    """Change a tile by name, generating its chunk if it isn't loaded."""
+    WORLD.set(tile_x, tile_y, TILE_IDS[tile])
 
 def draw_world(camera_x, camera_y):
-    start_tile_x = camera_x // TILE_SIZE
-    start_tile_y = camera_y // TILE_SIZE
-    end_tile_x = (camera_x + WIDTH) // TILE_SIZE + 1
-    end_tile_y = (camera_y + HEIGHT) // TILE_SIZE + 1
-
-    for tile_y in range(int(start_tile_y), int(end_tile_y)):
-        for tile_x in range(int(start_tile_x), int(end_tile_x)):
-            chunk_x = tile_x // CHUNK_SIZE
-            chunk_y = tile_y // CHUNK_SIZE
-            local_x = tile_x % CHUNK_SIZE
-            local_y = tile_y % CHUNK_SIZE
-
-            chunk = get_chunk(chunk_x, chunk_y)
-            tile_type = chunk[local_y][local_x]
-            tile_img = TILE_IMAGES[tile_type]
-
-            screen_x = tile_x * TILE_SIZE - camera_x
-            screen_y = tile_y * TILE_SIZE - camera_y
-            WIN.blit(tile_img, (screen_x, screen_y))
-
-def unload_far_chunks(player_chunk_x, player_chunk_y, max_distance=3):
-    for cx, cy in tuple(world_chunks):
-        if abs(cx - player_chunk_x) > max_distance or abs(cy - player_chunk_y) > max_distance:
-            del world_chunks[(cx, cy)]
+    start_tile_x = int(camera_x // TILE_SIZE)
+    start_tile_y = int(camera_y // TILE_SIZE)
+    width = int((camera_x + WIDTH) // TILE_SIZE) + 1 - start_tile_x
+    height = int((camera_y + HEIGHT) // TILE_SIZE) + 1 - start_tile_y
+    tiles = WORLD.get_rect(start_tile_x, start_tile_y, width, height)
+
+    for row in range(height):
+        screen_y = (start_tile_y + row) * TILE_SIZE - camera_y
+        for column in range(width):
+            screen_x = (start_tile_x + column) * TILE_SIZE - camera_x
+            WIN.blit(TILE_ID_IMAGES[tiles[row * width + column]], (screen_x, screen_y))
+
+def unload_chunk(cx, cy):
+    save_chunk_state(cx, cy, world_chunks[(cx, cy)])
+    WORLD.unload(cx, cy)
+    WORLD_EVENTS.publish(world_events.CHUNK_UNLOADED, (cx, cy))
+
+# Chunks are loaded 1 chunk ahead and kept until they've been over 3 chunks away for
+# CHUNK_GRACE_SECONDS, so walking back and forth over a boundary doesn't regenerate them
+CHUNK_LOAD_RADIUS = 1
+CHUNK_UNLOAD_RADIUS = 3
+CHUNK_GRACE_SECONDS = 10
+# The memory cap counts chunks: a chunk's tiles take CHUNK_SIZE*CHUNK_SIZE bytes, its
+# entities and noise fields vary, so the count stands in for a byte budget
+MAX_LOADED_CHUNKS = 64
+CHUNKS = chunk_residency.ChunkResidency(WORLD, WORLD_EVENTS, unload_chunk, CHUNK_LOAD_RADIUS,
+                                        CHUNK_UNLOAD_RADIUS, CHUNK_GRACE_SECONDS, MAX_LOADED_CHUNKS)
 
 # === LOAD PLANT TEXTURES ===
 PLANT_SIZE = 80
-PLANT_PATH = "plants"
+PLANT_IMAGE_FILES = CONTENT["plant_image_files"]
 PLANT_IMAGES = {
-    "mung_bean": {
-        "ve": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "ve.png"))),
-        "v1": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "v1.png"))),
-        "v2": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "v2.png"))),
-        "v3": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "v3.png"))),
-        "v6": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "v6.png"))),
-        "flowering": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "flowering.png"))),
-        "fruited": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("mung_bean", "fruited.png"))),
-    },
-    "bamboo": {
-        "shoot": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("bamboo", "shoot.png"))),
-        "grown_shoot": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("bamboo", "grown_shoot.png"))),
-        "v1": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("bamboo", "v1.png"))),
-        "v2": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("bamboo", "v2.png"))),
-        "v3": pygame.image.load(os.path.join(PLANT_PATH, os.path.join("bamboo", "v3.png"))),
-    }
+    plant_type: TEXTURES.group(files, (PLANT_SIZE, PLANT_SIZE))
+    for plant_type, files in PLANT_IMAGE_FILES.items()
 }
-for plant_type in PLANT_IMAGES:
-    for stage in PLANT_IMAGES[plant_type]:
-        PLANT_IMAGES[plant_type][stage] = pygame.transform.scale(PLANT_IMAGES[plant_type][stage], (PLANT_SIZE, PLANT_SIZE))
 
 # Create masks for player and plant textures
 player_mask = pygame.mask.from_surface(player_texture)
 player_mask_radius = max(player_mask.get_size()) // 2
 
-def get_tighter_radius(mask):
+def get_tighter_radius(bbox):
     """Get radius excluding empty edges."""
-    bbox = mask.get_bounding_rects()[0]
     return max(bbox.width, bbox.height) // 2
 
+# Collision radius per plant type, indexed by growth stage
 PLANT_MASKS = {}
-for plant_type in PLANT_IMAGES:
-    PLANT_MASKS[plant_type] = {}
-    for stage in PLANT_IMAGES[plant_type]:
-        texture = PLANT_IMAGES[plant_type][stage]
-        plant_mask = pygame.mask.from_surface(texture)
-        # Get the actual radius from non-transparent pixels
-        w, h = plant_mask.get_size()
-        PLANT_MASKS[plant_type][stage] = get_tighter_radius(plant_mask)
+for plant_type, stage_names in PLANT_STAGE_NAMES.items():
+    # Get the actual radius from non-transparent pixels (bounds are cached with the atlas)
+    PLANT_MASKS[plant_type] = tuple(
+        get_tighter_radius(ATLAS.mask_bounds(PLANT_IMAGE_FILES[plant_type][stage], (PLANT_SIZE, PLANT_SIZE)))
+        for stage in stage_names)
 
 # === LOAD ITEM TEXTURES ===
-RESOURCE_PATH = "resources"
-ITEM_IMAGES = {
-    "rock": pygame.image.load(os.path.join(RESOURCE_PATH, "rock.png")),
-    "stick": pygame.image.load(os.path.join(RESOURCE_PATH, "stick.png")),
-    "rattan": pygame.image.load(os.path.join(RESOURCE_PATH, "rattan.png")),
-    "cracked_rock": pygame.image.load(os.path.join(RESOURCE_PATH, "cracked_rock.png")),
-    "sharp_rock": pygame.image.load(os.path.join(RESOURCE_PATH, "sharp_rock.png")),
-    "hard_fiber": pygame.image.load(os.path.join(RESOURCE_PATH, "hard_fiber.png")),
-    "raw_rope": pygame.image.load(os.path.join(RESOURCE_PATH, "raw_rope.png")),
-    "pointy_stick": pygame.image.load(os.path.join(RESOURCE_PATH, "pointy_stick.png")),
-    "clam": pygame.image.load(os.path.join(RESOURCE_PATH, "clam.png")),
-    "limestone": pygame.image.load(os.path.join(RESOURCE_PATH, "limestone.png")),
-    "magnesite": pygame.image.load(os.path.join(RESOURCE_PATH, "magnesite.png")),
-    "stone_chisel": pygame.image.load(os.path.join(RESOURCE_PATH, "stone_chisel.png")),
-    "carved_stick": pygame.image.load(os.path.join(RESOURCE_PATH, "carved_stick.png")),
-    "holed_stick": pygame.image.load(os.path.join(RESOURCE_PATH, "holed_stick.png")),
-    "cotton_boll": pygame.image.load(os.path.join(RESOURCE_PATH, "cotton_boll.png")),
-    "cotton_plant": pygame.image.load(os.path.join(RESOURCE_PATH, "cotton_plant.png")),
-    "cotton_seed": pygame.image.load(os.path.join(RESOURCE_PATH, "cotton_seed.png")),
-    "mung_beans": pygame.image.load(os.path.join(RESOURCE_PATH, "mung_beans.png")),
-    "fire_plough": pygame.image.load(os.path.join(RESOURCE_PATH, "fire_plough.png")),
-    "ashed_holed_stick": pygame.image.load(os.path.join(RESOURCE_PATH, "ashed_holed_stick.png")),
-    "nonfunctional_stone_hatchet": pygame.image.load(os.path.join(RESOURCE_PATH, "nonfunctional_stone_hatchet.png")),
-    "stone_hatchet": pygame.image.load(os.path.join(RESOURCE_PATH, "stone_hatchet.png")),
-    "burning_cotton_boll": pygame.image.load(os.path.join(RESOURCE_PATH, "burning_cotton_boll.png")),
-    "ashes": pygame.image.load(os.path.join(RESOURCE_PATH, "ashes.png")),
-    "wood_dust": pygame.image.load(os.path.join(RESOURCE_PATH, "wood_dust.png")),
-    "burning_wood_dust": pygame.image.load(os.path.join(RESOURCE_PATH, "burning_wood_dust.png")),
-    "clay": pygame.image.load(os.path.join(RESOURCE_PATH, "clay.png")),
-    "clay_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "clay_cup.png")),
-    "rolled_clay": pygame.image.load(os.path.join(RESOURCE_PATH, "rolled_clay.png")),
-    "clay_mold": pygame.image.load(os.path.join(RESOURCE_PATH, "clay_mold.png")),
-    "ingot_mold": pygame.image.load(os.path.join(RESOURCE_PATH, "ingot_mold.png")),
-    "rod_mold": pygame.image.load(os.path.join(RESOURCE_PATH, "rod_mold.png")),
-    "axehead_mold": pygame.image.load(os.path.join(RESOURCE_PATH, "axehead_mold.png")),
-    "pickaxehead_mold": pygame.image.load(os.path.join(RESOURCE_PATH, "pickaxehead_mold.png")),
-    "carrot": pygame.image.load(os.path.join(RESOURCE_PATH, "carrot.png")),
-    "dried_clay_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "dried_clay_cup.png")),
-    "ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "ceramic_cup.png")),
-    "saltwater_ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "saltwater_ceramic_cup.png")),
-    "freshwater_ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "freshwater_ceramic_cup.png")),
-    "drinkable_water_ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "drinkable_water_ceramic_cup.png")),
-    "iob_ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "iob_ceramic_cup.png")),
-    "anoxic_iob_ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "anoxic_iob_ceramic_cup.png")),
-    "bamboo_bottle": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo_bottle.png")),
-    "green_basket": pygame.image.load(os.path.join(RESOURCE_PATH, "green_basket.png")),
-    "green_weaved_cone": pygame.image.load(os.path.join(RESOURCE_PATH, "green_weaved_cone.png")),
-    "weaved_fiber": pygame.image.load(os.path.join(RESOURCE_PATH, "weaved_fiber.png")),
-    "iron_rock": pygame.image.load(os.path.join(RESOURCE_PATH, "iron_rock.png")),
-    "bamboo": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo.png")),
-    "hollow_bamboo": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo_pipe.png")),
-    "bamboo_bottle": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo_bottle.png")),
-    "saltwater_bamboo_bottle": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo_bottle.png")),
-    "freshwater_bamboo_bottle": pygame.image.load(os.path.join(RESOURCE_PATH, "bamboo_bottle.png")),
-    "earthworm": pygame.image.load(os.path.join(RESOURCE_PATH, "earthworm.png")),
-    "earthworm_waste": pygame.image.load(os.path.join(RESOURCE_PATH, "earthworm_waste.png")),
-    "fertilizer": pygame.image.load(os.path.join(RESOURCE_PATH, "fertilizer.png")),
-    "charcoal": pygame.image.load(os.path.join(RESOURCE_PATH, "charcoal.png")),
-    "coal": pygame.image.load(os.path.join(RESOURCE_PATH, "coal.png")),
-    "quicklime": pygame.image.load(os.path.join(RESOURCE_PATH, "quicklime.png")),
-    "slaked_lime_Ceramic_cup": pygame.image.load(os.path.join(RESOURCE_PATH, "drinkable_water_ceramic_cup.png")),
-}
-
-MAX_ITEM_DUR = {
-    "sharp_rock": 15,
-    "stone_chisel": 5,
-    "pointy_stick": 10,
-    "fire_plough": 20,
-    "stone_hatchet": 50,
-}
-
-ITEM_CONVERT = {
-    "burning_cotton_boll": [5, None],
-    "burning_wood_dust": [10, "ashes"],
-    "clay_cup": [60, "dried_clay_cup"],
-    "iob_ceramic_cup": [70, "anoxic_iob_ceramic_cup"]
-}
-
-MINING_TOOLS = {
-    "stone_hatchet": {
-        "ores": {
-            "sedimentary_iron": {"tool_dur": -20, "ore_converts": "stone", "item_drop": ["iron_rock"]},
-        },
-        "plants": {
-            "bamboo": {"tool_dur": -2, "plant_damage": 7, "plant_converts": None, "item_drop": {"v1": ["bamboo", "bamboo"], "v2": ["bamboo", "bamboo", "bamboo"], "v3": ["bamboo", "bamboo", "bamboo", "bamboo"]}}
-        }
-    }
-}
-
-ITEM_CONVERT_LABELS = {
-    "burning_cotton_boll": "Burns in: ",
-    "burning_wood_dust": "Burns in: ",
-    "cocoa_beans_bamboo_bottle": "Ferments in: ",
-    "clay_cup": "Dries in: ",
-    "iob_ceramic_cup": "Anoxicates in: "
-}
-
-FOOD_STATS = {
-    "carrot": {"hunger": 10, "thirst": -10, "stamina": 0},
-    "drinkable_water_ceramic_cup": {"hunger": 0, "thirst": 35, "stamina": 10},
-    "saltwater_ceramic_cup": {"hunger": 1, "thirst": -15, "stamina": -5},
-    "freshwater_ceramic_cup": {"hunger": 1, "thirst": 10, "stamina": 2}
-}
-
-FOOD_CONVERTS = {
-    "carrot": None,
-    "drinkable_water_ceramic_cup": "ceramic_cup",
-    "saltwater_ceramic_cup": "ceramic_cup",
-    "freshwater_ceramic_cup": "ceramic_cup"
-}
-
-CONSUME_TYPES = {
-    "carrot": "Eat",
-    "drinkable_water_ceramic_cup": "Drink",
-    "saltwater_ceramic_cup": "Drink",
-    "freshwater_ceramic_cup": "Drink"
-}
-
-ITEM_TILE_INTERACTION = {
-    "ceramic_cup": {
-        "water": {"item_converts": "saltwater_ceramic_cup", "tile_converts": "water"},
-        "iob": {"item_converts": "iob_ceramic_cup", "tile_converts": "freshwater"},
-        "freshwater": {"item_converts": "freshwater_ceramic_cup", "tile_converts": "dirt"}
-    },
-    "bamboo_bottle": {
-        "water": {"item_converts": "saltwater_bamboo_bottle", "tile_converts": "water"},
-        "freshwater": {"item_converts": "freshwater_bamboo_bottle", "tile_converts": "dirt"}
-    }
-}
+ITEM_SIZE = 40
+ITEM_IMAGE_FILES = CONTENT["item_image_files"]
+ITEM_IMAGES = TEXTURES.group(ITEM_IMAGE_FILES, (ITEM_SIZE, ITEM_SIZE))
+
+MAX_ITEM_DUR = CONTENT["max_item_dur"]
+ITEM_CONVERT = CONTENT["item_convert"]  # {item: [seconds, converts into or None]}
+MINING_TOOLS = CONTENT["mining_tools"]
+ITEM_CONVERT_LABELS = CONTENT["item_convert_labels"]
+FOOD_STATS = CONTENT["food_stats"]
+FOOD_CONVERTS = CONTENT["food_converts"]
+CONSUME_TYPES = CONTENT["consume_types"]
+ITEM_TILE_INTERACTION = CONTENT["item_tile_interaction"]
+# Item types some rule applies to, so per-frame loops can skip the rest
+TILE_INTERACTING_ITEMS = CONTENT["tile_interacting_items"]
+COOKABLE_ITEMS = CONTENT["cookable_items"]
 
 STORAGE_ITEMS = {
     "green_basket": {
@@ -645,20 +698,15 @@ def handle_tool_action(tool_item, target_type, target_data, world_x, world_y):
         
         # Convert tile
         if ore_data["ore_converts"]:
-            chunk_x = world_x // CHUNK_SIZE
-            chunk_y = world_y // CHUNK_SIZE
-            local_x = world_x % CHUNK_SIZE 
-            local_y = world_y % CHUNK_SIZE
-            chunk = get_chunk(chunk_x, chunk_y)
-            chunk[local_y][local_x] = ore_data["ore_converts"]
+            set_tile(world_x, world_y, ore_data["ore_converts"])
             
         # Spawn drops
         for drop in ore_data["item_drop"]:
-            items.append({
-                "type": drop,
-                "x": world_x * TILE_SIZE + random.randint(-20, 20),
-                "y": world_y * TILE_SIZE + random.randint(-20, 20)
-            })
+            add_entity(items, make_item(
+                drop,
+                world_x * TILE_SIZE + random.randint(-20, 20),
+                world_y * TILE_SIZE + random.randint(-20, 20),
+            ))
             
         return False, tool_item["dur"] > 0
         
@@ -683,6 +731,7 @@ def handle_tool_action(tool_item, target_type, target_data, world_x, world_y):
         
         # Apply damage and check if plant survives
         target_data["health"] = target_data.get("health", 1) - damage
+        change_entity(target_data, "health")
         if target_data["health"] > 0:
             # still standing (hit effect could be added here)
             return True, tool_item["dur"] > 0
@@ -704,20 +753,20 @@ def handle_tool_action(tool_item, target_type, target_data, world_x, world_y):
         
         # Spawn drops at plant position
         for drop in drops:
-            items.append({
-                "type": drop,
-                "x": int(target_data.get("x", 0)) + random.randint(-20, 20),
-                "y": int(target_data.get("y", 0)) + random.randint(-20, 20)
-            })
+            add_entity(items, make_item(
+                drop,
+                int(target_data.get("x", 0)) + random.randint(-20, 20),
+                int(target_data.get("y", 0)) + random.randint(-20, 20),
+            ))
             
         # Caller should remove the plant if keep_target is False
         return False, tool_item["dur"] > 0
         
     return True, True
 
-ITEM_SIZE = 40
-for key in ITEM_IMAGES:
-    ITEM_IMAGES[key] = pygame.transform.scale(ITEM_IMAGES[key], (ITEM_SIZE, ITEM_SIZE))
+# Faded copies used for inactive (generated, not yet picked up) tile items
+FADED_ITEM_ALPHA = 140
+FADED_ITEM_IMAGES = TEXTURES.group(ITEM_IMAGE_FILES, (ITEM_SIZE, ITEM_SIZE), alpha=FADED_ITEM_ALPHA)
 
 # === INVENTORY ===
 inventory = [None, None]
@@ -816,86 +865,24 @@ drag_origin = None
 drag_offset = (0, 0)
 
 # === HELPER: Crafting Logic ===
+def recipe_key(inputs):
+    """Canonical key of a set of crafting inputs (items or type names): their sorted types."""
+    return content.recipe_key(i["type"] if isinstance(i, entities.Entity) else i for i in inputs)
+
+# Recipes compiled by sorted input types, so finding one is a single dict lookup
+CRAFT_INDEX = CONTENT["craft_index"]  # {input types: (outputs, durability effects)}
+
+def get_craft_recipe(inputs):
+    """(outputs, durability effects) of the recipe for these inputs, both empty if there is none."""
+    return CRAFT_INDEX.get(recipe_key(inputs), ((), ()))
+
 def get_craft_result(inputs):
     """Return result items based on crafting input."""
-    # Convert dicts to their type strings
-    input_types = [i["type"] if isinstance(i, dict) else i for i in inputs]
-    
-    if sorted(input_types) == sorted(["rock", "rock"]):
-        return ["cracked_rock", "rock"]
-    elif sorted(input_types) == sorted(["cracked_rock", "rock"]):
-        return ["sharp_rock", "rock"]
-    elif sorted(input_types) == sorted(["sharp_rock", "stick"]):
-        return ["pointy_stick"]
-    elif sorted(input_types) == sorted(["sharp_rock", "rattan"]):
-        return ["hard_fiber", "hard_fiber"]
-    elif sorted(input_types) == sorted(["hard_fiber", "hard_fiber"]):
-        return ["raw_rope"]
-    elif sorted(input_types) == sorted(["cotton_plant"]):
-        return ["cotton_seed", "cotton_boll"]
-    elif sorted(input_types) == sorted(["cracked_rock", "cracked_rock"]):
-        return ["cracked_rock", "stone_chisel"]
-    elif sorted(input_types) == sorted(["stone_chisel", "stick"]):
-        return ["carved_stick", "wood_dust"]
-    elif sorted(input_types) == sorted(["carved_stick", "stone_chisel"]):
-        return ["holed_stick", "wood_dust"]
-    elif sorted(input_types) == sorted(["pointy_stick", "carved_stick"]):
-        return ["fire_plough"]
-    elif sorted(input_types) == sorted(["holed_stick", "ashes"]):
-        return ["ashed_holed_stick"]
-    elif sorted(input_types) == sorted(["ashed_holed_stick", "sharp_rock"]):
-        return ["nonfunctional_stone_hatchet"]
-    elif sorted(input_types) == sorted(["nonfunctional_stone_hatchet", "hard_fiber"]):
-        return ["stone_hatchet"]
-    elif sorted(input_types) == sorted(["cotton_boll", "fire_plough"]):
-        return ["burning_cotton_boll"]
-    elif sorted(input_types) == sorted(["wood_dust", "fire_plough"]):
-        return ["burning_wood_dust"]
-    elif sorted(input_types) == sorted(["wood_dust", "burning_cotton_boll"]):
-        return ["burning_wood_dust"]
-    elif sorted(input_types) == sorted(["clay"]):
-        return ["rolled_clay"]
-    elif sorted(input_types) == sorted(["rolled_clay", "clay"]):
-        return ["clay_cup"]
-    elif sorted(input_types) == sorted(["clay", "clay"]):
-        return ["clay_mold"]
-    elif sorted(input_types) == sorted(["rattan", "rattan"]):
-        return ["weaved_fiber"]
-    elif sorted(input_types) == sorted(["weaved_fiber", "weaved_fiber"]):
-        return ["green_basket"]
-    elif sorted(input_types) == sorted(["weaved_fiber", "rattan"]):
-        return ["green_weaved_cone"]
-    elif sorted(input_types) == sorted(["bamboo", "stone_chisel"]):
-        return ["hollow_bamboo"]
-    elif sorted(input_types) == sorted(["hollow_bamboo", "raw_rope"]):
-        return ["bamboo_bottle"]
-    else:
-        return []
+    return list(get_craft_recipe(inputs)[0])
 
 def get_craft_result_durs(inputs):
     """Return durability effects for tools used in crafting."""
-    input_types = [i["type"] if isinstance(i, dict) else i for i in inputs]
-    
-    if sorted(input_types) == sorted(["sharp_rock", "stick"]):
-        return [["sharp_rock", -1]]
-    elif sorted(input_types) == sorted(["sharp_rock", "rattan"]):
-        return [["sharp_rock", -1]]
-    elif sorted(input_types) == sorted(["stone_chisel", "stick"]):
-        return [["stone_chisel", -1]]
-    elif sorted(input_types) == sorted(["carved_stick", "stone_chisel"]):
-        return [["stone_chisel", -1]]
-    elif sorted(input_types) == sorted(["pointy_stick", "carved_stick"]):
-        return [["pointy_stick", "gone"]]
-    elif sorted(input_types) == sorted(["ashed_holed_stick", "sharp_rock"]):
-        return [["sharp_rock", "gone"]]
-    elif sorted(input_types) == sorted(["cotton_boll", "fire_plough"]):
-        return [["fire_plough", -1]]
-    elif sorted(input_types) == sorted(["wood_dust", "fire_plough"]):
-        return [["fire_plough", -3]]
-    elif sorted(input_types) == sorted(["bamboo", "stone_chisel"]):
-        return [["stone_chisel", -2]]
-    else:
-        return []
+    return [list(effect) for effect in get_craft_recipe(inputs)[1]]
 
 def update_craft_output():
     """Update output slots and expand GUI if necessary."""
@@ -930,12 +917,11 @@ def perform_craft():
     current_inputs = [slot for slot in craft_slots if slot]
 
     # Compute result
-    result_items = get_craft_result(current_inputs)
+    result_items, dur_updates = get_craft_recipe(current_inputs)
     if not result_items:
         return
 
     # Apply durability changes BEFORE clearing slots
-    dur_updates = get_craft_result_durs(current_inputs)
     for tool_type, delta in dur_updates:
         for slot in craft_slots:
             if slot and slot["type"] == tool_type and "dur" in slot:
@@ -952,45 +938,17 @@ def perform_craft():
     for result in result_items:
         drop_x = player_x + random.randint(-50, 50)
         drop_y = player_y + random.randint(-50, 50)
-        new_item = {"type": result, "x": drop_x, "y": drop_y}
+        new_item = make_item(result, drop_x, drop_y)
         if result in MAX_ITEM_DUR:
             new_item["dur"] = MAX_ITEM_DUR[result]
-        items.append(new_item)
+        add_entity(items, new_item)
 
     update_craft_output()
 
 # === LOAD ANIMALS IMAGE ===
 ANIMAL_BASE_SIZE = 80
-ANIMAL_PATH = "animals"
-ANIMAL_IMAGES = {
-    "snail": {
-        "animated": False,
-        "image": pygame.image.load(os.path.join(ANIMAL_PATH, "snail.png"))
-    },
-    "cone_snail": {
-        "animated": False,
-        "image": pygame.image.load(os.path.join(ANIMAL_PATH, "cone_snail.png"))
-    },
-    "earthworm": {
-        "animated": True,
-        "frames": [
-            pygame.image.load(os.path.join(ANIMAL_PATH, os.path.join("earthworm", "shortened.png"))),
-            pygame.image.load(os.path.join(ANIMAL_PATH, os.path.join("earthworm", "extended.png")))
-        ],
-        "animation_spf": 2.0 # seconds per frame
-    },
-    "pigeon": {
-        "animated": False,
-        "image": pygame.image.load(os.path.join(ANIMAL_PATH, "pigeon.png"))
-    }
-}
-
-for animal, data in ANIMAL_IMAGES.items():
-    if not data["animated"]:
-        data["image"] = pygame.transform.scale(data["image"], (ANIMAL_BASE_SIZE, ANIMAL_BASE_SIZE))
-    else:
-        for i, frame in enumerate(data["frames"]):
-            data["frames"][i] = pygame.transform.scale(frame, (ANIMAL_BASE_SIZE, ANIMAL_BASE_SIZE))
+ANIMAL_TEXTURE_SIZE = (ANIMAL_BASE_SIZE, ANIMAL_BASE_SIZE)
+ANIMAL_IMAGES = CONTENT["animal_images"]  # texture files, fetched through TEXTURES when drawn
 
 DEFAULT_ANIMAL_IDLE_TIMER = 5 # seconds when an animal that is goes_idle-True arrives at their target
 DEFAULT_ANIMAL_WANDER_RADIUS = 10 # the radius in tiles an animal can when picking a random tile to target
@@ -998,302 +956,198 @@ DEFAULT_ANIMAL_PATIENCE = 10 # in seconds, if the animal can't reach the tile in
 # animals have patience, if their patience is lost (patience in seconds <= 0) while going to a tile, they pick another tile
 # when picking a tile: if (they can't find a thing from their convert_plant, convert_item, or convert_animal) or (they are not hungry) or (can't find a tile from convert_tile), pick a random tile to go to
 # same thing happens when they reach their target tile
-ANIMAL_PROPS = {
-    "snail": {
-        "goes_idle": False,
-        "max_health": 10,
-        "max_hunger": 10,
-        "heal_speed": 1, # per 10 secs
-        "heal_threshold": 6, # hunger before healing
-        "hunger_decay": 1, # per 30 secs
-        "move_speed": 3, # pixels per second
-        "convert_plant": {
-            "mung_bean": {
-                "edible_stages": ["v1", "v2", "v3", "v6", "fruited"],
-                "plant_damage": 1, # damage to plant
-                "item_converts": None,
-                "heal": 2,
-                "hunger": 2,
-                "animal_damage": 0, # damage to animal
-                "eating_duration": 5, # seconds before the plant disappears
-                "move_stop": True, # stops animal from moving while eating
-            }
-        },
-        "convert_item": {
-            "carrot": {
-                "item_converts": None,
-                "heal": 0,
-                "hunger": 4,
-                "animal_damage": 0,
-                "eating_duration": 6,
-                "move_stop": True,
-            }
-        },
-        "convert_tile": {},
-        "convert_animal": {}, # interaction with other animals
-        "death_drop": [],
-        "pickup_item": None
-    },
-    "earthworm": {
-        "goes_idle": False,
-        "max_health": 5,
-        "max_hunger": 10,
-        "heal_speed": 2, 
-        "heal_threshold": 4,
-        "hunger_decay": 1,
-        "move_speed": 30, 
-        "sine_movement": { # oscillating speed
-            "min_move_speed": 10,
-            "sine_speed": 10 # pixel per frame (multiplied by dt)
-        },
-        "convert_plant": {
-            "mung_bean": {
-                "edible_stages": ["ve", "v1", "v2", "v3"],
-                "plant_damage": 1,
-                "item_converts": "earthworm_waste",
-                "heal": 0,
-                "hunger": 2,
-                "animal_damage": 0,
-                "eating_duration": 5,
-                "move_stop": False,
-            }
-        },
-        "convert_item": {
-            "carrot": {
-                "item_converts": "earthworm_waste",
-                "heal": 0,
-                "hunger": 4,
-                "animal_damage": 0,
-                "eating_duration": 6,
-                "move_stop": True,
-            }
-        },
-        "convert_tile": {
-            "grass": {
-                "tile_into": "earthworm_dirt",
-                "when": {
-                    "seconds": 0,
-                    "after_timer": False,
-                    "after_damaged": True,
-                    "of_being_alive": False,
-                    "of_being_dead": False,
-                    "of_eating": False,
-                    "of_near_player": {
-                        "radius": 0,
-                        "does": False
-                    }
-                },
-                "animal_disappears": True
-            }
-        },
-        "convert_animal": {},
-        "death_drop": [],
-        "pickup_item": "earthworm"
-    },
-    "cone_snail": {
-        "goes_idle": False,
-        "max_health": 10,
-        "max_hunger": 10,
-        "heal_speed": 1,
-        "heal_threshold": 5,
-        "hunger_decay": 1,
-        "move_speed": 5,
-        "convert_plant": {},
-        "convert_item": {},
-        "convert_animal": {},
-        "convert_tile": {},
-        "death_drop": [],
-        "pickup_item": None
-    },
-    "pigeon": {
-        "goes_idle": True,
-        "max_health": 30,
-        "max_hunger": 30,
-        "heal_speed": 1,
-        "heal_threshold": 10,
-        "hunger_decay": 2,
-        "move_speed": 40,
-        "convert_plant": {},
-        "convert_item": {
-            "mung_beans": {
-                "item_converts": None,
-                "heal": 0,
-                "hunger": 4,
-                "animal_damage": 0,
-                "eating_duration": 1,
-                "move_stop": True,
-            },
-            "cotton_seed": {
-                "item_converts": None,
-                "heal": 0,
-                "hunger": 4,
-                "animal_damage": 0,
-                "eating_duration": 1,
-                "move_stop": True,
-            },
-        },
-        "convert_tile": {},
-        "convert_animal": {
-            "earthworm": {
-                "target_damage": 3, # damage to target
-                "target_dead": { # when target dies
-                    "heal": 0,
-                    "hunger": 7,
-                    "animal_damage": 0,
-                    "target_drop_cancel": True, # sets if the prey doesn't drop something
-                },
-            }
-        },
-        "death_drop": [],
-        "pickup_item": None # None means it can't be picked up
-    }
-}
+ANIMAL_PROPS = CONTENT["animal_props"]
+ANIMAL_KINDS = CONTENT["animal_kinds"]  # {type: content.AnimalKind}, the props compiled for update_animals
+
+# Animals with avoid_tiles path around them; kinds avoiding the same tiles share a Pathfinder.
+# The rest move straight at their target.
+PATHFINDERS = {}  # {frozenset of blocked tile ids: pathfinding.Pathfinder}
+ANIMAL_PATHFINDERS = {}  # {animal type: pathfinding.Pathfinder}
+for animal_type, kind in ANIMAL_KINDS.items():
+    if kind.avoid_tiles:
+        blocked = frozenset(TILE_IDS[tile] for tile in kind.avoid_tiles)
+        if blocked not in PATHFINDERS:
+            PATHFINDERS[blocked] = pathfinding.Pathfinder(WORLD, WORLD_EVENTS, blocked)
+        ANIMAL_PATHFINDERS[animal_type] = PATHFINDERS[blocked]
+
+def next_animal_step(animal, finder, tx, ty):
+    """World point an animal should head for on its way to (tx, ty), its own position if it has
+    to wait for a route, or None if it can't get there."""
+    start = (int(animal.x // TILE_SIZE), int(animal.y // TILE_SIZE))
+    goal = (int(tx // TILE_SIZE), int(ty // TILE_SIZE))
+    if animal.target["type"] in ("plant", "item"):
+        # Food draws many animals, they share a flow field toward it
+        step = finder.flow_step(start, goal)
+    else:
+        step, animal.path = finder.follow(start, goal, getattr(animal, "path", None))
+    if step is None:
+        return None
+    if step == goal:
+        return tx, ty
+    if step == start:
+        # No route yet, the pathfinder is out of builds this tick: wait
+        return animal.x, animal.y
+    return (step[0] + 0.5) * TILE_SIZE, (step[1] + 0.5) * TILE_SIZE
 
 def spawn_animal(animal_type, x, y):
     """Create a new animal instance."""
     props = ANIMAL_PROPS[animal_type]
-    return {
-        "type": animal_type,
-        "x": x,
-        "y": y,
-        "health": props["max_health"],
-        "hunger": props["max_hunger"],
-        "target": None,
-        "patience": DEFAULT_ANIMAL_PATIENCE,
-        "frame": 0,  # for animated animals
-        "frame_timer": 0,  # for animated animals
-        "sine_offset": random.random() * math.tau,  # for oscillating movement
-        "last_tile_convert_time": 0,  # for tile conversion tracking
-        "state_timer": 0,
-        "texture_angle": 0
-    }
+    return entities.Animal(
+        type=animal_type,
+        x=x,
+        y=y,
+        health=props["max_health"],
+        hunger=props["max_hunger"],
+        target=None,
+        patience=DEFAULT_ANIMAL_PATIENCE,
+        frame=0,  # for animated animals
+        frame_timer=0,  # for animated animals
+        sine_offset=random.random() * math.tau,  # for oscillating movement
+        last_tile_convert_time=0,  # for tile conversion tracking
+        state_timer=0,
+        texture_angle=0,
+        chunk=chunk_of(x, y),  # chunk it was last seen in, for ENTITY_MOVED
+    )
+
+def update_animals(dt, movers=None):
+    """Update all animals' states using full ANIMAL_PROPS capabilities.
+    Only `movers` (default: all animals) are stepped, the rest are just there to interact with."""
+    # Plants animals bump into, with their collision radius, gathered once per update
+    colliding_plants = []
+    for plant in plants:
+        stats = PLANT_STATS.get(plant.type, {})
+        if stats.get("can_collide", False):
+            colliding_plants.append((plant, stats.get("collision_radius", PLANT_SIZE / 2)))
+    for finder in PATHFINDERS.values():
+        finder.new_tick()
 
-def update_animals(dt):
-    """Update all animals' states using full ANIMAL_PROPS capabilities."""
-    for animal in animals[:]:  # Use slice to allow removal during iteration
-        props = ANIMAL_PROPS[animal["type"]]
+    for animal in list(animals if movers is None else movers):  # Copy to allow removal during iteration
+        kind = ANIMAL_KINDS[animal.type]
 
         # --- Idle / wander behavior ---
-        if animal.get("target") is None:
-            if props.get("goes_idle", False):
+        if animal.target is None:
+            if kind.goes_idle:
                 # stays idle for a while before picking a new target
-                animal["state"] = "idle"
-                animal["state_timer"] += dt
-                if animal["state_timer"] >= DEFAULT_ANIMAL_IDLE_TIMER:
-                    animal["state_timer"] = 0
+                animal.state = "idle"
+                animal.state_timer += dt
+                if animal.state_timer >= DEFAULT_ANIMAL_IDLE_TIMER:
+                    animal.state_timer = 0
                     # pick a new random nearby point
                     angle = random.uniform(0, 2*math.pi)
                     dist = random.uniform(20, DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE)
-                    animal["target"] = {"type": "position", "ref": (
-                        animal["x"] + math.cos(angle)*dist,
-                        animal["y"] + math.sin(angle)*dist
+                    animal.target = {"type": "position", "ref": (
+                        animal.x + math.cos(angle)*dist,
+                        animal.y + math.sin(angle)*dist
                     )}
-                    animal["state"] = "moving"
+                    animal.state = "moving"
             else:
                 # immediately wander again (never idles)
                 angle = random.uniform(0, 2*math.pi)
                 dist = random.uniform(20, DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE)
-                animal["target"] = {"type": "position", "ref": (
-                    animal["x"] + math.cos(angle)*dist,
-                    animal["y"] + math.sin(angle)*dist
+                animal.target = {"type": "position", "ref": (
+                    animal.x + math.cos(angle)*dist,
+                    animal.y + math.sin(angle)*dist
                 )}
-                animal["state"] = "moving"
+                animal.state = "moving"
         
         # --- Initialize runtime fields ---
-        if "state" not in animal:
-            animal["state"] = "idle"
-            animal["state_timer"] = 0.0
-            animal["target"] = None
-            animal["patience"] = DEFAULT_ANIMAL_PATIENCE
+        if not hasattr(animal, "state"):
+            animal.state = "idle"
+            animal.state_timer = 0.0
+            animal.target = None
+            animal.patience = DEFAULT_ANIMAL_PATIENCE
             
         # --- Update basic stats ---
         # Hunger decay
-        animal["hunger"] = max(0, animal["hunger"] - props.get("hunger_decay", 0) * dt / 30.0)
+        animal.hunger = max(0, animal.hunger - kind.hunger_decay * dt / 30.0)
         
         # Healing when above threshold
-        if animal["hunger"] >= props.get("heal_threshold", 0):
-            animal["health"] = min(props["max_health"], 
-                                 animal["health"] + props.get("heal_speed", 0) * dt / 10.0)
+        if animal.hunger >= kind.heal_threshold:
+            animal.health = min(kind.max_health, 
+                                 animal.health + kind.heal_speed * dt / 10.0)
         
         # --- Death check ---
-        if animal["hunger"] <= 0:
-            animal["health"] -= props.get("hunger_decay", 0) * dt / 30.0
+        if animal.hunger <= 0:
+            animal.health -= kind.hunger_decay * dt / 30.0
 
-        if animal["health"] <= 0 and not animal.get("recently_damaged", False):
+        if animal.health <= 0 and not getattr(animal, "recently_damaged", False):
             # Spawn death drops
-            for item_type in props.get("death_drop", []):
-                items.append({
-                    "type": item_type,
-                    "x": animal["x"] + random.randint(-20, 20),
-                    "y": animal["y"] + random.randint(-20, 20)
-                })
-            animals.remove(animal)
+            for item_type in kind.death_drop:
+                add_entity(items, make_item(
+                    item_type,
+                    animal.x + random.randint(-20, 20),
+                    animal.y + random.randint(-20, 20),
+                ))
+            remove_entity(animals, animal)
             continue
 
         # --- Handle idle timers to restart wandering ---
-        if animal["state"] == "idle":
-            animal["state_timer"] += dt
-            if animal["state_timer"] >= DEFAULT_ANIMAL_IDLE_TIMER:
-                animal["state_timer"] = 0
+        if animal.state == "idle":
+            animal.state_timer += dt
+            if animal.state_timer >= DEFAULT_ANIMAL_IDLE_TIMER:
+                animal.state_timer = 0
                 # choose new random wander target
                 angle = random.uniform(0, 2 * math.pi)
                 dist = random.uniform(20, DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE)
-                animal["target"] = {"type": "position", "ref": (
-                    animal["x"] + math.cos(angle) * dist,
-                    animal["y"] + math.sin(angle) * dist
+                animal.target = {"type": "position", "ref": (
+                    animal.x + math.cos(angle) * dist,
+                    animal.y + math.sin(angle) * dist
                 )}
-                animal["state"] = "moving"
+                animal.state = "moving"
             
         # --- Target selection ---
-        animal["patience"] -= dt
-        if (animal["state"] == "idle" or 
-            animal["patience"] <= 0 or 
-            animal["target"] is None):
+        animal.patience -= dt
+        if (animal.state == "idle" or 
+            animal.patience <= 0 or 
+            animal.target is None):
             
             # Reset state
-            animal["target"] = None
-            animal["patience"] = DEFAULT_ANIMAL_PATIENCE
+            animal.target = None
+            animal.patience = DEFAULT_ANIMAL_PATIENCE
             # Give up on old target and wander again
             angle = random.uniform(0, 2 * math.pi)
             dist = random.uniform(20, DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE)
-            animal["target"] = {"type": "position", "ref": (
-                animal["x"] + math.cos(angle) * dist,
-                animal["y"] + math.sin(angle) * dist
+            animal.target = {"type": "position", "ref": (
+                animal.x + math.cos(angle) * dist,
+                animal.y + math.sin(angle) * dist
             )}
-            animal["state"] = "moving"
+            animal.state = "moving"
             
             # Find nearest target based on priorities
             best_target = None
             search_radius = DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE
             
             # 1. Check for plants to eat
-            if props.get("convert_plant"):
+            if kind.plant_mask:
+                plant_diet = kind.plant_diet
                 for plant in plants:
-                    if plant["type"] in props["convert_plant"]:
-                        conv = props["convert_plant"][plant["type"]]
-                        if plant["growth_stage"] in conv.get("edible_stages", []):
-                            dist = math.hypot(plant["x"] - animal["x"], 
-                                           plant["y"] - animal["y"])
+                    diet = plant_diet.get(plant.type)
+                    if diet is not None:
+                        if diet[0] >> plant.stage & 1:  # edible stage
+                            dist = math.hypot(plant.x - animal.x, 
+                                           plant.y - animal.y)
                             if dist <= search_radius:
                                 if not best_target or dist < best_target[0]:
                                     best_target = (dist, "plant", plant)
             
             # 2. Check for items to consume
-            if not best_target and props.get("convert_item"):
+            if not best_target and kind.item_mask:
+                item_diet = kind.item_diet
                 for item in items:
-                    if item["type"] in props["convert_item"]:
-                        dist = math.hypot(item["x"] - animal["x"],
-                                        item["y"] - animal["y"])
+                    if item.type in item_diet:
+                        dist = math.hypot(item.x - animal.x,
+                                        item.y - animal.y)
                         if dist <= search_radius:
                             if not best_target or dist < best_target[0]:
                                 best_target = (dist, "item", item)
             
             # 3. Check for prey animals
-            if not best_target and props.get("convert_animal"):
+            if not best_target and kind.prey_mask:
+                prey_mask = kind.prey_mask
                 for other in animals:
-                    if other is not animal and other["type"] in props["convert_animal"]:
-                        dist = math.hypot(other["x"] - animal["x"],
-                                        other["y"] - animal["y"])
+                    if other is not animal and prey_mask >> ANIMAL_KINDS[other.type].id & 1:
+                        dist = math.hypot(other.x - animal.x,
+                                        other.y - animal.y)
                         if dist <= search_radius:
                             if not best_target or dist < best_target[0]:
                                 best_target = (dist, "animal", other)
@@ -1301,140 +1155,150 @@ def update_animals(dt):
             # Set target or wander
             if best_target:
                 _, ttype, target = best_target
-                animal["target"] = {"type": ttype, "ref": target}
-                animal["state"] = "moving"
+                animal.target = {"type": ttype, "ref": target}
+                animal.state = "moving"
             else:
                 # Random wandering
                 angle = random.random() * math.tau
                 dist = random.uniform(0, search_radius)
-                animal["target"] = {
+                animal.target = {
                     "type": "position",
-                    "ref": (animal["x"] + math.cos(angle) * dist,
-                           animal["y"] + math.sin(angle) * dist)
+                    "ref": (animal.x + math.cos(angle) * dist,
+                           animal.y + math.sin(angle) * dist)
                 }
-                animal["state"] = "moving"
+                animal.state = "moving"
         
         # --- Animate frame if applicable ---
-        imgdata = ANIMAL_IMAGES[animal["type"]]
-        if imgdata.get("animated", False):
-            spf = imgdata.get("animation_spf", 1.0)  # seconds per frame
-            animal["frame_timer"] += dt
-            if animal["frame_timer"] >= spf:
-                animal["frame_timer"] = 0
-                animal["frame"] = (animal["frame"] + 1) % len(imgdata["frames"])
+        if kind.animated:
+            animal.frame_timer += dt
+            if animal.frame_timer >= kind.animation_spf:  # seconds per frame
+                animal.frame_timer = 0
+                animal.frame = (animal.frame + 1) % kind.frame_count
 
         # --- Movement ---
-        if animal["state"] == "moving":
+        if animal.state == "moving":
             # Get target position
             tx, ty = None, None
-            if animal["target"]["type"] == "position":
-                tx, ty = animal["target"]["ref"]
+            if animal.target["type"] == "position":
+                tx, ty = animal.target["ref"]
             else:
-                target = animal["target"]["ref"]
+                target = animal.target["ref"]
                 tx, ty = target["x"], target["y"]
             
             if tx is not None and ty is not None:
                 # Calculate movement
-                dx = tx - animal["x"]
-                dy = ty - animal["y"]
+                dx = tx - animal.x
+                dy = ty - animal.y
                 dist = math.hypot(dx, dy)
 
                 if dist < 5:
-                    animal["state"] = "arrived"
+                    animal.state = "arrived"
                     continue  # Prevent jitter/spin
 
                 if dist > 5:  # Distance threshold
+                    # Head for the next waypoint around blocked tiles instead of straight at the target
+                    finder = ANIMAL_PATHFINDERS.get(animal.type)
+                    if finder is not None:
+                        step = next_animal_step(animal, finder, tx, ty)
+                        if step is None:
+                            # Unreachable, give up now instead of waiting for patience to run out
+                            animal.patience = 0
+                            dx = dy = 0
+                        else:
+                            dx = step[0] - animal.x
+                            dy = step[1] - animal.y
+                            dist = math.hypot(dx, dy) or 1
+
                     # Base movement speed
-                    speed = props.get("move_speed", 0)
+                    speed = kind.move_speed
                     
                     # Apply sine movement if configured
-                    if "sine_movement" in props:
-                        sine = props["sine_movement"]
-                        base = sine.get("min_move_speed", speed)
-                        amp = sine.get("sine_speed", 0)
-                        speed = base + abs(math.sin(time.time() + animal["sine_offset"])) * (amp * 0.3)
+                    if kind.sine_min_speed is not None:
+                        speed = (kind.sine_min_speed +
+                                 abs(math.sin(sim_time + animal.sine_offset)) * (kind.sine_speed * 0.3))
                     
                     # Move
                     vx = (dx / dist) * speed * dt
                     vy = (dy / dist) * speed * dt
-                    animal["x"] += vx
-                    animal["y"] += vy
+                    animal.x += vx
+                    animal.y += vy
                     
-                    if dist > 1:  # update facing only if actually moving
-                        animal["texture_angle"] = math.degrees(math.atan2(dy, dx))
+                    if dist > 1 and (dx or dy):  # update facing only if actually moving
+                        animal.texture_angle = math.degrees(math.atan2(dy, dx))
                 else:
                     # Reached target
-                    animal["state"] = "arrived"
+                    animal.state = "arrived"
                     
         # --- Handle arrival at target ---
-        if animal["state"] == "arrived":
-            if animal["target"]["type"] == "plant":
+        if animal.state == "arrived":
+            if animal.target["type"] == "plant":
                 # Start eating plant
-                animal["state"] = "eating"
-                conv = props["convert_plant"][animal["target"]["ref"]["type"]]
-                animal["state_timer"] = conv.get("eating_duration", 1.0)
-            elif animal["target"]["type"] == "item":
+                animal.state = "eating"
+                conv = kind.plant_diet[animal.target["ref"]["type"]][1]
+                animal.state_timer = conv.get("eating_duration", 1.0)
+            elif animal.target["type"] == "item":
                 # Start eating item
-                animal["state"] = "eating"
-                conv = props["convert_item"][animal["target"]["ref"]["type"]]
-                animal["state_timer"] = conv.get("eating_duration", 1.0)
-            elif animal["target"]["type"] == "animal":
+                animal.state = "eating"
+                conv = kind.item_diet[animal.target["ref"]["type"]]
+                animal.state_timer = conv.get("eating_duration", 1.0)
+            elif animal.target["type"] == "animal":
                 # Start attack
-                animal["state"] = "attacking"
-                animal["state_timer"] = 0.5  # Attack windup
+                animal.state = "attacking"
+                animal.state_timer = 0.5  # Attack windup
 
         # --- Animal vs Animal interactions ---
+        prey_mask = kind.prey_mask
         for other in animals:
             if other is animal:
                 continue
-            if other["health"] <= 0:
+            if other.health <= 0:
                 continue
+            other_kind = ANIMAL_KINDS[other.type]
 
             # Check if this animal can attack the other
-            if other["type"] in props.get("convert_animal", {}):
-                interaction = props["convert_animal"][other["type"]]
+            if prey_mask >> other_kind.id & 1:
+                interaction = kind.prey[other.type]
 
-                dx = other["x"] - animal["x"]
-                dy = other["y"] - animal["y"]
+                dx = other.x - animal.x
+                dy = other.y - animal.y
                 dist = math.hypot(dx, dy)
 
                 # You can define a default attack range (e.g., 30 px)
                 if dist <= 30:
                     # Apply damage to the target
                     dmg = interaction.get("target_damage", 0)
-                    animal["attack_timer"] = animal.get("attack_timer", 0) - dt
-                    if dmg > 0 and animal["attack_timer"] <= 0:
-                        other["health"] -= dmg
-                        other["recently_damaged"] = True
+                    animal.attack_timer = getattr(animal, "attack_timer", 0) - dt
+                    if dmg > 0 and animal.attack_timer <= 0:
+                        other.health -= dmg
+                        other.recently_damaged = True
 
                         # Check if the target dies
-                        if other["health"] <= 0:
+                        if other.health <= 0:
                             td = interaction.get("target_dead", {})
                             # Heal or feed predator
-                            animal["health"] = min(
-                                animal["health"] + td.get("heal", 0),
-                                props.get("max_health", 10),
+                            animal.health = min(
+                                animal.health + td.get("heal", 0),
+                                kind.max_health,
                             )
-                            animal["hunger"] = min(
-                                animal["hunger"] + td.get("hunger", 0),
-                                props.get("max_hunger", 10),
+                            animal.hunger = min(
+                                animal.hunger + td.get("hunger", 0),
+                                kind.max_hunger,
                             )
 
                             # Cancel prey's death drop if specified
                             if td.get("target_drop_cancel", False):
-                                other["death_drop"] = []
+                                other.death_drop = []
                             # Remove prey from world
-                            animals.remove(other)
-                        animal["attack_timer"] = 1.0
+                            remove_entity(animals, other)
+                        animal.attack_timer = 1.0
                     break  # only attack one target per frame
 
-            dx = animal["x"] - other["x"]
-            dy = animal["y"] - other["y"]
+            dx = animal.x - other.x
+            dy = animal.y - other.y
             dist = math.hypot(dx, dy)
 
             # Define collision radius — tweak per animal type if needed
-            radius = (props.get("collision_radius", 10) +
-                    ANIMAL_PROPS[other["type"]].get("collision_radius", 10))
+            radius = kind.collision_radius + other_kind.collision_radius
 
             if dist < radius and dist > 0:
                 # Overlapping — compute push-out vector
@@ -1443,26 +1307,20 @@ def update_animals(dt):
                 ny = dy / dist
 
                 # Push both animals apart slightly
-                animal["x"] += nx * overlap * 0.5
-                animal["y"] += ny * overlap * 0.5
-                other["x"]  -= nx * overlap * 0.5
-                other["y"]  -= ny * overlap * 0.5
+                animal.x += nx * overlap * 0.5
+                animal.y += ny * overlap * 0.5
+                other.x  -= nx * overlap * 0.5
+                other.y  -= ny * overlap * 0.5
 
         # --- Animal vs Plant collision ---
-        for plant in plants:
-            plant_type = plant["type"]
-            if not PLANT_STATS.get(plant_type, {}).get("can_collide", False):
-                continue
-
-            # Assume plants have center position (plant["x"], plant["y"])
+        animal_radius = kind.collision_radius
+        for plant, plant_radius in colliding_plants:
+            # Assume plants have center position (plant.x, plant.y)
             # If they’re tile-based, you can compute from tile index instead.
-            dx = animal["x"] - plant["x"]
-            dy = animal["y"] - plant["y"]
+            dx = animal.x - plant.x
+            dy = animal.y - plant.y
             dist = math.hypot(dx, dy)
 
-            # Define collision radii
-            plant_radius = PLANT_STATS[plant_type].get("collision_radius", PLANT_SIZE / 2)
-            animal_radius = props.get("collision_radius", 10)
             radius = plant_radius + animal_radius
 
             if dist < radius and dist > 0:
@@ -1471,138 +1329,65 @@ def update_animals(dt):
                 ny = dy / dist
 
                 # Push animal outward only (plants are static)
-                animal["x"] += nx * overlap
-                animal["y"] += ny * overlap
+                animal.x += nx * overlap
+                animal.y += ny * overlap
 
         # --- Handle eating state ---
-        if animal["state"] == "eating":
-            animal["state_timer"] -= dt
-            if animal["state_timer"] <= 0:
-                target = animal["target"]
+        if animal.state == "eating":
+            animal.state_timer -= dt
+            if animal.state_timer <= 0:
+                target = animal.target
                 if target["type"] == "plant":
                     plant = target["ref"]
-                    conv = props["convert_plant"][plant["type"]]
+                    conv = kind.plant_diet[plant.type][1]
                     # Apply damage and effects
-                    plant["health"] -= conv.get("plant_damage", 0)
-                    animal["health"] = min(props["max_health"], 
-                                         animal["health"] + conv.get("heal", 0))
-                    animal["hunger"] = min(props["max_hunger"],
-                                         animal["hunger"] + conv.get("hunger", 0))
+                    plant.health -= conv.get("plant_damage", 0)
+                    animal.health = min(kind.max_health, 
+                                         animal.health + conv.get("heal", 0))
+                    animal.hunger = min(kind.max_hunger,
+                                         animal.hunger + conv.get("hunger", 0))
                     
                     # Convert/remove plant
-                    if plant["health"] <= 0:
+                    if plant.health <= 0:
                         if plant in plants:
-                            plants.remove(plant)
+                            remove_entity(plants, plant)
                             
                     # Spawn conversion item
                     if conv.get("item_converts"):
-                        items.append({
-                            "type": conv["item_converts"],
-                            "x": plant["x"] + random.randint(-10, 10),
-                            "y": plant["y"] + random.randint(-10, 10)
-                        })
+                        add_entity(items, make_item(
+                            conv["item_converts"],
+                            plant.x + random.randint(-10, 10),
+                            plant.y + random.randint(-10, 10),
+                        ))
                 
                 elif target["type"] == "item":
                     item = target["ref"]
-                    conv = props["convert_item"][item["type"]]
+                    conv = kind.item_diet[item.type]
                     # Apply effects
-                    animal["health"] = min(props["max_health"],
-                                         animal["health"] + conv.get("heal", 0))
-                    animal["hunger"] = min(props["max_hunger"],
-                                         animal["hunger"] + conv.get("hunger", 0))
+                    animal.health = min(kind.max_health,
+                                         animal.health + conv.get("heal", 0))
+                    animal.hunger = min(kind.max_hunger,
+                                         animal.hunger + conv.get("hunger", 0))
                     
                     # Convert/remove item
                     if conv.get("item_converts"):
-                        item["type"] = conv["item_converts"]
+                        item.type = conv["item_converts"]
                     else:
                         if item in items:
-                            items.remove(item)
+                            remove_entity(items, item)
                 
                 # Reset state
-                animal["state"] = "idle"
-                animal["target"] = None
+                animal.state = "idle"
+                animal.target = None
                 
 # === LOAD STRUCTURES IMAGE ===
 STRUCTURE_SIZE = 80
-STRUCTURE_PATH = "structures"
-STRUCTURE_IMAGES = {
-    "cross_sticks": pygame.image.load(os.path.join(STRUCTURE_PATH, "cross_sticks.png")),
-    "sticks_pile": pygame.image.load(os.path.join(STRUCTURE_PATH, "sticks_pile.png")),
-    "fire_place": pygame.image.load(os.path.join(STRUCTURE_PATH, "fire_place.png")),
-    "burning_sticks_pile": pygame.image.load(os.path.join(STRUCTURE_PATH, "burning_sticks_pile.png")),
-    "stick_stake": pygame.image.load(os.path.join(STRUCTURE_PATH, "stick_stake.png")),
-    "roped_stick_stake": pygame.image.load(os.path.join(STRUCTURE_PATH, "roped_stick_stake.png")),
-}
-for img in STRUCTURE_IMAGES.keys():
-    STRUCTURE_IMAGES[img] = pygame.transform.scale(STRUCTURE_IMAGES[img], (STRUCTURE_SIZE, STRUCTURE_SIZE))
-
-STRUCTURE_ITEM_INTERACTIONS = {
-    "cross_sticks": {
-        "stick": {
-            "structure_convert": "sticks_pile",
-            "item_convert": None
-        }
-    },
-    "sticks_pile": {
-        "burning_wood_dust": {
-            "structure_convert": "burning_sticks_pile",
-            "item_convert": None
-        }
-    },
-    "burning_sticks_pile": {
-        "stick": {
-            "structure_convert": "fire_place",
-            "item_convert": None
-        }
-    }
-}
-STRUCTURE_STATS = {
-    "burning_sticks_pile": {
-        "max_health": 20,
-        "heal": {
-            "when": [],
-            "heal": 0
-        }
-    },
-    "fire_place": {
-        "max_health": 30,
-        "heal": {
-            "when": ["refueled"],
-            "heal": 30
-        }
-    },
-}
-STRUCTURE_SPECIALS = {
-    "burning_sticks_pile": {
-        "mined_with": {
-            "stone_hatchet": {"damage": 10, "dur_damage": 2}
-        },
-        "broken_drop": ["ashes", "ashes", "charcoal"],
-        "light_radius": 3, # Tiles
-        "light_intensity": 1, # starting intensity; max intensity = light_radius
-        "light_flickering": [0.5, 1, 2], # [timer_secs, min_intensity, max_intensity]
-        "timer_convertion": [90, ["ashes", "ashes", "ashes"], []] # [timer_secs, items_convert, structures_convert]
-    },
-    "fire_place": {
-        "mined_with": {
-            "stone_hatchet": {"damage": 5, "dur_damage": 2}
-        },
-        "broken_drop": ["ashes", "ashes", "charcoal", "ashes", "charcoal"],
-        "light_radius": 10, 
-        "light_intensity": 5,
-        "light_flickering": [0.2, 1, 6],
-        "timer_convertion": [120, ["ashes", "ashes", "ashes", "ashes", "ashes"], []],
-        "fuelers": { # restarts timer
-            "stick": {"timer_add": 30, "return_item": None},
-            "wood_dust": {"timer_add": 10, "return_item": None},
-            "cotton_boll": {"timer_add": 5, "return_item": None}
-        },
-        "cooks": {
-            "dried_clay_cup": {"timer": 60, "cooks_into": "ceramic_cup"},
-            "saltwater_ceramic_cup": {"timer": 20, "cooks_into": "drinkable_water_ceramic_cup"}
-        }
-    }
-}
+STRUCTURE_IMAGE_FILES = CONTENT["structure_image_files"]
+STRUCTURE_IMAGES = TEXTURES.group(STRUCTURE_IMAGE_FILES, (STRUCTURE_SIZE, STRUCTURE_SIZE))
+
+STRUCTURE_ITEM_INTERACTIONS = CONTENT["structure_item_interactions"]
+STRUCTURE_STATS = CONTENT["structure_stats"]
+STRUCTURE_SPECIALS = CONTENT["structure_specials"]
 
 # === STRUCTURES ===
 structures = []
@@ -1625,20 +1410,13 @@ down_arrow_rect.centerx = structure_frame_rect.centerx
 
 # === HELPER: Structure Crafting Logic ===
 def get_structure(type, x, y):
-    return {"type": type, "x": x, "y": y}
+    return entities.Structure(type=type, x=x, y=y)
+
+STRUCTURE_INDEX = CONTENT["structure_index"]  # {input types: structure}
 
 def get_structure_result(inputs):
-    input_types = [i["type"] if isinstance(i, dict) else i for i in inputs]
-    
-    if sorted(input_types) == sorted(["stick", "stick"]):
-        return "cross_sticks"
-    elif sorted(input_types) == sorted(["pointy_stick", "raw_rope"]):
-        return "roped_stick_stake"
-    elif sorted(input_types) == sorted(["pointy_stick"]):
-        return "stick_stake"
-    else:
-        return None
-    
+    return STRUCTURE_INDEX.get(recipe_key(inputs))
+
 def update_structure_gui():
     """Update output slot based on current inputs."""
     global output_structure
@@ -1703,18 +1481,18 @@ def update_structures(dt):
                 if structure["timer"] <= 0:
                     # Spawn converted items
                     for item_type in items_convert:
-                        items.append({
-                            "type": item_type,
-                            "x": structure["x"] + random.randint(-20, 20),
-                            "y": structure["y"] + random.randint(-20, 20)
-                        })
+                        add_entity(items, make_item(
+                            item_type,
+                            structure["x"] + random.randint(-20, 20),
+                            structure["y"] + random.randint(-20, 20),
+                        ))
                     
                     # Convert or remove structure
                     if structs_convert:
                         structure["type"] = random.choice(structs_convert)
                         structure["timer"] = timer  # Reset timer
                     else:
-                        structures.remove(structure)
+                        remove_entity(structures, structure)
                         
             # Handle fueling
             if "fuelers" in specs and structure.get("timer"):
@@ -1732,8 +1510,9 @@ def update_structures(dt):
                             
                             if fuel_data["return_item"]:
                                 item["type"] = fuel_data["return_item"]
+                                change_entity(item, "type")
                             else:
-                                items.remove(item)
+                                remove_entity(items, item)
 
 def handle_cooking(structure, item, dt):
     """Handle cooking items in structures that support it. dt is seconds since last frame."""
@@ -1756,7 +1535,9 @@ def handle_cooking(structure, item, dt):
                 if item["type"] in MAX_ITEM_DUR:
                     item["dur"] = MAX_ITEM_DUR[item["type"]]
                 del item["cook_timer"]
+                change_entity(item, "type", "dur", "cook_timer")
                 return True
+            change_entity(item, "cook_timer")
     
     return False
 
@@ -1843,7 +1624,7 @@ def update_animations(dt):
                     keep_target, keep_tool = handle_tool_action(tool_item, None, plant, None, None)
                     if not keep_target and plant in plants:
                         try:
-                            plants.remove(plant)
+                            remove_entity(plants, plant)
                         except ValueError:
                             pass
                     if not keep_tool:
@@ -1857,9 +1638,17 @@ def update_animations(dt):
 
 # === PERFORMANCE FUNCTIONS ===
 def unload_far_entities(player_x, player_y, max_distance=CHUNK_SIZE*TILE_SIZE*3):
-    global items, plants
-    items = [i for i in items if abs(i["x"] - player_x) < max_distance and abs(i["y"] - player_y) < max_distance]
-    plants = [p for p in plants if abs(p["x"] - player_x) < max_distance and abs(p["y"] - player_y) < max_distance]
+    # Entities in loaded chunks are kept, they're saved with their chunk when it unloads
+    for collection in (items, plants):
+        kept = []
+        for entity in collection:
+            if abs(entity.x - player_x) < max_distance and abs(entity.y - player_y) < max_distance:
+                kept.append(entity)
+            elif chunk_of(entity.x, entity.y) in world_chunks:
+                kept.append(entity)
+            else:
+                WORLD_EVENTS.publish(world_events.ENTITY_REMOVED, chunk_of(entity.x, entity.y), entity)
+        collection[:] = kept
 
 # Before the main loop
 last_unload_time = 0
@@ -1873,7 +1662,7 @@ def find_spawn_location(search_radius=10):
             for dy in range(-radius, radius + 1):
                 world_x = dx
                 world_y = dy
-                r = NOISE(world_x / 100, world_y / 100)
+                r = NOISE_FIELDS.get("height", world_x, world_y)
                 
                 # Match your tile thresholds from generate_chunk()
                 if r >= 0.3:  # 0.3+ means not water
@@ -1883,19 +1672,13 @@ def find_spawn_location(search_radius=10):
     # fallback if somehow all water
     return (0, 0)
 
-def get_current_tile(tile_x, tile_y):
-    # compute chunk coords using floor division so negatives map correctly
-    chunk_x = math.floor(tile_x / CHUNK_SIZE)
-    chunk_y = math.floor(tile_y / CHUNK_SIZE)
-    local_x = tile_x - chunk_x * CHUNK_SIZE
-    local_y = tile_y - chunk_y * CHUNK_SIZE
-
+def get_current_tile_id(tile_x, tile_y):
     # If chunk isn't loaded, do NOT generate it — return None to indicate "unknown/unloaded"
-    if (chunk_x, chunk_y) not in world_chunks:
-        return None
+    return WORLD.get(tile_x, tile_y)
 
-    chunk = world_chunks[(chunk_x, chunk_y)]
-    return chunk[local_y][local_x]
+def get_current_tile(tile_x, tile_y):
+    tile_id = get_current_tile_id(tile_x, tile_y)
+    return None if tile_id is None else TILE_PALETTE[tile_id]
 
 # === DRAW FUNCTIONS ===
 def draw_animations(camera_x, camera_y, dt):
@@ -2165,900 +1948,998 @@ def draw_lighting(camera_x, camera_y):
     # Blit with subtractive blending
     WIN.blit(LIGHT_SURFACE, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
 
-def draw_animals(camera_x, camera_y):
-    """Draw all animals on screen."""
+def draw_animals(camera_x, camera_y, alpha=1.0):
+    """Draw all animals on screen, alpha of the way from their previous to their current position."""
     for animal in animals:
-        screen_x = animal["x"] - camera_x
-        screen_y = animal["y"] - camera_y
+        screen_x = interpolate(getattr(animal, "prev_x", animal.x), animal.x, alpha) - camera_x
+        screen_y = interpolate(getattr(animal, "prev_y", animal.y), animal.y, alpha) - camera_y
         
-        if ANIMAL_IMAGES[animal["type"]]["animated"]:
-            frames = ANIMAL_IMAGES[animal["type"]]["frames"]
-            img = frames[animal["frame"]]
+        if ANIMAL_IMAGES[animal.type]["animated"]:
+            frames = ANIMAL_IMAGES[animal.type]["frames"]
+            img = TEXTURES.get(frames[animal.frame], ANIMAL_TEXTURE_SIZE)
         else:
-            img = ANIMAL_IMAGES[animal["type"]]["image"]
+            img = TEXTURES.get(ANIMAL_IMAGES[animal.type]["image"], ANIMAL_TEXTURE_SIZE)
 
-        img = pygame.transform.rotate(img, -animal["texture_angle"]-90)
+        img = pygame.transform.rotate(img, -animal.texture_angle-90)
             
         img_rect = img.get_rect(center=(screen_x, screen_y))
         WIN.blit(img, img_rect.topleft)
 
+# === SIMULATION ===
+# Everything that advances the world, kept apart from input and drawing so the world
+# can also be stepped without a window (see headless.py).
+def update_player(dt, keys):
+    global player_x, player_y, player_vel_x, player_vel_y, player_center_x, player_center_y
+    global hunger, thirst, stamina, health, dead, paused
+    # === Movement ===
+    # Apply acceleration based on input
+    step = player_acceleration * PLAYER_MOVE_RATE * dt
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        player_x -= step
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        player_x += step
+    if keys[pygame.K_UP] or keys[pygame.K_w]:
+        player_y -= step
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        player_y += step
+
+    # Clamp velocity to prevent excessive speed
+    player_vel_x = max(-MAX_VELOCITY, min(MAX_VELOCITY, player_vel_x))
+    player_vel_y = max(-MAX_VELOCITY, min(MAX_VELOCITY, player_vel_y))
+
+    # Calculate new position using clamped values
+    new_x = player_x + player_vel_x * dt
+    new_y = player_y + player_vel_y * dt
+
+    # Scaled to the step length, so the slowdown per second doesn't depend on SIM_TICK_RATE
+    friction = player_friction ** (PLAYER_MOVE_RATE * dt)
+    player_vel_x *= friction
+    player_vel_y *= friction
+
+    # Check plant collisions using circles
+    player_radius = player_size / 2
+    plant_radius = PLANT_SIZE / 2
+    collided = False
+
+    for plant in plants:
+        if PLANT_STATS[plant.type]["can_collide"]:
+            # Get the actual radius for this plant type and growth stage
+            plant_radius = PLANT_MASKS[plant.type][plant.stage]
+            player_radius = player_mask_radius
+
+            # Calculate centers
+            plant_center_x = plant.x + plant_radius
+            plant_center_y = plant.y + plant_radius
+            player_center_x = new_x 
+            player_center_y = new_y
+
+            # Calculate distance between centers
+            dx = player_center_x - plant_center_x
+            dy = player_center_y - plant_center_y
+            distance = math.sqrt(dx * dx + dy * dy)
+
+            # Check if circles overlap using actual texture-based radii
+            if distance < (player_radius + plant_radius):
+                # Collision detected!
+                collided = True
+
+                # Add collision response
+                if distance > 0:  # Avoid division by zero
+                    # Calculate normalized direction vector
+                    nx = dx / distance
+                    ny = dy / distance
+
+                    # Calculate overlap using actual radii
+                    overlap = (player_radius + plant_radius) - distance
+
+                    # Push player away from collision
+                    new_x = player_center_x + nx * overlap
+                    new_y = player_center_y + ny * overlap
+
+            # Only update if no collision
+            if not collided:
+                player_x = new_x
+                player_y = new_y
+
+    # Only update position if no collision or after collision response
+    player_x = new_x
+    player_y = new_y
+
+    # === UPDATE PLAYER STATS ===
+    # Gradual hunger/thirst decay
+    hunger -= HUNGER_DECAY * dt / 10
+    thirst -= THIRST_DECAY * dt / 10
+
+    # Clamp to 0–MAX
+    hunger = max(0, min(MAX_HUNGER, hunger))
+    thirst = max(0, min(MAX_THIRST, thirst))
+
+    # === STAMINA ===
+    moving = keys[pygame.K_w] or keys[pygame.K_a] or keys[pygame.K_s] or keys[pygame.K_d]
+    if moving:
+        stamina -= STAMINA_DRAIN * dt
+    else:
+        stamina += STAMINA_RECOVER * dt
+    stamina = max(0, min(MAX_STAMINA, stamina))
+
+    # === HEALTH ===
+    # Lose health if starving/dehydrated
+    if hunger <= 0 or thirst <= 0:
+        health -= 5 * dt  # slow damage
+    else:
+        # Small passive regen if full
+        if hunger > 60 and thirst > 60:
+            health += 1 * dt
+    health = max(0, min(MAX_HEALTH, health))
+
+    # === DEATH CHECK ===
+    if health <= 0:
+        dead = True
+        paused = True
+
+def update_cooking(dt):
+    # Check for items being cooked
+    for item in items[:]:
+        if item.type not in COOKABLE_ITEMS:
+            continue
+        for structure in structures:
+            if abs(item["x"] - structure["x"]) < STRUCTURE_SIZE and \
+            abs(item["y"] - structure["y"]) < STRUCTURE_SIZE:
+                handle_cooking(structure, item, dt)
+
+def update_plants(dt):
+    # === UPDATE PLANTS ===
+    for plant in plants:
+        tile_id = get_current_tile_id(int(plant.x // TILE_SIZE), int(plant.y // TILE_SIZE))
+        if tile_id in PLANT_ONLY_TILE_IDS[plant.type]:
+            plant.growth_timer += dt / 60  # convert seconds to minutes
+            stage = plant.stage
+
+            # Only update if there's a stage to grow into (not already fruited/fully grown)
+            next_stage = PLANT_NEXT_STAGE[plant.type][stage]
+            if next_stage != -1:
+                # Check if enough time has passed to move to next stage
+                if plant.growth_timer >= PLANT_STAGE_TIMES[plant.type][stage]:
+                    plant.growth_timer = 0  # reset timer for next stage
+                    plant.stage = next_stage
+
+def update_items(dt):
+    # === UPDATE ITEMS ===
+    for item in items[:]:
+        if item["type"] in ITEM_CONVERT:
+            item["timer"] = item.get("timer", ITEM_CONVERT[item["type"]][0])
+            item["timer"] -= dt
+            if item["timer"] <= 0 and ITEM_CONVERT[item["type"]][1] is not None:
+                item["type"] = ITEM_CONVERT[item["type"]][1]
+                if item["type"] in MAX_ITEM_DUR:
+                    item["dur"] = MAX_ITEM_DUR[item["type"]]
+                del item["timer"]
+            elif item["timer"] <= 0 and ITEM_CONVERT[item["type"]][1] is None:
+                remove_entity(items, item)
+                break
+        if item["type"] in TILE_INTERACTING_ITEMS:
+            tile_x = int(item["x"] // TILE_SIZE)
+            tile_y = int(item["y"] // TILE_SIZE)
+            tile = get_current_tile(tile_x, tile_y)
+            interaction = ITEM_TILE_INTERACTION[item["type"]]
+            if tile in interaction:
+                tile_interaction = interaction[tile]
+                # item conversion (existing)
+                item_converts = tile_interaction.get("item_converts")
+                if item_converts is not None:
+                    item["type"] = item_converts
+                    if item["type"] in MAX_ITEM_DUR:
+                        item["dur"] = MAX_ITEM_DUR[item["type"]]
+
+                # tile conversion (new)
+                tile_converts = tile_interaction.get("tile_converts")
+                if tile_converts is not None:
+                    set_tile(tile_x, tile_y, tile_converts)
+
+        if "dur" in item and item["dur"] <= 0:
+            remove_entity(items, item)
+
+# === SHARDED SIMULATION ===
+# With SIM_WORKERS > 0, animals, plants and items are stepped by that many worker processes,
+# each owning the chunk regions a sharding.ShardMap gives it (see sharding.ShardHost and
+# sharding.ShardWorker). This process still owns the world: input, rendering and saving.
+SIM_WORKERS = 0
+SHARD_HALO = DEFAULT_ANIMAL_WANDER_RADIUS * TILE_SIZE  # how far animals look for food
+SHARDS = None  # sharding.ShardHost while sharded
+# Taken at import: a worker spawned from a game started as a script runs this module as
+# __mp_main__, and only the module being imported is the one its functions see
+SHARD_WORKER = sharding.ShardWorker(sys.modules[__name__]) if sharding.in_worker() else None
+
+def run_shard(task):
+    """Runs a task in a shard worker process, which imports this module to find it."""
+    return SHARD_WORKER.run(task)
+
+def start_sharding(workers):
+    """Step animals, plants and items on `workers` processes from now on."""
+    global SHARDS
+    try:
+        SHARDS = sharding.ShardHost(sys.modules[__name__], workers, SHARD_HALO, run_shard)
+    except (OSError, EOFError) as error:
+        print(f"Sharded simulation off, its worker processes didn't start: {error!r}")
+
+def stop_sharding():
+    """Step everything in this process again."""
+    global SHARDS
+    if SHARDS is not None:
+        SHARDS.close()
+        SHARDS = None
+
+def step_world(dt, keys):
+    """Advance the world by dt seconds. keys: pressed key state, indexable by pygame key
+    constants (pygame.key.get_pressed() or a stand-in)."""
+    global sim_time
+    if not paused:
+        sim_time += dt
+        PROFILER.phase("player")
+        update_player(dt, keys)
+
+        # Update structure effects
+        PROFILER.phase("structures")
+        update_structure_lighting()
+        update_structures(dt)
+        update_cooking(dt)
+
+    if not paused and SHARDS is not None:
+        PROFILER.phase("shards")
+        SHARDS.step(dt)
+        publish_moves(animals)
+    elif not paused:
+        PROFILER.phase("animals")
+        update_animals(dt)
+        publish_moves(animals)
+        PROFILER.phase("plants")
+        update_plants(dt)
+        PROFILER.phase("items")
+        update_items(dt)
+
+    PROFILER.phase("animations")
+    update_animations(dt)
+
+def store_previous_positions():
+    """Remember where moving entities were before a step, for render interpolation."""
+    global prev_player_x, prev_player_y
+    prev_player_x, prev_player_y = player_x, player_y
+    for animal in animals:
+        animal.prev_x = animal.x
+        animal.prev_y = animal.y
+
+def run_simulation(frame_dt, keys):
+    """Run the fixed steps that frame_dt seconds of real time cover.
+    Returns how far (0-1) the world is between the last step and the next."""
+    global sim_accumulator
+    sim_accumulator += frame_dt
+    steps = 0
+    while sim_accumulator >= SIM_DT and steps < MAX_SIM_STEPS_PER_FRAME:
+        store_previous_positions()
+        step_world(SIM_DT, keys)
+        sim_accumulator -= SIM_DT
+        steps += 1
+    if sim_accumulator >= SIM_DT:
+        # Too far behind to catch up, drop the backlog
+        sim_accumulator %= SIM_DT
+    return sim_accumulator / SIM_DT
+
+def interpolate(previous, current, alpha):
+    return previous + (current - previous) * alpha
+
+def maintain_world():
+    """Every so often unload entities and chunks far from the player."""
+    global last_unload_time, last_unload_chunks_time, last_player_chunk
+    PROFILER.phase("unload")
+    # Game time, not wall-clock time, so the headless driver unloads like the game does
+    current_time = sim_time
+    if current_time - last_unload_time > UNLOAD_INTERVAL:
+        unload_far_entities(player_x, player_y, CHUNK_SIZE*TILE_SIZE*4)
+        last_unload_time = current_time
+
+    player_chunk_x = (player_x // TILE_SIZE) // CHUNK_SIZE
+    player_chunk_y = (player_y // TILE_SIZE) // CHUNK_SIZE
+    # Load and unload chunks only occasionally or when the player changes chunk to reduce hitches
+    if (player_chunk_x, player_chunk_y) != last_player_chunk or (current_time - last_unload_chunks_time) > UNLOAD_CHUNK_INTERVAL:
+        CHUNKS.update(int(player_chunk_x), int(player_chunk_y), current_time)
+        last_unload_chunks_time = current_time
+        last_player_chunk = (player_chunk_x, player_chunk_y)
+
 # === MAIN LOOP ===
 player_x, player_y = find_spawn_location()
+prev_player_x, prev_player_y = player_x, player_y
 paused = False
 dead = False
 
-items.append({"type": "ceramic_cup", "x": player_x, "y": player_y})
-items.append({"type": "stone_hatchet", "x": player_x, "y": player_y, "dur": 50})
+add_entity(items, make_item("ceramic_cup", player_x, player_y))
+add_entity(items, make_item("stone_hatchet", player_x, player_y, dur=50))
 
-structures.append({"type": "fire_place", "x": player_x-500, "y": player_y-500, "timer": 500})
+fire_place = get_structure("fire_place", player_x-500, player_y-500)
+fire_place["timer"] = 500
+add_entity(structures, fire_place)
 
 shown_info = None
 shown_button = pygame.Rect(0,0,0,0)
 
 hitboxes = False
 
-running = True
-while running:
-    for item in items:
-        item["entity"] = "item"
-
-    for plant in plants:
-        plant["entity"] = "plant"
-
-    for structure in structures:
-        structure["entity"] = "structure"
-
-    dt = clock.tick(60) / 1000
-    mouse_pos = pygame.mouse.get_pos()
-    world_mouse_x = mouse_pos[0] + (player_x - WIDTH // 2)
-    world_mouse_y = mouse_pos[1] + (player_y - HEIGHT // 2)
-    world_mouse = (world_mouse_x, world_mouse_y)
-
-    now = time.time()
-    total_items = len(items)
-    total_structs = len(structures)
-    if (total_items != last_items_count or total_structs != last_structures_count
-            or now - last_qt_rebuild_time > QT_REBUILD_INTERVAL):
-        rebuild_quadtree()
-        last_qt_rebuild_time = now
-        last_items_count = total_items
-        last_structures_count = total_structs
-
-# event_here
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if not paused:
-            # === Toggle Crafting GUI ===
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_e: # Open crafting GUI
-                    crafting_visible = not crafting_visible
-                    if crafting_structures_visible:
-                        crafting_structures_visible = False
-                    if crafting_visible:
-                        update_craft_output()
-                    else:
-                        # Return items in craft slots to inventory
-                        for i in range(2):
-                            if craft_slots[i]:
-                                for j in range(2):
-                                    if inventory[j] is None:
-                                        inventory[j] = craft_slots[i]
-                                        craft_slots[i] = None
-                                        break
-                elif event.key == pygame.K_F3:
-                    hitboxes = not hitboxes
-                elif event.key == pygame.K_h: # Harvest a plant
-                    for plant in plants[:]:
-                        plant_rect = pygame.Rect(plant["x"], plant["y"], PLANT_SIZE, PLANT_SIZE)
-                        distance = ((player_x - plant_rect.centerx) ** 2 +
-                                    (player_y - plant_rect.centery) ** 2) ** 0.5
-                        if distance < player_size*2 and plant_rect.collidepoint(world_mouse):
-                            plant_stats = PLANT_STATS["mung_bean"]
-                            if plant["growth_stage"] == plant_stats["last_stage_last"]:
-                                stage_drop = "lastlast_drop"
-                            elif plant["growth_stage"] == plant_stats["last_stage"]:
-                                stage_drop = "last_drop"
-                            else:
-                                stage_drop = "prelast_drop"
-                            drops = plant_stats[stage_drop]
-                            if drops is not None:
-                                for drop in drops:
-                                    items.append({"type": drop, "x": plant["x"]+random.randint(-TILE_SIZE//2, TILE_SIZE//2), "y": plant["y"]+random.randint(-TILE_SIZE//2, TILE_SIZE//2)})
-                            plants.remove(plant)
-                elif event.key == pygame.K_p: # Open crafting structures GUI
-                    crafting_structures_visible = not crafting_structures_visible
-                    if crafting_visible:
-                        crafting_visible = False
-                if event.key == pygame.K_RETURN and output_structure:
-                    place_x = world_mouse_x
-                    place_y = world_mouse_y
-
-                    structures.append(get_structure(output_structure, place_x, place_y))
-                    structure_crafting_slots = [None, None]
-                    update_structure_gui()
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT] and not (crafting_structures_visible or crafting_visible):
-                    if event.key == pygame.K_1 and inventory[0] is not None:
-                        item = inventory[0]
-                        inventory[0] = None
-                        item["x"] = player_x
-                        item["y"] = player_y
-                        items.append(item)
-                    elif event.key == pygame.K_2 and inventory[1] is not None:
-                        item = inventory[1]
-                        inventory[1] = None
-                        item["x"] = player_x
-                        item["y"] = player_y
-                        items.append(item)
-                elif not (crafting_structures_visible or crafting_visible):
-                    if event.key == pygame.K_1 and inventory[0] is not None:
-                        item = inventory[0]
-                        name = item["type"]
-                        if name in FOOD_STATS:
-                            food = FOOD_STATS[name]
-                            hunger = min(MAX_HUNGER, hunger + food["hunger"])
-                            thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
-                            stamina = min(MAX_STAMINA, stamina + food["stamina"])
-                            # remove eaten item
-                            if inventory[0] and inventory[0]["type"] == name:
-                                food_converts = FOOD_CONVERTS[inventory[0]["type"]]
-                                if food_converts is not None:
-                                    inventory[0]["type"] = food_converts
-                                    shown_info = None
-                                else:
-                                    inventory[0] = None
-                                break
-                        elif name in STORAGE_ITEMS:
-                            if storage_open is not None:
-                                storage_open = None
-                            else:
-                                open_storage(0)
-                    elif event.key == pygame.K_2 and inventory[1] is not None:
-                        item = inventory[1]
-                        name = item["type"]
-                        if name in FOOD_STATS:
-                            food = FOOD_STATS[name]
-                            hunger = min(MAX_HUNGER, hunger + food["hunger"])
-                            thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
-                            stamina = min(MAX_STAMINA, stamina + food["stamina"])
-                            # remove eaten item
-                            if inventory[1] and inventory[1]["type"] == name:
-                                food_converts = FOOD_CONVERTS[inventory[1]["type"]]
-                                if food_converts is not None:
-                                    inventory[1]["type"] = food_converts
-                                    shown_info = None
-                                else:
-                                    inventory[1] = None
-                                break
-                        elif name in STORAGE_ITEMS:
-                            if storage_open is not None:
-                                storage_open = None
-                            else:
-                                open_storage(1)
-
-            # === Mouse down ===
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # If a storage window is open, handle simple transfers first
-                if storage_open is not None:
-                    if event.button == 1 and shown_button.collidepoint(mouse_pos):
-                        storage_open = None
-                        break
-
-                    # validate storage item still present
-                    if storage_open < len(inventory):
-                        st_item = inventory[storage_open]
-                    else:
-                        st_item = None
-                    if not st_item or st_item["type"] not in STORAGE_ITEMS:
-                        close_storage()
-                    else:
-                        st_def = STORAGE_ITEMS[st_item["type"]]
-                        slot_rects = get_storage_slot_rects(st_def)
-                        # Click on storage slot -> try to move to first empty inventory slot
-                        for si, srect in enumerate(slot_rects):
-                            if srect.collidepoint(mouse_pos) and event.button == 1:
-                                contents = st_item.setdefault("contents", [None]*st_def["slots"])
-                                if si < len(contents) and contents[si]:
-                                    for j in range(len(inventory)):
+# Top-left of the view drawn last frame; clicks land on what was drawn there
+camera_x = player_x - WIDTH // 2
+camera_y = player_y - HEIGHT // 2
+
+if __name__ == "__main__":
+    if SIM_WORKERS:
+        start_sharding(SIM_WORKERS)
+    running = True
+    while running:
+        dt = clock.tick(MAX_FPS) / 1000
+        PROFILER.begin_frame()
+        mouse_pos = pygame.mouse.get_pos()
+        world_mouse_x = mouse_pos[0] + camera_x
+        world_mouse_y = mouse_pos[1] + camera_y
+        world_mouse = (world_mouse_x, world_mouse_y)
+
+        PROFILER.phase("quadtree")
+        if quadtree_dirty:
+            rebuild_quadtree()
+            quadtree_dirty = False
+
+    # event_here
+        PROFILER.phase("input")
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                profiler_visible = not profiler_visible
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                os.makedirs(os.path.dirname(TRACE_PATH), exist_ok=True)
+                PROFILER.dump_chrome_trace(TRACE_PATH)
+                print(f"Wrote frame trace to {TRACE_PATH}")
+
+            if not paused:
+                # === Toggle Crafting GUI ===
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_e: # Open crafting GUI
+                        crafting_visible = not crafting_visible
+                        if crafting_structures_visible:
+                            crafting_structures_visible = False
+                        if crafting_visible:
+                            update_craft_output()
+                        else:
+                            # Return items in craft slots to inventory
+                            for i in range(2):
+                                if craft_slots[i]:
+                                    for j in range(2):
                                         if inventory[j] is None:
-                                            inventory[j] = contents[si]
-                                            contents[si] = None
+                                            inventory[j] = craft_slots[i]
+                                            craft_slots[i] = None
                                             break
-                                break
+                    elif event.key == pygame.K_F3:
+                        hitboxes = not hitboxes
+                    elif event.key == pygame.K_h: # Harvest a plant
+                        for plant in plants[:]:
+                            plant_rect = pygame.Rect(plant["x"], plant["y"], PLANT_SIZE, PLANT_SIZE)
+                            distance = ((player_x - plant_rect.centerx) ** 2 +
+                                        (player_y - plant_rect.centery) ** 2) ** 0.5
+                            if distance < player_size*2 and plant_rect.collidepoint(world_mouse):
+                                plant_stats = PLANT_STATS["mung_bean"]
+                                if plant["growth_stage"] == plant_stats["last_stage_last"]:
+                                    stage_drop = "lastlast_drop"
+                                elif plant["growth_stage"] == plant_stats["last_stage"]:
+                                    stage_drop = "last_drop"
+                                else:
+                                    stage_drop = "prelast_drop"
+                                drops = plant_stats[stage_drop]
+                                if drops is not None:
+                                    for drop in drops:
+                                        add_entity(items, make_item(drop, plant["x"]+random.randint(-TILE_SIZE//2, TILE_SIZE//2), plant["y"]+random.randint(-TILE_SIZE//2, TILE_SIZE//2)))
+                                remove_entity(plants, plant)
+                    elif event.key == pygame.K_p: # Open crafting structures GUI
+                        crafting_structures_visible = not crafting_structures_visible
+                        if crafting_visible:
+                            crafting_visible = False
+                    if event.key == pygame.K_RETURN and output_structure:
+                        place_x = world_mouse_x
+                        place_y = world_mouse_y
+
+                        add_entity(structures, get_structure(output_structure, place_x, place_y))
+                        structure_crafting_slots = [None, None]
+                        update_structure_gui()
+                    keys = pygame.key.get_pressed()
+                    if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT] and not (crafting_structures_visible or crafting_visible):
+                        if event.key == pygame.K_1 and inventory[0] is not None:
+                            item = inventory[0]
+                            inventory[0] = None
+                            item["x"] = player_x
+                            item["y"] = player_y
+                            add_entity(items, item)
+                        elif event.key == pygame.K_2 and inventory[1] is not None:
+                            item = inventory[1]
+                            inventory[1] = None
+                            item["x"] = player_x
+                            item["y"] = player_y
+                            add_entity(items, item)
+                    elif not (crafting_structures_visible or crafting_visible):
+                        if event.key == pygame.K_1 and inventory[0] is not None:
+                            item = inventory[0]
+                            name = item["type"]
+                            if name in FOOD_STATS:
+                                food = FOOD_STATS[name]
+                                hunger = min(MAX_HUNGER, hunger + food["hunger"])
+                                thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
+                                stamina = min(MAX_STAMINA, stamina + food["stamina"])
+                                # remove eaten item
+                                if inventory[0] and inventory[0]["type"] == name:
+                                    food_converts = FOOD_CONVERTS[inventory[0]["type"]]
+                                    if food_converts is not None:
+                                        inventory[0]["type"] = food_converts
+                                        shown_info = None
+                                    else:
+                                        inventory[0] = None
+                                    break
+                            elif name in STORAGE_ITEMS:
+                                if storage_open is not None:
+                                    storage_open = None
+                                else:
+                                    open_storage(0)
+                        elif event.key == pygame.K_2 and inventory[1] is not None:
+                            item = inventory[1]
+                            name = item["type"]
+                            if name in FOOD_STATS:
+                                food = FOOD_STATS[name]
+                                hunger = min(MAX_HUNGER, hunger + food["hunger"])
+                                thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
+                                stamina = min(MAX_STAMINA, stamina + food["stamina"])
+                                # remove eaten item
+                                if inventory[1] and inventory[1]["type"] == name:
+                                    food_converts = FOOD_CONVERTS[inventory[1]["type"]]
+                                    if food_converts is not None:
+                                        inventory[1]["type"] = food_converts
+                                        shown_info = None
+                                    else:
+                                        inventory[1] = None
+                                    break
+                            elif name in STORAGE_ITEMS:
+                                if storage_open is not None:
+                                    storage_open = None
+                                else:
+                                    open_storage(1)
+
+                # === Mouse down ===
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    # If a storage window is open, handle simple transfers first
+                    if storage_open is not None:
+                        if event.button == 1 and shown_button.collidepoint(mouse_pos):
+                            storage_open = None
+                            break
+
+                        # validate storage item still present
+                        if storage_open < len(inventory):
+                            st_item = inventory[storage_open]
+                        else:
+                            st_item = None
+                        if not st_item or st_item["type"] not in STORAGE_ITEMS:
+                            close_storage()
                         else:
-                            # Click on inventory to put item into storage
                             st_def = STORAGE_ITEMS[st_item["type"]]
-                            forbidden_items = st_def["not_allowed_items"]
-                            for inv_i, inv_rect in enumerate(get_inventory_slot_rects()):
-                                if inv_rect.collidepoint(mouse_pos) and event.button == 1:
-                                    if inventory[inv_i] and inv_i != storage_open:
-                                        contents = st_item.setdefault("contents", [None]*st_def["slots"])
-                                        for k in range(len(contents)):
-                                            if contents[k] is None and inventory[inv_i]["type"] not in forbidden_items:
-                                                contents[k] = inventory[inv_i]
-                                                inventory[inv_i] = None
+                            slot_rects = get_storage_slot_rects(st_def)
+                            # Click on storage slot -> try to move to first empty inventory slot
+                            for si, srect in enumerate(slot_rects):
+                                if srect.collidepoint(mouse_pos) and event.button == 1:
+                                    contents = st_item.setdefault("contents", [None]*st_def["slots"])
+                                    if si < len(contents) and contents[si]:
+                                        for j in range(len(inventory)):
+                                            if inventory[j] is None:
+                                                inventory[j] = contents[si]
+                                                contents[si] = None
                                                 break
                                     break
-                        # prevent other click handlers from running when interacting with storage
-                        continue
-
-                # GUI closed → pick/drop
-                if not (crafting_visible or crafting_structures_visible):
-                    if event.button == 1:
-                        # Handle mining/chopping when holding appropriate tool
-                        for slot in range(2):
-                            if inventory[slot] and inventory[slot]["type"] in MINING_TOOLS:
-                                # Try mining ores
-                                tile_x = int(world_mouse_x // TILE_SIZE)
-                                tile_y = int(world_mouse_y // TILE_SIZE)
-                                tile = get_current_tile(tile_x, tile_y)
+                            else:
+                                # Click on inventory to put item into storage
+                                st_def = STORAGE_ITEMS[st_item["type"]]
+                                forbidden_items = st_def["not_allowed_items"]
+                                for inv_i, inv_rect in enumerate(get_inventory_slot_rects()):
+                                    if inv_rect.collidepoint(mouse_pos) and event.button == 1:
+                                        if inventory[inv_i] and inv_i != storage_open:
+                                            contents = st_item.setdefault("contents", [None]*st_def["slots"])
+                                            for k in range(len(contents)):
+                                                if contents[k] is None and inventory[inv_i]["type"] not in forbidden_items:
+                                                    contents[k] = inventory[inv_i]
+                                                    inventory[inv_i] = None
+                                                    break
+                                        break
+                            # prevent other click handlers from running when interacting with storage
+                            continue
+
+                    # GUI closed → pick/drop
+                    if not (crafting_visible or crafting_structures_visible):
+                        if event.button == 1:
+                            # Handle mining/chopping when holding appropriate tool
+                            for slot in range(2):
+                                if inventory[slot] and inventory[slot]["type"] in MINING_TOOLS:
+                                    # Try mining ores
+                                    tile_x = int(world_mouse_x // TILE_SIZE)
+                                    tile_y = int(world_mouse_y // TILE_SIZE)
+                                    tile = get_current_tile(tile_x, tile_y)
                                 
-                                if tile in ["sedimentary_iron", "laterite_soil"]:
-                                    # start mining animation; effect applied at hit frame
-                                    start_tool_animation(slot, "mine", inventory[slot], tile_x=tile_x, tile_y=tile_y)
-                                    break
+                                    if tile in ["sedimentary_iron", "laterite_soil"]:
+                                        # start mining animation; effect applied at hit frame
+                                        start_tool_animation(slot, "mine", inventory[slot], tile_x=tile_x, tile_y=tile_y)
+                                        break
                                         
-                                # Try chopping plants
-                                for plant in plants[:]:
-                                    plant_rect = pygame.Rect(
-                                        plant["x"] - PLANT_SIZE//2,
-                                        plant["y"] - PLANT_SIZE//2,
-                                        PLANT_SIZE, PLANT_SIZE
-                                    )
-                                    if plant_rect.collidepoint(world_mouse_x, world_mouse_y):
-                                        # queue a chop animation; effect will be applied at the hit moment
-                                        start_tool_animation(slot, "chop", inventory[slot], target_plant=plant)
+                                    # Try chopping plants
+                                    for plant in plants[:]:
+                                        plant_rect = pygame.Rect(
+                                            plant["x"] - PLANT_SIZE//2,
+                                            plant["y"] - PLANT_SIZE//2,
+                                            PLANT_SIZE, PLANT_SIZE
+                                        )
+                                        if plant_rect.collidepoint(world_mouse_x, world_mouse_y):
+                                            # queue a chop animation; effect will be applied at the hit moment
+                                            start_tool_animation(slot, "chop", inventory[slot], target_plant=plant)
+                                            break
+                        if event.button == 1 and shown_info and shown_info[3].collidepoint(mouse_pos):
+                            # determine which hotbar slot is hovered
+                            hot_i = get_inventory_slot_rects().index(shown_info[1]) if shown_info else -1
+                            name = shown_info[0]
+                            # storage open (toggle now)
+                            if hot_i != -1 and inventory[hot_i] and inventory[hot_i]["type"] in STORAGE_ITEMS:
+                                if storage_open == hot_i:
+                                    close_storage()
+                                else:
+                                    open_storage(hot_i)
+                            # consumable handling (existing)
+                            elif name in FOOD_STATS:
+                                food = FOOD_STATS[name]
+                                hunger = min(MAX_HUNGER, hunger + food["hunger"])
+                                thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
+                                stamina = min(MAX_STAMINA, stamina + food["stamina"])
+                                # remove eaten item
+                                for i in range(2):
+                                    if inventory[i] and inventory[i]["type"] == name:
+                                        food_converts = FOOD_CONVERTS[inventory[i]["type"]]
+                                        if food_converts is not None:
+                                            inventory[i]["type"] = food_converts
+                                            shown_info = None
+                                        else:
+                                            inventory[i] = None
                                         break
-                    if event.button == 1 and shown_info and shown_info[3].collidepoint(mouse_pos):
-                        # determine which hotbar slot is hovered
-                        hot_i = get_inventory_slot_rects().index(shown_info[1]) if shown_info else -1
-                        name = shown_info[0]
-                        # storage open (toggle now)
-                        if hot_i != -1 and inventory[hot_i] and inventory[hot_i]["type"] in STORAGE_ITEMS:
-                            if storage_open == hot_i:
-                                close_storage()
-                            else:
-                                open_storage(hot_i)
-                        # consumable handling (existing)
-                        elif name in FOOD_STATS:
-                            food = FOOD_STATS[name]
-                            hunger = min(MAX_HUNGER, hunger + food["hunger"])
-                            thirst = max(0, min(MAX_THIRST, thirst + food["thirst"]))
-                            stamina = min(MAX_STAMINA, stamina + food["stamina"])
-                            # remove eaten item
-                            for i in range(2):
-                                if inventory[i] and inventory[i]["type"] == name:
-                                    food_converts = FOOD_CONVERTS[inventory[i]["type"]]
-                                    if food_converts is not None:
-                                        inventory[i]["type"] = food_converts
-                                        shown_info = None
-                                    else:
-                                        inventory[i] = None
-                                    break
-                    player_rect = pygame.Rect(player_x, player_y, player_size, player_size)
-                    # Drop item
-                    for i, rect in enumerate(get_inventory_slot_rects()):
-                        if event.button == 1 and rect.collidepoint(mouse_pos) and inventory[i] is not None:
-                            dropped = inventory[i]
-                            drop_x = player_x
-                            drop_y = player_y
-                            dropped["x"] = drop_x
-                            dropped["y"] = drop_y
+                        player_rect = pygame.Rect(player_x, player_y, player_size, player_size)
+                        # Drop item
+                        for i, rect in enumerate(get_inventory_slot_rects()):
+                            if event.button == 1 and rect.collidepoint(mouse_pos) and inventory[i] is not None:
+                                dropped = inventory[i]
+                                drop_x = player_x
+                                drop_y = player_y
+                                dropped["x"] = drop_x
+                                dropped["y"] = drop_y
                             
-                            # Check for nearby structures
-                            structure_range = STRUCTURE_SIZE  # Define this constant if not already defined
-                            interacted = False
+                                # Check for nearby structures
+                                structure_range = STRUCTURE_SIZE  # Define this constant if not already defined
+                                interacted = False
                             
-                            for structure in structures:
-                                structure_rect = pygame.Rect(structure["x"], structure["y"], STRUCTURE_SIZE, STRUCTURE_SIZE)
-                                if ((structure_rect.centerx - drop_x) ** 2 + 
-                                    (structure_rect.centery - drop_y) ** 2) <= structure_range ** 2:
-                                    # Found nearby structure, handle interaction
-                                    keep_item = handle_structure_interaction(structure, dropped)
-                                    if not keep_item:
-                                        inventory[i] = None
-                                        interacted = True
-                                        break
+                                for structure in structures:
+                                    structure_rect = pygame.Rect(structure["x"], structure["y"], STRUCTURE_SIZE, STRUCTURE_SIZE)
+                                    if ((structure_rect.centerx - drop_x) ** 2 + 
+                                        (structure_rect.centery - drop_y) ** 2) <= structure_range ** 2:
+                                        # Found nearby structure, handle interaction
+                                        keep_item = handle_structure_interaction(structure, dropped)
+                                        if not keep_item:
+                                            inventory[i] = None
+                                            interacted = True
+                                            break
                                     
-                            if not interacted:
-                                # No interaction occurred, drop item normally
-                                items.append(dropped)
-                                inventory[i] = None
-                    else:
-                        # First: check deferred/generated items on this tile (not yet in `items`)
-                        tile_x = int(world_mouse_x // TILE_SIZE)
-                        tile_y = int(world_mouse_y // TILE_SIZE)
-                        if (tile_x, tile_y) in WORLD_TILE_ITEMS and event.button == 1:
-                            # promote generated item into world or inventory
-                            gen_item = WORLD_TILE_ITEMS.pop((tile_x, tile_y))
-                            # place item at tile center
-                            gen_item["x"] = tile_x * TILE_SIZE + TILE_SIZE // 2
-                            gen_item["y"] = tile_y * TILE_SIZE + TILE_SIZE // 2
-
-                            # if player is close enough, try to put directly into inventory
-                            tile_center_x = gen_item["x"]
-                            tile_center_y = gen_item["y"]
-                            distance = ((player_rect.centerx - tile_center_x) ** 2 + (player_rect.centery - tile_center_y) ** 2) ** 0.5
-                            if distance < player_size * 2:
-                                placed_to_inventory = False
-                                for i in range(2):
-                                    if inventory[i] is None:
-                                        inventory[i] = gen_item
-                                        placed_to_inventory = True
-                                        break
-                                if not placed_to_inventory:
-                                    items.append(gen_item)
+                                if not interacted:
+                                    # No interaction occurred, drop item normally
+                                    add_entity(items, dropped)
+                                    inventory[i] = None
+                        else:
+                            # First: check deferred/generated items on this tile (not yet in `items`)
+                            tile_x = int(world_mouse_x // TILE_SIZE)
+                            tile_y = int(world_mouse_y // TILE_SIZE)
+                            gen_item = pop_tile_item(tile_x, tile_y) if event.button == 1 else None
+                            if gen_item is not None:
+                                # promote generated item into world or inventory
+                                # place item at tile center
+                                gen_item["x"] = tile_x * TILE_SIZE + TILE_SIZE // 2
+                                gen_item["y"] = tile_y * TILE_SIZE + TILE_SIZE // 2
+
+                                # if player is close enough, try to put directly into inventory
+                                tile_center_x = gen_item["x"]
+                                tile_center_y = gen_item["y"]
+                                distance = ((player_rect.centerx - tile_center_x) ** 2 + (player_rect.centery - tile_center_y) ** 2) ** 0.5
+                                if distance < player_size * 2:
+                                    placed_to_inventory = False
+                                    for i in range(2):
+                                        if inventory[i] is None:
+                                            inventory[i] = gen_item
+                                            placed_to_inventory = True
+                                            break
+                                    if not placed_to_inventory:
+                                        add_entity(items, gen_item)
+                                        if QT_ROOT:
+                                            QT_ROOT.insert(int(gen_item["x"]), int(gen_item["y"]), gen_item)
+                                else:
+                                    # too far, just spawn into world items so it can be picked later
+                                    add_entity(items, gen_item)
                                     if QT_ROOT:
                                         QT_ROOT.insert(int(gen_item["x"]), int(gen_item["y"]), gen_item)
                             else:
-                                # too far, just spawn into world items so it can be picked later
-                                items.append(gen_item)
+                                # fallback: pick up already-active items via quadtree as before
                                 if QT_ROOT:
-                                    QT_ROOT.insert(int(gen_item["x"]), int(gen_item["y"]), gen_item)
-                        else:
-                            # fallback: pick up already-active items via quadtree as before
-                            if QT_ROOT:
-                                query_rect = pygame.Rect(world_mouse_x - 100, world_mouse_y - 100, 200, 200)
-                                nearby_items = QT_ROOT.query_range(query_rect)
-                                for item in nearby_items:
-                                    item_rect = pygame.Rect(item["x"], item["y"], ITEM_SIZE, ITEM_SIZE)
-                                    distance = ((player_rect.centerx - item_rect.centerx)**2 + (player_rect.centery - item_rect.centery)**2)**0.5
-                                    if event.button == 1 and item_rect.collidepoint(world_mouse) and distance < player_size*2:
-                                        for i in range(2):
-                                            if item in items and inventory[i] is None:
-                                                inventory[i] = item  # directly store the whole item dict
-                                                items.remove(item)
-                                                break
-                                        break
-                # GUI open → drag or craft
-                elif crafting_visible:
-                    if event.button == 1:
-                        # Click arrow to craft
-                        if right_arrow_rect.collidepoint(mouse_pos):
-                            perform_craft()
-                            break
-
-                    # Check crafting slots for drag
-                    for i, rect in enumerate(craft_slot_rects):
-                        if rect.collidepoint(mouse_pos) and craft_slots[i]:
-                            if event.button == 1:
-                                drag_item = craft_slots[i]
-                                craft_slots[i] = None
-                                drag_origin = ("craft", i)
-                                drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
-                                break
-                            elif event.button == 3:
-                                # Right-click to remove item back to inventory
-                                if craft_slots[i]:
-                                    for j in range(2):
-                                        if inventory[j] is None:
-                                            inventory[j] = craft_slots[i]
-                                            craft_slots[i] = None
-                                            update_craft_output()
+                                    query_rect = pygame.Rect(world_mouse_x - 100, world_mouse_y - 100, 200, 200)
+                                    nearby_items = QT_ROOT.query_range(query_rect)
+                                    for item in nearby_items:
+                                        item_rect = pygame.Rect(item["x"], item["y"], ITEM_SIZE, ITEM_SIZE)
+                                        distance = ((player_rect.centerx - item_rect.centerx)**2 + (player_rect.centery - item_rect.centery)**2)**0.5
+                                        if event.button == 1 and item_rect.collidepoint(world_mouse) and distance < player_size*2:
+                                            for i in range(2):
+                                                if item in items and inventory[i] is None:
+                                                    inventory[i] = item  # directly store the whole item dict
+                                                    remove_entity(items, item)
+                                                    break
                                             break
+                    # GUI open → drag or craft
+                    elif crafting_visible:
+                        if event.button == 1:
+                            # Click arrow to craft
+                            if right_arrow_rect.collidepoint(mouse_pos):
+                                perform_craft()
                                 break
 
-                    # Check inventory slots for drag
-                    for i, rect in enumerate(get_inventory_slot_rects()):
-                        if rect.collidepoint(mouse_pos) and inventory[i]:
-                            if event.button == 1:
-                                drag_item = inventory[i]
-                                inventory[i] = None
-                                drag_origin = ("inventory", i)
-                                drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
-                                break
-                            elif event.button == 3:
-                                # Right-click to move item to crafting slot
-                                if inventory[i]:
-                                    for j, craft_rect in enumerate(craft_slot_rects):
-                                        if not craft_slots[j]:
-                                            craft_slots[j] = inventory[i]
-                                            inventory[i] = None
-                                            update_craft_output()
-                                            break
-                                break
-                elif crafting_structures_visible:
-                    # Check crafting slots for drag
-                    for i, rect in enumerate(structure_crafting_slot_rects):
-                        if rect.collidepoint(mouse_pos) and structure_crafting_slots[i]:
-                            if event.button == 1:
-                                drag_item = structure_crafting_slots[i]
-                                structure_crafting_slots[i] = None
-                                drag_origin = ("structure", i)
-                                drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                        # Check crafting slots for drag
+                        for i, rect in enumerate(craft_slot_rects):
+                            if rect.collidepoint(mouse_pos) and craft_slots[i]:
+                                if event.button == 1:
+                                    drag_item = craft_slots[i]
+                                    craft_slots[i] = None
+                                    drag_origin = ("craft", i)
+                                    drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                                    break
+                                elif event.button == 3:
+                                    # Right-click to remove item back to inventory
+                                    if craft_slots[i]:
+                                        for j in range(2):
+                                            if inventory[j] is None:
+                                                inventory[j] = craft_slots[i]
+                                                craft_slots[i] = None
+                                                update_craft_output()
+                                                break
+                                    break
+
+                        # Check inventory slots for drag
+                        for i, rect in enumerate(get_inventory_slot_rects()):
+                            if rect.collidepoint(mouse_pos) and inventory[i]:
+                                if event.button == 1:
+                                    drag_item = inventory[i]
+                                    inventory[i] = None
+                                    drag_origin = ("inventory", i)
+                                    drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                                    break
+                                elif event.button == 3:
+                                    # Right-click to move item to crafting slot
+                                    if inventory[i]:
+                                        for j, craft_rect in enumerate(craft_slot_rects):
+                                            if not craft_slots[j]:
+                                                craft_slots[j] = inventory[i]
+                                                inventory[i] = None
+                                                update_craft_output()
+                                                break
+                                    break
+                    elif crafting_structures_visible:
+                        # Check crafting slots for drag
+                        for i, rect in enumerate(structure_crafting_slot_rects):
+                            if rect.collidepoint(mouse_pos) and structure_crafting_slots[i]:
+                                if event.button == 1:
+                                    drag_item = structure_crafting_slots[i]
+                                    structure_crafting_slots[i] = None
+                                    drag_origin = ("structure", i)
+                                    drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                                    break
+                                elif event.button == 3:
+                                    # Right-click to remove item back to inventory
+                                    if structure_crafting_slots[i]:
+                                        for j in range(2):
+                                            if inventory[j] is None:
+                                                inventory[j] = structure_crafting_slots[i]
+                                                structure_crafting_slots[i] = None
+                                                update_structure_gui()
+                                                break
+                                    break
+
+                        # Check inventory slots for drag
+                        for i, rect in enumerate(get_inventory_slot_rects()):
+                            if rect.collidepoint(mouse_pos) and inventory[i]:
+                                if event.button == 1:
+                                    drag_item = inventory[i]
+                                    inventory[i] = None
+                                    drag_origin = ("inventory", i)
+                                    drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                                    break
+                                elif event.button == 3:
+                                    # Right-click to move item to crafting slot
+                                    if inventory[i]:
+                                        for j, craft_rect in enumerate(structure_crafting_slot_rects):
+                                            if not structure_crafting_slots[j]:
+                                                structure_crafting_slots[j] = inventory[i]
+                                                inventory[i] = None
+                                                update_structure_gui()
+                                                break
+                                    break
+
+                # === Mouse up ===
+                if event.type == pygame.MOUSEBUTTONUP and event.button == 1 and drag_item:
+                    placed = False
+
+                    if crafting_visible:
+                        for i, rect in enumerate(craft_slot_rects):
+                            if rect.collidepoint(mouse_pos) and not craft_slots[i]:
+                                craft_slots[i] = drag_item
+                                placed = True
                                 break
-                            elif event.button == 3:
-                                # Right-click to remove item back to inventory
-                                if structure_crafting_slots[i]:
-                                    for j in range(2):
-                                        if inventory[j] is None:
-                                            inventory[j] = structure_crafting_slots[i]
-                                            structure_crafting_slots[i] = None
-                                            update_structure_gui()
-                                            break
+                        for i, rect in enumerate(get_inventory_slot_rects()):
+                            if rect.collidepoint(mouse_pos) and not inventory[i]:
+                                inventory[i] = drag_item
+                                placed = True
                                 break
+                        update_craft_output()
 
-                    # Check inventory slots for drag
-                    for i, rect in enumerate(get_inventory_slot_rects()):
-                        if rect.collidepoint(mouse_pos) and inventory[i]:
-                            if event.button == 1:
-                                drag_item = inventory[i]
-                                inventory[i] = None
-                                drag_origin = ("inventory", i)
-                                drag_offset = (mouse_pos[0] - rect.x, mouse_pos[1] - rect.y)
+                    if crafting_structures_visible:
+                        for i, rect in enumerate(structure_crafting_slot_rects):
+                            if rect.collidepoint(mouse_pos) and not structure_crafting_slots[i]:
+                                structure_crafting_slots[i] = drag_item
+                                placed = True
                                 break
-                            elif event.button == 3:
-                                # Right-click to move item to crafting slot
-                                if inventory[i]:
-                                    for j, craft_rect in enumerate(structure_crafting_slot_rects):
-                                        if not structure_crafting_slots[j]:
-                                            structure_crafting_slots[j] = inventory[i]
-                                            inventory[i] = None
-                                            update_structure_gui()
-                                            break
+                        for i, rect in enumerate(get_inventory_slot_rects()):
+                            if rect.collidepoint(mouse_pos) and not inventory[i]:
+                                inventory[i] = drag_item
+                                placed = True
                                 break
+                        update_structure_gui()
 
-            # === Mouse up ===
-            if event.type == pygame.MOUSEBUTTONUP and event.button == 1 and drag_item:
-                placed = False
-
-                if crafting_visible:
-                    for i, rect in enumerate(craft_slot_rects):
-                        if rect.collidepoint(mouse_pos) and not craft_slots[i]:
-                            craft_slots[i] = drag_item
-                            placed = True
-                            break
-                    for i, rect in enumerate(get_inventory_slot_rects()):
-                        if rect.collidepoint(mouse_pos) and not inventory[i]:
-                            inventory[i] = drag_item
-                            placed = True
-                            break
-                    update_craft_output()
-
-                if crafting_structures_visible:
-                    for i, rect in enumerate(structure_crafting_slot_rects):
-                        if rect.collidepoint(mouse_pos) and not structure_crafting_slots[i]:
-                            structure_crafting_slots[i] = drag_item
-                            placed = True
-                            break
-                    for i, rect in enumerate(get_inventory_slot_rects()):
-                        if rect.collidepoint(mouse_pos) and not inventory[i]:
-                            inventory[i] = drag_item
-                            placed = True
-                            break
-                    update_structure_gui()
+                    if not placed and drag_origin:
+                        origin_type, idx = drag_origin
+                        if origin_type == "inventory":
+                            inventory[idx] = drag_item
+                        elif origin_type == "craft":
+                            craft_slots[idx] = drag_item
+                        elif origin_type == "structure":
+                            structure_crafting_slots[idx] = drag_item
 
-                if not placed and drag_origin:
-                    origin_type, idx = drag_origin
-                    if origin_type == "inventory":
-                        inventory[idx] = drag_item
-                    elif origin_type == "craft":
-                        craft_slots[idx] = drag_item
-                    elif origin_type == "structure":
-                        structure_crafting_slots[idx] = drag_item
+                    drag_item = None
+                    drag_origin = None
+    # event_here
 
-                drag_item = None
-                drag_origin = None
-# event_here
-
-    if not paused:
-        past_dt = dt
-        dt = min(dt, MAX_DELTA_TIME)
-        # === Movement ===
         keys = pygame.key.get_pressed()
-        # Apply acceleration based on input
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            player_x -= player_acceleration
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            player_x += player_acceleration
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            player_y -= player_acceleration
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            player_y += player_acceleration
-
-        # Clamp velocity to prevent excessive speed
-        player_vel_x = max(-MAX_VELOCITY, min(MAX_VELOCITY, player_vel_x))
-        player_vel_y = max(-MAX_VELOCITY, min(MAX_VELOCITY, player_vel_y))
-
-        # Calculate new position using clamped values
-        new_x = player_x + player_vel_x * dt
-        new_y = player_y + player_vel_y * dt
-
-        player_vel_x *= player_friction
-        player_vel_y *= player_friction
-        
-        # Check plant collisions using circles
-        player_radius = player_size / 2
-        plant_radius = PLANT_SIZE / 2
-        collided = False
-
-        for plant in plants:
-            if PLANT_STATS[plant["type"]]["can_collide"]:
-                # Get the actual radius for this plant type and growth stage
-                plant_radius = PLANT_MASKS[plant["type"]][plant["growth_stage"]]
-                player_radius = player_mask_radius
-                
-                # Calculate centers
-                plant_center_x = plant["x"] + plant_radius
-                plant_center_y = plant["y"] + plant_radius
-                player_center_x = new_x 
-                player_center_y = new_y
-
-                # Calculate distance between centers
-                dx = player_center_x - plant_center_x
-                dy = player_center_y - plant_center_y
-                distance = math.sqrt(dx * dx + dy * dy)
-
-                # Check if circles overlap using actual texture-based radii
-                if distance < (player_radius + plant_radius):
-                    # Collision detected!
-                    collided = True
-                    
-                    # Add collision response
-                    if distance > 0:  # Avoid division by zero
-                        # Calculate normalized direction vector
-                        nx = dx / distance
-                        ny = dy / distance
-                        
-                        # Calculate overlap using actual radii
-                        overlap = (player_radius + plant_radius) - distance
-                        
-                        # Push player away from collision
-                        new_x = player_center_x + nx * overlap
-                        new_y = player_center_y + ny * overlap
-
-                # Only update if no collision
-                if not collided:
-                    player_x = new_x
-                    player_y = new_y
-
-        # Only update position if no collision or after collision response
-        player_x = new_x
-        player_y = new_y
-
-        # === UPDATE PLAYER STATS ===
-        dt = past_dt
-        # Gradual hunger/thirst decay
-        hunger -= HUNGER_DECAY * dt / 10
-        thirst -= THIRST_DECAY * dt / 10
-
-        # Clamp to 0–MAX
-        hunger = max(0, min(MAX_HUNGER, hunger))
-        thirst = max(0, min(MAX_THIRST, thirst))
-
-        # === STAMINA ===
-        moving = keys[pygame.K_w] or keys[pygame.K_a] or keys[pygame.K_s] or keys[pygame.K_d]
-        if moving:
-            stamina -= STAMINA_DRAIN * dt
-        else:
-            stamina += STAMINA_RECOVER * dt
-        stamina = max(0, min(MAX_STAMINA, stamina))
-
-        # === HEALTH ===
-        # Lose health if starving/dehydrated
-        if hunger <= 0 or thirst <= 0:
-            health -= 5 * dt  # slow damage
-        else:
-            # Small passive regen if full
-            if hunger > 60 and thirst > 60:
-                health += 1 * dt
-        health = max(0, min(MAX_HEALTH, health))
-
-        # === DEATH CHECK ===
-        if health <= 0:
-            dead = True
-            paused = True
+        sim_alpha = run_simulation(dt, keys)
+
+        # === HOTBAR ITEMS INFO ===
+        PROFILER.phase("hud")
+        slot_rects = get_inventory_slot_rects()
+        new_info = None
+        for i in range(2):
+            if slot_rects[i].collidepoint(mouse_pos) and inventory[i] is not None:
+                # store extra flag for storage items
+                is_food = (inventory[i]["type"] in FOOD_STATS)
+                is_storage_item = (inventory[i]["type"] in STORAGE_ITEMS)
+                new_info = [inventory[i]["type"], slot_rects[i], is_food, pygame.Rect(0,0,0,0), is_storage_item]
+                break
 
-        # Update structure effects
-        update_structure_lighting()
-        update_structures(dt)
-        
-        # Check for items being cooked
-        for item in items[:]:
-            for structure in structures:
-                if abs(item["x"] - structure["x"]) < STRUCTURE_SIZE and \
-                abs(item["y"] - structure["y"]) < STRUCTURE_SIZE:
-                    handle_cooking(structure, item, dt)
+        # Only clear shown_info if not hovering hotbar or info box
+        info_hovered = False
+        if shown_info is not None and shown_info[3].width > 0 and shown_info[3].height > 0:
+            if shown_info[3].collidepoint(mouse_pos):
+                info_hovered = True
+
+        if new_info is not None:
+            shown_info = new_info
+        elif not info_hovered:
+            shown_info = None
+
+        i = get_inventory_slot_rects().index(shown_info[1]) if shown_info else -1
+        if i != -1 and inventory[i] is None:
+            shown_info = None
+
+        # === DRAW EVERYTHING ===
+        WIN.fill(WHITE)
+        # === CAMERA ===
+        # Follows the player's interpolated position so movement stays smooth between steps
+        camera_x = interpolate(prev_player_x, player_x, sim_alpha) - WIDTH // 2
+        camera_y = interpolate(prev_player_y, player_y, sim_alpha) - HEIGHT // 2
+
+        maintain_world()
+
+        # === WORLD DRAW ===
+        PROFILER.phase("draw_world")
+        draw_world(camera_x, camera_y)
+
+        # === DRAW INACTIVE / GENERATED (DIRTY) TILE ITEMS ===
+        PROFILER.phase("draw_entities")
+        # These are items generated for tiles but not yet promoted into `items`.
+        # Draw them faded so player can see they exist but they are "inactive".
+        # Only chunks overlapping the screen are visited.
+        visible_rect = pygame.Rect(camera_x, camera_y, WIDTH, HEIGHT)
+        start_chunk_x = int(camera_x // TILE_SIZE) // CHUNK_SIZE
+        start_chunk_y = int(camera_y // TILE_SIZE) // CHUNK_SIZE
+        end_chunk_x = int((camera_x + WIDTH) // TILE_SIZE) // CHUNK_SIZE
+        end_chunk_y = int((camera_y + HEIGHT) // TILE_SIZE) // CHUNK_SIZE
+        for chunk_y in range(start_chunk_y, end_chunk_y + 1):
+            for chunk_x in range(start_chunk_x, end_chunk_x + 1):
+                chunk_items = WORLD_TILE_ITEMS.get((chunk_x, chunk_y))
+                if not chunk_items:
+                    continue
+                for (tx, ty), gen_item in chunk_items.items():
+                    # tile center in world pixels
+                    wx = tx * TILE_SIZE + TILE_SIZE // 2
+                    wy = ty * TILE_SIZE + TILE_SIZE // 2
+                    # draw the cached faded sprite so it's visually distinct from active items
+                    faded = FADED_ITEM_IMAGES.get(gen_item.type)
+                    if faded is None:
+                        continue
+                    # quick visibility check
+                    if not visible_rect.collidepoint(wx, wy):
+                        continue
+                    WIN.blit(faded, (wx - camera_x - ITEM_SIZE // 2, wy - camera_y - ITEM_SIZE // 2))
 
-    if not paused:
-        update_animals(dt)
+        # === ITEMS ===
+        chunk_range = 3 * CHUNK_SIZE * TILE_SIZE
+        for item in items:
+            if abs(item.x - player_x) <= chunk_range and abs(item.y - player_y) <= chunk_range:
+                screen_x = item.x - camera_x
+                screen_y = item.y - camera_y
+                WIN.blit(ITEM_IMAGES[item.type], (screen_x, screen_y))
 
-        # === UPDATE PLANTS ===
+        # === PLANTS ===
         for plant in plants:
-            tile = get_current_tile(int(plant["x"] // TILE_SIZE), int(plant["y"] // TILE_SIZE))
-            if tile in PLANT_STATS[plant["type"]]["only_tiles"]:
-                plant["growth_timer"] += dt / 60  # convert seconds to minutes
-                stats = PLANT_STATS[plant["type"]]
-                stages = stats["stages"]
-
-                # Find the current stage index
-                current_stage_index = next((i for i, s in enumerate(stages) if s["name"] == plant["growth_stage"]), -1)
-
-                # Only update if we're in the stage list (not already in flowering/fruited)
-                if current_stage_index != -1:
-                    current_stage = stages[current_stage_index]
-                    # Check if enough time has passed to move to next stage
-                    if plant["growth_timer"] >= current_stage["timer_mins"]:
-                        plant["growth_timer"] = 0  # reset timer for next stage
-                        next_index = current_stage_index + 1
-
-                        if next_index < len(stages):
-                            plant["growth_stage"] = stages[next_index]["name"]
-                        else:
-                            plant["growth_stage"] = stats["last_stage"]
-
-                # If already flowering and enough time passes, go to fruited
-                elif plant["growth_stage"] == stats["last_stage"]:
-                    if plant["growth_timer"] > stats["fruit_time"]:
-                        plant["growth_stage"] = stats["last_stage_last"]
-
-        # === UPDATE ITEMS ===
-        for item in items[:]:
-            if item["type"] in ITEM_CONVERT:
-                item["timer"] = item.get("timer", ITEM_CONVERT[item["type"]][0])
-                item["timer"] -= dt
-                if item["timer"] <= 0 and ITEM_CONVERT[item["type"]][1] is not None:
-                    item["type"] = ITEM_CONVERT[item["type"]][1]
-                    if item["type"] in MAX_ITEM_DUR:
-                        item["dur"] = MAX_ITEM_DUR[item["type"]]
-                    del item["timer"]
-                elif item["timer"] <= 0 and ITEM_CONVERT[item["type"]][1] is None:
-                    items.remove(item)
-                    break
-            tile_x = int(item["x"] // TILE_SIZE)
-            tile_y = int(item["y"] // TILE_SIZE)
-            tile = get_current_tile(tile_x, tile_y)
-            if item["type"] in ITEM_TILE_INTERACTION:
-                interaction = ITEM_TILE_INTERACTION[item["type"]]
-                if tile in interaction:
-                    tile_interaction = interaction[tile]
-                    # item conversion (existing)
-                    item_converts = tile_interaction.get("item_converts")
-                    if item_converts is not None:
-                        item["type"] = item_converts
-                        if item["type"] in MAX_ITEM_DUR:
-                            item["dur"] = MAX_ITEM_DUR[item["type"]]
-
-                    # tile conversion (new)
-                    tile_converts = tile_interaction.get("tile_converts")
-                    if tile_converts is not None:
-                        # compute chunk + local indices (handle negatives)
-                        chunk_x = tile_x // CHUNK_SIZE
-                        chunk_y = tile_y // CHUNK_SIZE
-                        local_x = tile_x % CHUNK_SIZE
-                        local_y = tile_y % CHUNK_SIZE
-                        if local_x < 0:
-                            local_x += CHUNK_SIZE
-                            chunk_x -= 1
-                        if local_y < 0:
-                            local_y += CHUNK_SIZE
-                            chunk_y -= 1
-
-                        # ensure chunk is loaded, then set tile
-                        chunk = get_chunk(chunk_x, chunk_y)
-                        chunk[local_y][local_x] = tile_converts
-            
-            if "dur" in item and item["dur"] <= 0:
-                items.remove(item)
-
-    # === HOTBAR ITEMS INFO ===
-    slot_rects = get_inventory_slot_rects()
-    new_info = None
-    for i in range(2):
-        if slot_rects[i].collidepoint(mouse_pos) and inventory[i] is not None:
-            # store extra flag for storage items
-            is_food = (inventory[i]["type"] in FOOD_STATS)
-            is_storage_item = (inventory[i]["type"] in STORAGE_ITEMS)
-            new_info = [inventory[i]["type"], slot_rects[i], is_food, pygame.Rect(0,0,0,0), is_storage_item]
-            break
-
-    # Only clear shown_info if not hovering hotbar or info box
-    info_hovered = False
-    if shown_info is not None and shown_info[3].width > 0 and shown_info[3].height > 0:
-        if shown_info[3].collidepoint(mouse_pos):
-            info_hovered = True
-
-    if new_info is not None:
-        shown_info = new_info
-    elif not info_hovered:
-        shown_info = None
-
-    i = get_inventory_slot_rects().index(shown_info[1]) if shown_info else -1
-    if i != -1 and inventory[i] is None:
-        shown_info = None
-
-    update_animations(dt)
-
-    # === DRAW EVERYTHING ===
-    WIN.fill(WHITE)
-    # === CAMERA ===
-    camera_x = player_x - WIDTH // 2
-    camera_y = player_y - HEIGHT // 2
-
-    current_time = time.time()
-    if current_time - last_unload_time > UNLOAD_INTERVAL:
-        unload_far_entities(player_x, player_y, CHUNK_SIZE*TILE_SIZE*4)
-        last_unload_time = current_time
-
-    # === WORLD DRAW ===
-    player_chunk_x = (player_x // TILE_SIZE) // CHUNK_SIZE
-    player_chunk_y = (player_y // TILE_SIZE) // CHUNK_SIZE
-    # Unload far chunks only occasionally or when the player changes chunk to reduce hitches
-    if (player_chunk_x, player_chunk_y) != last_player_chunk or (time.time() - last_unload_chunks_time) > UNLOAD_CHUNK_INTERVAL:
-        unload_far_chunks(player_chunk_x, player_chunk_y)
-        last_unload_chunks_time = time.time()
-        last_player_chunk = (player_chunk_x, player_chunk_y)
-    draw_world(camera_x, camera_y)
-
-    # === DRAW INACTIVE / GENERATED (DIRTY) TILE ITEMS ===
-    # These are items generated for tiles but not yet promoted into `items`.
-    # Draw them faded so player can see they exist but they are "inactive".
-    visible_rect = pygame.Rect(camera_x, camera_y, WIDTH, HEIGHT)
-    for (tx, ty), gen_item in WORLD_TILE_ITEMS.items():
-        # tile center in world pixels
-        wx = tx * TILE_SIZE + TILE_SIZE // 2
-        wy = ty * TILE_SIZE + TILE_SIZE // 2
-        item_type = gen_item.get("type")
-        if not item_type or item_type not in ITEM_IMAGES:
-            continue
-        # quick visibility check
-        if not visible_rect.collidepoint(wx, wy):
-            continue
-        screen_x = wx - camera_x - ITEM_SIZE // 2
-        screen_y = wy - camera_y - ITEM_SIZE // 2
-        # draw a faded copy so it's visually distinct from active items
-        img = ITEM_IMAGES[item_type]
-        faded = img.copy()
-        # alpha 140 makes it look "inactive" — tweak as needed
-        faded.set_alpha(140)
-        WIN.blit(faded, (screen_x, screen_y))
-
-    # === ITEMS ===
-    chunk_range = 3 * CHUNK_SIZE * TILE_SIZE
-    for item in items:
-        if abs(item["x"] - player_x) <= chunk_range and abs(item["y"] - player_y) <= chunk_range:
-            screen_x = item["x"] - camera_x
-            screen_y = item["y"] - camera_y
-            WIN.blit(ITEM_IMAGES[item["type"]], (screen_x, screen_y))
-
-    # === PLANTS ===
-    for plant in plants:
-        screen_x = plant["x"] - camera_x
-        screen_y = plant["y"] - camera_y
-        stage = plant["growth_stage"]
-        img = PLANT_IMAGES[plant["type"]][stage]
-        img_rect = img.get_rect(center=(screen_x, screen_y))
-        plant_radius = PLANT_MASKS[plant["type"]][plant["growth_stage"]]
-        pygame.draw.circle(WIN, (0, 0, 255), (screen_x, screen_y), 10)
-        WIN.blit(img, img_rect.topleft)
+            screen_x = plant.x - camera_x
+            screen_y = plant.y - camera_y
+            stage = plant.growth_stage
+            img = PLANT_IMAGES[plant.type][stage]
+            img_rect = img.get_rect(center=(screen_x, screen_y))
+            plant_radius = PLANT_MASKS[plant.type][plant.stage]
+            pygame.draw.circle(WIN, (0, 0, 255), (screen_x, screen_y), 10)
+            WIN.blit(img, img_rect.topleft)
+
+        # === STRUCTURES ===
+        for structure in structures:
+            screen_x = structure.x - camera_x
+            screen_y = structure.y - camera_y
+            img = STRUCTURE_IMAGES[structure.type]
+            WIN.blit(img, (screen_x, screen_y))
+
+        # === ANIMALS ===
+        draw_animals(camera_x, camera_y, sim_alpha)
+
+        # === PLAYER ===
+        player_screen_x = WIDTH // 2 - player_size // 2
+        player_screen_y = HEIGHT // 2 - player_size // 2
+        mouse_player_atan2 = math.atan2((mouse_pos[1] - player_screen_y) - player_size//2, (mouse_pos[0] - player_screen_x) - player_size//2)
+        player_texture_rotated = pygame.transform.rotate(player_texture, -math.degrees(mouse_player_atan2) - 90)
+        player_rect = player_texture_rotated.get_rect(center=(WIDTH//2, HEIGHT//2))
+        WIN.blit(player_texture_rotated, player_rect.topleft)
+
+        draw_animations(camera_x, camera_y, dt)
+
+        # === LIGHTING === (add this)
+        PROFILER.phase("lighting")
+        draw_lighting(camera_x, camera_y)
+
+        # === GUI (no camera offset) ===
+        PROFILER.phase("gui")
+        draw_inventory()
+        draw_status_bars()
+
+        for item in items:
+            screen_x = item.x - camera_x
+            screen_y = item.y - camera_y
+            screen_rect = pygame.Rect(screen_x, screen_y, ITEM_SIZE, ITEM_SIZE)
+            if screen_rect.collidepoint(mouse_pos):
+                info_text = font.render(item.type, True, BLACK)
+                WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] + 15))
+                timer_pos = [mouse_pos[0] + 15, mouse_pos[1] + 35]
+                cook_pos = [mouse_pos[0] + 15, mouse_pos[1] + 35]
+                if "dur" in item:
+                    dur_text = font.render(f"Durability: {(item['dur'] / MAX_ITEM_DUR[item['type']])*100:.2f}%", True, BLACK)
+                    timer_pos[1] = WIN.blit(dur_text, (mouse_pos[0] + 15, mouse_pos[1] + 35)).bottom
+                    cook_pos[1] = timer_pos[1]
+                if "timer" in item:
+                    timer_text = font.render(f"{ITEM_CONVERT_LABELS[item['type']]}{item['timer']:.1f}s", True, BLACK)
+                    cook_pos[1] = WIN.blit(timer_text, timer_pos).bottom
+                if "cook_timer" in item:
+                    timer_text = font.render(f"Cooks in: {item['cook_timer']:.1f}s", True, BLACK)
+                    WIN.blit(timer_text, cook_pos)
+                break
 
-    # === STRUCTURES ===
-    for structure in structures:
-        screen_x = structure["x"] - camera_x
-        screen_y = structure["y"] - camera_y
-        img = STRUCTURE_IMAGES[structure["type"]]
-        WIN.blit(img, (screen_x, screen_y))
-
-    # === ANIMALS ===
-    draw_animals(camera_x, camera_y)
-
-    # === PLAYER ===
-    player_screen_x = WIDTH // 2 - player_size // 2
-    player_screen_y = HEIGHT // 2 - player_size // 2
-    mouse_player_atan2 = math.atan2((mouse_pos[1] - player_screen_y) - player_size//2, (mouse_pos[0] - player_screen_x) - player_size//2)
-    player_texture_rotated = pygame.transform.rotate(player_texture, -math.degrees(mouse_player_atan2) - 90)
-    player_rect = player_texture_rotated.get_rect(center=(WIDTH//2, HEIGHT//2))
-    WIN.blit(player_texture_rotated, player_rect.topleft)
-
-    draw_animations(camera_x, camera_y, dt)
-
-    # === LIGHTING === (add this)
-    draw_lighting(camera_x, camera_y)
-
-    # === GUI (no camera offset) ===
-    draw_inventory()
-    draw_status_bars()
-
-    for item in items:
-        screen_x = item["x"] - camera_x
-        screen_y = item["y"] - camera_y
-        screen_rect = pygame.Rect(screen_x, screen_y, ITEM_SIZE, ITEM_SIZE)
-        if screen_rect.collidepoint(mouse_pos):
-            info_text = font.render(item["type"], True, BLACK)
-            WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] + 15))
-            timer_pos = [mouse_pos[0] + 15, mouse_pos[1] + 35]
-            cook_pos = [mouse_pos[0] + 15, mouse_pos[1] + 35]
-            if "dur" in item:
-                dur_text = font.render(f"Durability: {(item['dur'] / MAX_ITEM_DUR[item['type']])*100:.2f}%", True, BLACK)
-                timer_pos[1] = WIN.blit(dur_text, (mouse_pos[0] + 15, mouse_pos[1] + 35)).bottom
-                cook_pos[1] = timer_pos[1]
-            if "timer" in item:
-                timer_text = font.render(f"{ITEM_CONVERT_LABELS[item['type']]}{item['timer']:.1f}s", True, BLACK)
-                cook_pos[1] = WIN.blit(timer_text, timer_pos).bottom
-            if "cook_timer" in item:
-                timer_text = font.render(f"Cooks in: {item['cook_timer']:.1f}s", True, BLACK)
-                WIN.blit(timer_text, cook_pos)
-            break
-
-    struct = False
-    for structure in structures:
-        screen_x = structure["x"] - camera_x
-        screen_y = structure["y"] - camera_y
-        screen_rect = pygame.Rect(screen_x, screen_y, STRUCTURE_SIZE, STRUCTURE_SIZE)
-        if screen_rect.collidepoint(mouse_pos):
-            info_text = font.render(structure["type"], True, BLACK)
-            WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 15))
-            if "timer" in structure:
-                info_text = font.render(f"Burns in: {structure['timer']:.1f}", True, BLACK)
-                WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 35))
-            struct = True
-            break
-
-    if not struct:
-        for plant in plants:
-            screen_x = plant["x"] - camera_x
-            screen_y = plant["y"] - camera_y
-            screen_rect = pygame.Rect(screen_x-PLANT_SIZE//2, screen_y-PLANT_SIZE//2, PLANT_SIZE, PLANT_SIZE)
+        struct = False
+        for structure in structures:
+            screen_x = structure.x - camera_x
+            screen_y = structure.y - camera_y
+            screen_rect = pygame.Rect(screen_x, screen_y, STRUCTURE_SIZE, STRUCTURE_SIZE)
             if screen_rect.collidepoint(mouse_pos):
-                info_text = font.render(plant["type"], True, BLACK)
+                info_text = font.render(structure.type, True, BLACK)
                 WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 15))
-                info_text = font.render(plant["growth_stage"], True, BLACK)
-                WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 35))
-                info_text = font.render(f"Health: {plant['health']}", True, BLACK)
-                WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 55))
+                if "timer" in structure:
+                    info_text = font.render(f"Burns in: {structure['timer']:.1f}", True, BLACK)
+                    WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 35))
+                struct = True
                 break
 
-    if crafting_structures_visible:
-        draw_structure_crafting_gui()
-    elif crafting_visible:
-        draw_crafting_gui()
-    elif shown_info is not None:
-        # unpack extended shown_info: name, rect, is_edible, button_rect, is_storage
-        name, rect, is_edible, name_rect, is_storage = shown_info
-        if not is_edible and not is_storage:
-            name_text = font.render(name, True, (0, 0, 0))
-            text_rect = name_text.get_rect(center=rect.center)
-            text_rect.centery = rect.top-12
-            shown_info[3] = WIN.blit(name_text, text_rect.topleft)
-        elif is_storage:
-            # determine which hotbar slot this info belongs to
-            try:
-                hot_i = get_inventory_slot_rects().index(rect)
-            except ValueError:
-                hot_i = -1
-            is_open = (storage_open == hot_i)
-            label = "> Close" if is_open else "> Open"
-            open_text = font.render(label, True, (100, 230, 100) if shown_button.collidepoint(mouse_pos) else (0,0,0))
-            text_rect = open_text.get_rect(center=rect.center)
-            text_rect.centery = rect.top-12
-            shown_button = WIN.blit(open_text, text_rect.topleft)
-            shown_info[3] = shown_button
-            name_text = font.render(name, True, (0,0,0))
-            text_rect = name_text.get_rect(center=rect.center)
-            text_rect.centery = rect.top-32
-            WIN.blit(name_text, text_rect.topleft)
-        else:
-            eat_text = font.render("> "+CONSUME_TYPES[name], True, (100, 230, 100) if shown_button.collidepoint(mouse_pos) else (0, 0, 0))
-            text_rect = eat_text.get_rect(center=rect.center)
-            text_rect.centery = rect.top-12
-            shown_button = WIN.blit(eat_text, text_rect.topleft)
-            shown_info[3] = shown_button
-            name_text = font.render(name, True, (0, 0, 0))
-            text_rect = name_text.get_rect(center=rect.center)
-            text_rect.centery = rect.top-32
-            WIN.blit(name_text, text_rect.topleft)
-
-    # === DRAGGED ITEM (GUI layer) ===
-    if drag_item:
-        WIN.blit(ITEM_IMAGES[drag_item["type"]],
-                (mouse_pos[0] - drag_offset[0] + 10, mouse_pos[1] - drag_offset[1] + 10))
-    
-    # draw storage gui on top of other GUI elements
-    draw_storage_gui()
-        
-    pygame.display.update()
+        if not struct:
+            for plant in plants:
+                screen_x = plant.x - camera_x
+                screen_y = plant.y - camera_y
+                screen_rect = pygame.Rect(screen_x-PLANT_SIZE//2, screen_y-PLANT_SIZE//2, PLANT_SIZE, PLANT_SIZE)
+                if screen_rect.collidepoint(mouse_pos):
+                    info_text = font.render(plant.type, True, BLACK)
+                    WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 15))
+                    info_text = font.render(plant.growth_stage, True, BLACK)
+                    WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 35))
+                    info_text = font.render(f"Health: {plant['health']}", True, BLACK)
+                    WIN.blit(info_text, (mouse_pos[0] + 15, mouse_pos[1] - 55))
+                    break
 
-pygame.quit()
-sys.exit()
+        if crafting_structures_visible:
+            draw_structure_crafting_gui()
+        elif crafting_visible:
+            draw_crafting_gui()
+        elif shown_info is not None:
+            # unpack extended shown_info: name, rect, is_edible, button_rect, is_storage
+            name, rect, is_edible, name_rect, is_storage = shown_info
+            if not is_edible and not is_storage:
+                name_text = font.render(name, True, (0, 0, 0))
+                text_rect = name_text.get_rect(center=rect.center)
+                text_rect.centery = rect.top-12
+                shown_info[3] = WIN.blit(name_text, text_rect.topleft)
+            elif is_storage:
+                # determine which hotbar slot this info belongs to
+                try:
+                    hot_i = get_inventory_slot_rects().index(rect)
+                except ValueError:
+                    hot_i = -1
+                is_open = (storage_open == hot_i)
+                label = "> Close" if is_open else "> Open"
+                open_text = font.render(label, True, (100, 230, 100) if shown_button.collidepoint(mouse_pos) else (0,0,0))
+                text_rect = open_text.get_rect(center=rect.center)
+                text_rect.centery = rect.top-12
+                shown_button = WIN.blit(open_text, text_rect.topleft)
+                shown_info[3] = shown_button
+                name_text = font.render(name, True, (0,0,0))
+                text_rect = name_text.get_rect(center=rect.center)
+                text_rect.centery = rect.top-32
+                WIN.blit(name_text, text_rect.topleft)
+            else:
+                eat_text = font.render("> "+CONSUME_TYPES[name], True, (100, 230, 100) if shown_button.collidepoint(mouse_pos) else (0, 0, 0))
+                text_rect = eat_text.get_rect(center=rect.center)
+                text_rect.centery = rect.top-12
+                shown_button = WIN.blit(eat_text, text_rect.topleft)
+                shown_info[3] = shown_button
+                name_text = font.render(name, True, (0, 0, 0))
+                text_rect = name_text.get_rect(center=rect.center)
+                text_rect.centery = rect.top-32
+                WIN.blit(name_text, text_rect.topleft)
+
+        # === DRAGGED ITEM (GUI layer) ===
+        if drag_item:
+            WIN.blit(ITEM_IMAGES[drag_item["type"]],
+                    (mouse_pos[0] - drag_offset[0] + 10, mouse_pos[1] - drag_offset[1] + 10))
+    
+        # draw storage gui on top of other GUI elements
+        draw_storage_gui()
+
+        if profiler_visible:
+            PROFILER.draw_overlay(WIN, font, (WIDTH - 400, 10))
+            loaded, evicted = CHUNKS.churn()
+            churn_text = f"chunks {len(world_chunks)}, last minute: {loaded} loaded, {evicted} evicted"
+            WIN.blit(font.render(churn_text, True, (255, 255, 255)), (WIDTH - 400, HEIGHT - 30))
+
+        PROFILER.phase("present")
+        pygame.display.update()
+        PROFILER.end_frame()
+
+    # Fold textures decoded from source this session into the atlas cache
+    ATLAS.save()
+    stop_sharding()
+    REGIONS.close()
+    pygame.quit()
+    sys.exit()
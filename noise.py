@@ -2,6 +2,8 @@ import math
 import opensimplex
 import random as rn
 import hashlib
+import numpy as np
+from collections import OrderedDict
 
 def make_perlin(seed=None):
     random = rn.Random()
@@ -46,10 +48,43 @@ def make_perlin(seed=None):
 
     return perlin
 
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+def hash_point(seed, x, y):
+    """64-bit integer hash of a point (splitmix style), same as hash_grid. Float
+    coordinates are floored, so every point of a unit cell hashes the same."""
+    x = math.floor(x)
+    y = math.floor(y)
+    h = (x * 0x9E3779B97F4A7C15 + y * 0xC2B2AE3D27D4EB4F + seed * 0x165667B19E3779F9) & MASK64
+    h ^= h >> 33
+    h = (h * 0xFF51AFD7ED558CCD) & MASK64
+    h ^= h >> 33
+    h = (h * 0xC4CEB9FE1A85EC53) & MASK64
+    return h ^ (h >> 33)
+
+def hash_grid(seed, xs, ys):
+    """hash_point over a grid of coordinates: array of shape (len(ys), len(xs))."""
+    with np.errstate(over="ignore"):
+        x = np.floor(np.asarray(xs)).astype(np.int64).astype(np.uint64)
+        y = np.floor(np.asarray(ys)).astype(np.int64).astype(np.uint64)[:, None]
+        h = (x * np.uint64(0x9E3779B97F4A7C15) + y * np.uint64(0xC2B2AE3D27D4EB4F)
+             + np.uint64((seed * 0x165667B19E3779F9) & MASK64))
+        h ^= h >> np.uint64(33)
+        h *= np.uint64(0xFF51AFD7ED558CCD)
+        h ^= h >> np.uint64(33)
+        h *= np.uint64(0xC4CEB9FE1A85EC53)
+        return h ^ (h >> np.uint64(33))
+
 def make_simplex(seed=None):
     opns = opensimplex.OpenSimplex(seed if seed is not None else rn.randint(0, 1000000))
     def simplex_noise(x, y):
         return (opns.noise2(x, y) + 1) / 2  # normalize to 0–1
+
+    def simplex_grid(xs, ys):
+        # One call for a whole grid, array of shape (len(ys), len(xs))
+        return (opns.noise2array(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)) + 1) / 2
+
+    simplex_noise.grid = simplex_grid
     return simplex_noise
 
 def make_fractal(seed=None, octaves=4, persistence=0.5, lacunarity=2.0):
@@ -129,14 +164,26 @@ def make_perlin_mask(seed=None, threshold=0.5, blend=0.1):
 
 def make_random_ores(seed=None, rarities=[0.1]):
     simplex = make_simplex(seed)
+    hash_seed = seed or 0
     def random_ores(x, y):
-        h = hashlib.sha256(f"{seed}_{x}_{y}".encode()).hexdigest()
+        h = hash_point(hash_seed, x, y)
         v = simplex(x, y)
-        value = (((int(h, 16) % 10000) / 10000.0) + v) / 2
+        value = (((h % 10000) / 10000.0) + v) / 2
         for i, rarity in enumerate(rarities):
             if value < rarity:
                 return i + 1
         return 0
+
+    def random_ores_grid(xs, ys):
+        # Same as random_ores at every grid point: int array of shape (len(ys), len(xs))
+        h = hash_grid(hash_seed, xs, ys)
+        value = ((h % np.uint64(10000)) / 10000.0 + simplex.grid(xs, ys)) / 2
+        ores = np.zeros(value.shape, dtype=np.uint8)
+        for i, rarity in reversed(list(enumerate(rarities))):
+            ores[value < rarity] = i + 1
+        return ores
+
+    random_ores.grid = random_ores_grid
     return random_ores
 
 def make_ore_patches(seed=None, frequencies=[], rarities=[], max_depth=3, min_depth=1):
@@ -156,7 +203,7 @@ def make_ore_patches(seed=None, frequencies=[], rarities=[], max_depth=3, min_de
         return 0
     return ore_patches
 
-def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_types=None):
+def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_types=None, cache_size=4096):
     """
     Deterministic hash + pattern ore vein generator.
     
@@ -168,12 +215,17 @@ def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_
         ore_types (list): List of ore definitions, e.g.
                           [{'name': 'iron', 'rarity': 0.02},
                            {'name': 'gold', 'rarity': 0.01}]
+        cache_size (int): Regions whose vein is kept memoized, least recently used
+                          regions are dropped first.
     Returns:
         func(x, y) -> ore_id or 0
+        func.block(x, y, width, height) -> row-major bytearray of ore ids for a whole
+        tile block, evaluating the tiles close to each vein as one array
     """
     simplex = make_simplex(seed)
     if ore_types is None:
         ore_types = [{'name': 'iron', 'rarity': 0.02}]
+    regions = OrderedDict()  # {(chunk_x, chunk_y): vein or None}
 
     def hash2d(ix, iy):
         data = f"{seed}_{ix}_{iy}".encode()
@@ -183,10 +235,12 @@ def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_
         # Use smooth noise for natural distortion
         return simplex(x * 0.1, y * 0.1)
 
-    def ore_vein(x, y):
-        # Identify which chunk this coordinate belongs to
-        chunk_x = x // chunk_size
-        chunk_y = y // chunk_size
+    def region_vein(chunk_x, chunk_y):
+        """(ore_id, cx, cy, cos, sin) of the region's vein, or None if it has none."""
+        key = (chunk_x, chunk_y)
+        if key in regions:
+            regions.move_to_end(key)
+            return regions[key]
 
         # Deterministic pseudo-random value for this chunk
         h = hash2d(chunk_x, chunk_y)
@@ -201,20 +255,27 @@ def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_
                 ore_id = i + 1
                 break
 
-        if ore_id == 0:
-            return 0  # no vein in this region
+        vein = None
+        if ore_id != 0:
+            # Compute a deterministic “center line” for the vein
+            local_seed = hash2d(chunk_x + ore_id, chunk_y - ore_id)
+            angle = (local_seed % 360) * math.pi / 180.0
+            cx = (chunk_x + 0.5) * chunk_size
+            cy = (chunk_y + 0.5) * chunk_size
+            vein = (ore_id, cx, cy, math.cos(angle), math.sin(angle))
 
-        # Compute a deterministic “center line” for the vein
-        local_seed = hash2d(chunk_x + ore_id, chunk_y - ore_id)
-        angle = (local_seed % 360) * math.pi / 180.0
-        cx = (chunk_x + 0.5) * chunk_size
-        cy = (chunk_y + 0.5) * chunk_size
+        regions[key] = vein
+        if len(regions) > cache_size:
+            regions.popitem(last=False)
+        return vein
 
+    def vein_at(vein, x, y):
+        ore_id, cx, cy, cos_a, sin_a = vein
         # Project point onto the vein’s axis
         dx = x - cx
         dy = y - cy
-        along = dx * math.cos(angle) + dy * math.sin(angle)
-        dist = abs(-dx * math.sin(angle) + dy * math.cos(angle))
+        along = dx * cos_a + dy * sin_a
+        dist = abs(-dx * sin_a + dy * cos_a)
 
         # Add noise-based distortion to width and placement
         n = vein_noise(x, y)
@@ -225,4 +286,43 @@ def make_ore_veins(seed=None, chunk_size=32, vein_length=20, vein_radius=3, ore_
             return ore_id
         return 0
 
+    def ore_vein(x, y):
+        # Identify which chunk this coordinate belongs to
+        vein = region_vein(x // chunk_size, y // chunk_size)
+        if vein is None:
+            return 0  # no vein in this region
+        return vein_at(vein, x, y)
+
+    def ore_vein_block(x, y, width, height):
+        ores = np.zeros((height, width), dtype=np.uint8)
+        # Distortion widens a vein to at most 1.5 radii around its center line
+        reach = 1.5 * vein_radius
+        for chunk_y in range(y // chunk_size, (y + height - 1) // chunk_size + 1):
+            for chunk_x in range(x // chunk_size, (x + width - 1) // chunk_size + 1):
+                vein = region_vein(chunk_x, chunk_y)
+                if vein is None:
+                    continue
+                # Only tiles of this region inside the vein's bounding box can be ore
+                ore_id, cx, cy, cos_a, sin_a = vein
+                end_x = cx + cos_a * vein_length
+                end_y = cy + sin_a * vein_length
+                x0 = max(x, chunk_x * chunk_size, math.floor(min(cx, end_x) - reach))
+                x1 = min(x + width, (chunk_x + 1) * chunk_size, math.ceil(max(cx, end_x) + reach) + 1)
+                y0 = max(y, chunk_y * chunk_size, math.floor(min(cy, end_y) - reach))
+                y1 = min(y + height, (chunk_y + 1) * chunk_size, math.ceil(max(cy, end_y) + reach) + 1)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                # Same math as vein_at, over the whole box at once
+                xs = np.arange(x0, x1)
+                ys = np.arange(y0, y1)
+                dx = xs - cx
+                dy = (ys - cy)[:, None]
+                along = dx * cos_a + dy * sin_a
+                dist = np.abs(-dx * sin_a + dy * cos_a)
+                dist -= (simplex.grid(xs * 0.1, ys * 0.1) - 0.5) * vein_radius
+                inside = (along >= 0) & (along <= vein_length) & (dist < vein_radius)
+                ores[y0 - y:y1 - y, x0 - x:x1 - x][inside] = ore_id
+        return bytearray(ores.tobytes())
+
+    ore_vein.block = ore_vein_block
     return ore_vein
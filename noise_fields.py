@@ -0,0 +1,56 @@
+import sys
+from array import array
+from collections import OrderedDict
+
+NOISE_CACHE_BYTES = 4 * 1024 * 1024  # default memory budget for cached fields
+
+class NoiseFields:
+    """Noise layer values per chunk, memoized as compact arrays with LRU eviction.
+
+    A layer is a function of world tile coordinates. The first lookup in a chunk
+    evaluates the layer over the whole chunk into a row-major array ('f' by default,
+    'B' for layers returning small ids like ore patches); later lookups
+    (regenerating the chunk after it was unloaded, spawn searches) just index it. When
+    the cached fields go over max_bytes the least recently used ones are dropped.
+    """
+    def __init__(self, chunk_size, max_bytes=NOISE_CACHE_BYTES):
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.layers = {}  # {name: (func(tile_x, tile_y) -> value, array typecode)}
+        self.fields = OrderedDict()  # {(name, chunk_x, chunk_y): array}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def add_layer(self, name, func, typecode="f"):
+        self.layers[name] = (func, typecode)
+
+    def field(self, name, cx, cy):
+        """The layer's values over a chunk, computed on first use."""
+        key = (name, cx, cy)
+        values = self.fields.get(key)
+        if values is not None:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return values
+        self.misses += 1
+        func, typecode = self.layers[name]
+        size = self.chunk_size
+        x0 = cx * size
+        y0 = cy * size
+        values = array(typecode, [func(x0 + tx, y0 + ty) for ty in range(size) for tx in range(size)])
+        self.fields[key] = values
+        self.bytes += sys.getsizeof(values)
+        while self.bytes > self.max_bytes and len(self.fields) > 1:
+            _, dropped = self.fields.popitem(last=False)
+            self.bytes -= sys.getsizeof(dropped)
+        return values
+
+    def get(self, name, tile_x, tile_y):
+        """The layer's value at a world tile."""
+        size = self.chunk_size
+        return self.field(name, tile_x // size, tile_y // size)[(tile_y % size) * size + tile_x % size]
+
+    def clear(self):
+        self.fields.clear()
+        self.bytes = 0
@@ -0,0 +1,405 @@
+import heapq
+import math
+from collections import OrderedDict
+
+import world_events
+from world_grid import UNLOADED_TILE
+
+DIAGONAL_COST = math.sqrt(2)
+# Neighbour steps as (dx, dy, cost); a direction code is an index into this
+STEPS = (
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, DIAGONAL_COST), (1, -1, DIAGONAL_COST), (-1, 1, DIAGONAL_COST), (-1, -1, DIAGONAL_COST),
+)
+OPPOSITE = (1, 0, 3, 2, 7, 6, 5, 4)  # direction code of the reverse step
+NO_DIRECTION = 255
+FLOW_RADIUS = 16  # tiles a flow field covers around its goal, past how far animals look for food
+MAX_FLOW_FIELDS = 32
+MAX_SEARCH_NODES = 4000  # portal nodes expanded before a long-range search gives up
+MAX_BUILDS_PER_TICK = 1  # flow fields built and routes searched per tick, the rest wait for a later tick
+
+def octile(a, b):
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (DIAGONAL_COST - 1) * min(dx, dy)
+
+def smooth(tiles):
+    """Drop the tiles in the middle of straight runs, keeping the corners and the end."""
+    waypoints = []
+    for i, tile in enumerate(tiles):
+        if 0 < i < len(tiles) - 1:
+            before = tiles[i - 1]
+            after = tiles[i + 1]
+            if (tile[0] - before[0], tile[1] - before[1]) == (after[0] - tile[0], after[1] - tile[1]):
+                continue
+        waypoints.append(tile)
+    return waypoints
+
+class Path:
+    """A route to goal as waypoint tiles, or waypoints None if goal was unreachable."""
+    __slots__ = ("goal", "waypoints", "made", "chunks")
+
+    def __init__(self, goal, waypoints, made, chunks):
+        self.goal = goal
+        self.waypoints = waypoints
+        self.made = made  # Pathfinder.generation when it was found
+        self.chunks = chunks  # chunks it depends on
+
+class FlowField:
+    """Direction codes toward one goal tile for every tile in a square around it."""
+    def __init__(self, goal, x0, y0, size, directions, chunks):
+        self.goal = goal
+        self.x0 = x0
+        self.y0 = y0
+        self.size = size
+        self.directions = directions  # row-major bytearray, NO_DIRECTION where unreachable
+        self.chunks = chunks
+
+    def step(self, tile_x, tile_y):
+        """The neighbour tile to move to from a tile, or None if there's no known way."""
+        x = tile_x - self.x0
+        y = tile_y - self.y0
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return None
+        direction = self.directions[y * self.size + x]
+        if direction == NO_DIRECTION:
+            return None
+        dx, dy, _ = STEPS[direction]
+        return tile_x + dx, tile_y + dy
+
+class Pathfinder:
+    """Routes over the loaded tiles, avoiding a set of blocked tile ids.
+
+    Long routes use hierarchical A*: each chunk's edge is split into portals where
+    walkable tiles meet walkable tiles of the next chunk, and the costs between a
+    chunk's portals are found once and cached. A route is searched over portals,
+    then refined tile by tile inside each chunk it crosses. Many animals heading to
+    the same tile (a plant, dropped food) share a flow field instead: one Dijkstra
+    pass from the goal gives every tile around it a direction to step in.
+
+    Unloaded chunks count as blocked. Tile changes and chunk loads/unloads drop the
+    cached portals and flow fields of the chunks involved; paths remember when they
+    were found and are searched again once a chunk they cross has changed.
+
+    Building a flow field or searching a route takes milliseconds, so only
+    MAX_BUILDS_PER_TICK of them run between calls to new_tick(); callers past that
+    are told to wait where they are and ask again next tick.
+    """
+    def __init__(self, world, bus, blocked_ids):
+        self.world = world
+        self.chunk_size = world.chunk_size
+        self.blocked = frozenset(blocked_ids)
+        # Tile id -> 1 if walkable, for bytearray.translate over a block of tiles
+        self.walk_table = bytes(0 if i in self.blocked or i == UNLOADED_TILE else 1 for i in range(256))
+        self.portal_graphs = {}  # {chunk: {portal tile: [(tile, cost), ...]}}
+        self.flow_fields = OrderedDict()  # {goal tile: FlowField}, least recently used first
+        self.changed = {}  # {chunk: generation its walkable tiles last changed at}
+        self.generation = 0
+        self.searches = 0
+        self.flow_builds = 0
+        self.builds_left = MAX_BUILDS_PER_TICK
+        bus.subscribe(world_events.TILE_CHANGED, self.on_tile_changed)
+        bus.subscribe(world_events.CHUNK_LOADED, self.on_chunk_loaded)
+        bus.subscribe(world_events.CHUNK_UNLOADED, self.on_chunk_unloaded)
+
+    # === CHANGE TRACKING ===
+    def on_tile_changed(self, chunk, tile_x, tile_y, old_id, new_id):
+        if (old_id in self.blocked) != (new_id in self.blocked):
+            self.mark_changed(chunk)
+            self.forget(chunk)
+
+    def on_chunk_loaded(self, chunk):
+        # Paths planned while it was unloaded went around it as if it were blocked
+        self.mark_changed(chunk)
+        self.forget(chunk)
+
+    def on_chunk_unloaded(self, chunk):
+        self.mark_changed(chunk)
+        self.forget(chunk)
+
+    def mark_changed(self, chunk):
+        self.generation += 1
+        self.changed[chunk] = self.generation
+
+    def forget(self, chunk):
+        """Drop cached portals and flow fields that depend on a chunk."""
+        cx, cy = chunk
+        for neighbour in ((cx, cy), (cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            self.portal_graphs.pop(neighbour, None)
+        for goal in [goal for goal, field in self.flow_fields.items() if chunk in field.chunks]:
+            del self.flow_fields[goal]
+
+    def new_tick(self):
+        self.builds_left = MAX_BUILDS_PER_TICK
+
+    def clear(self):
+        self.portal_graphs.clear()
+        self.flow_fields.clear()
+        self.changed.clear()
+
+    # === TILES ===
+    def walkable(self, tile_x, tile_y):
+        size = self.chunk_size
+        chunk = self.world.chunk(tile_x // size, tile_y // size, False)
+        return chunk is not None and chunk[(tile_y % size) * size + tile_x % size] not in self.blocked
+
+    def chunk_of(self, tile):
+        return tile[0] // self.chunk_size, tile[1] // self.chunk_size
+
+    def chunk_bounds(self, chunk):
+        size = self.chunk_size
+        return chunk[0] * size, chunk[1] * size, (chunk[0] + 1) * size, (chunk[1] + 1) * size
+
+    def area(self, bounds):
+        """(bounds, walkable) for searches confined to bounds (x0, y0, x1, y1), where walkable
+        holds 1 per walkable tile, row-major. Tiles are copied once instead of per lookup."""
+        x0, y0, x1, y1 = bounds
+        return bounds, self.world.get_rect(x0, y0, x1 - x0, y1 - y0, load=False).translate(self.walk_table)
+
+    def neighbours(self, tile, area):
+        """(tile, cost, direction) for walkable neighbours inside an area().
+        Diagonal steps need both tiles beside them walkable, so they never cut corners."""
+        x, y = tile
+        (x0, y0, x1, y1), walkable = area
+        width = x1 - x0
+        for direction, (dx, dy, cost) in enumerate(STEPS):
+            nx = x + dx
+            ny = y + dy
+            if not (x0 <= nx < x1 and y0 <= ny < y1) or not walkable[(ny - y0) * width + nx - x0]:
+                continue
+            if dx and dy and not (walkable[(y - y0) * width + nx - x0] and walkable[(ny - y0) * width + x - x0]):
+                continue
+            yield (nx, ny), cost, direction
+
+    def distances(self, start, area, directions=None):
+        """{tile: cost} of every tile inside an area() reachable from start (Dijkstra).
+        Given a bytearray the size of the area, also stores for each tile the direction
+        code of its step back toward start."""
+        (x0, y0, x1, y1), walkable = area
+        width = x1 - x0
+        height = y1 - y0
+        # Same rules as neighbours(), but over flat indices into the area: this runs over
+        # every tile of a flow field, tuples and generators would dominate it
+        steps = [(dx, dy, dy * width, dx + dy * width, cost, OPPOSITE[direction])
+                 for direction, (dx, dy, cost) in enumerate(STEPS)]
+        start_index = (start[1] - y0) * width + start[0] - x0
+        costs = {start_index: 0.0}
+        queue = [(0.0, start_index)]
+        while queue:
+            cost, index = heapq.heappop(queue)
+            if cost > costs[index]:
+                continue
+            y, x = divmod(index, width)
+            for dx, dy, row, offset, step, back in steps:
+                if not (0 <= x + dx < width and 0 <= y + dy < height):
+                    continue
+                neighbour = index + offset
+                if not walkable[neighbour] or (dx and dy and not (walkable[index + dx] and walkable[index + row])):
+                    continue
+                new_cost = cost + step
+                if new_cost < costs.get(neighbour, math.inf):
+                    costs[neighbour] = new_cost
+                    if directions is not None:
+                        directions[neighbour] = back
+                    heapq.heappush(queue, (new_cost, neighbour))
+        return {(x0 + index % width, y0 + index // width): cost for index, cost in costs.items()}
+
+    def local_path(self, start, goal, area):
+        """Tiles from start to goal staying inside an area() (A*), or None."""
+        came_from = {start: None}
+        costs = {start: 0.0}
+        queue = [(octile(start, goal), 0.0, start)]
+        while queue:
+            _, cost, tile = heapq.heappop(queue)
+            if tile == goal:
+                tiles = []
+                while tile is not None:
+                    tiles.append(tile)
+                    tile = came_from[tile]
+                return tiles[::-1]
+            if cost > costs[tile]:
+                continue
+            for neighbour, step, _ in self.neighbours(tile, area):
+                new_cost = cost + step
+                if new_cost < costs.get(neighbour, math.inf):
+                    costs[neighbour] = new_cost
+                    came_from[neighbour] = tile
+                    heapq.heappush(queue, (new_cost + octile(neighbour, goal), new_cost, neighbour))
+        return None
+
+    # === PORTALS ===
+    def portals(self, chunk):
+        """[(inside tile, outside tile)] in the middle of each run of walkable tiles along
+        the chunk's edges that continues into the neighbouring chunk."""
+        x0, y0, x1, y1 = self.chunk_bounds(chunk)
+        # The chunk and a ring of tiles around it
+        _, ring = self.area((x0 - 1, y0 - 1, x1 + 1, y1 + 1))
+        width = x1 - x0 + 2
+
+        def walkable(x, y):
+            return ring[(y - y0 + 1) * width + x - x0 + 1]
+
+        sides = (
+            ([(x1 - 1, y) for y in range(y0, y1)], (1, 0)),
+            ([(x0, y) for y in range(y0, y1)], (-1, 0)),
+            ([(x, y1 - 1) for x in range(x0, x1)], (0, 1)),
+            ([(x, y0) for x in range(x0, x1)], (0, -1)),
+        )
+        portals = []
+        for edge, (dx, dy) in sides:
+            run = []
+            for tile in edge + [None]:
+                if tile is not None and walkable(*tile) and walkable(tile[0] + dx, tile[1] + dy):
+                    run.append(tile)
+                    continue
+                if run:
+                    inside = run[len(run) // 2]
+                    portals.append((inside, (inside[0] + dx, inside[1] + dy)))
+                    run = []
+        return portals
+
+    def portal_graph(self, chunk):
+        """{portal tile: [(tile, cost)]} with the costs between a chunk's portals and the
+        step across into the next chunk, built on first use."""
+        graph = self.portal_graphs.get(chunk)
+        if graph is not None:
+            return graph
+        graph = {}
+        area = self.area(self.chunk_bounds(chunk))
+        for inside, outside in self.portals(chunk):
+            edges = graph.setdefault(inside, [])
+            edges.append((outside, 1.0))
+        for inside in list(graph):
+            costs = self.distances(inside, area)
+            graph[inside].extend((other, costs[other]) for other in graph if other != inside and other in costs)
+        self.portal_graphs[chunk] = graph
+        return graph
+
+    # === SEARCH ===
+    def find_path(self, start, goal):
+        """Tiles from start to goal over loaded walkable tiles, or None if there's no route."""
+        self.searches += 1
+        if not self.walkable(*start) or not self.walkable(*goal):
+            return None
+        start_chunk = self.chunk_of(start)
+        goal_chunk = self.chunk_of(goal)
+        goal_area = self.area(self.chunk_bounds(goal_chunk))
+        if start_chunk == goal_chunk:
+            tiles = self.local_path(start, goal, goal_area)
+            if tiles is not None:
+                return tiles
+
+        # Start and goal join the portal graph through their costs to their own chunk's portals
+        start_costs = self.distances(start, self.area(self.chunk_bounds(start_chunk)))
+        goal_costs = self.distances(goal, goal_area)
+        to_goal = {tile: cost for tile, cost in goal_costs.items() if tile in self.portal_graph(goal_chunk)}
+        came_from = {start: None}
+        costs = {start: 0.0}
+        queue = [(octile(start, goal), 0.0, start)]
+        expanded = 0
+        while queue and expanded < MAX_SEARCH_NODES:
+            _, cost, node = heapq.heappop(queue)
+            if node == goal:
+                return self.refine(self.unwind(came_from, goal))
+            if cost > costs[node]:
+                continue
+            expanded += 1
+            if node == start:
+                graph = self.portal_graph(start_chunk)
+                edges = [(tile, start_costs[tile]) for tile in graph if tile in start_costs and tile != start]
+                edges += graph.get(start, ())
+            else:
+                edges = self.portal_graph(self.chunk_of(node)).get(node, ())
+            if node in to_goal:
+                edges = list(edges) + [(goal, to_goal[node])]
+            for neighbour, step in edges:
+                new_cost = cost + step
+                if new_cost < costs.get(neighbour, math.inf):
+                    costs[neighbour] = new_cost
+                    came_from[neighbour] = node
+                    heapq.heappush(queue, (new_cost + octile(neighbour, goal), new_cost, neighbour))
+        return None
+
+    def unwind(self, came_from, tile):
+        nodes = []
+        while tile is not None:
+            nodes.append(tile)
+            tile = came_from[tile]
+        return nodes[::-1]
+
+    def refine(self, nodes):
+        """Fill in the tiles between consecutive portal path nodes."""
+        tiles = [nodes[0]]
+        areas = {}
+        for a, b in zip(nodes, nodes[1:]):
+            chunk = self.chunk_of(a)
+            if chunk != self.chunk_of(b):
+                tiles.append(b)  # step across a chunk edge
+                continue
+            if chunk not in areas:
+                areas[chunk] = self.area(self.chunk_bounds(chunk))
+            tiles.extend(self.local_path(a, b, areas[chunk])[1:])
+        return tiles
+
+    def follow(self, start, goal, path):
+        """(tile to head for next, path) on the way from start to goal, reusing path while
+        it still leads to goal through unchanged chunks. The tile is goal itself when no
+        route is needed or known (e.g. start isn't walkable, or goal isn't loaded), start
+        when a new route is needed but this tick's builds are used up, and None when goal
+        is unreachable."""
+        if start == goal or not self.walkable(*start) or self.world.chunk(*self.chunk_of(goal), False) is None:
+            return goal, path
+        if path is None or path.goal != goal or any(self.changed.get(chunk, 0) > path.made for chunk in path.chunks):
+            if self.builds_left <= 0:
+                return start, path
+            self.builds_left -= 1
+            tiles = self.find_path(start, goal)
+            if tiles is None:
+                path = Path(goal, None, self.generation, ())
+            else:
+                path = Path(goal, smooth(tiles)[1:], self.generation, {self.chunk_of(tile) for tile in tiles})
+        waypoints = path.waypoints
+        if waypoints is None:
+            return None, path
+        while len(waypoints) > 1 and waypoints[0] == start:
+            waypoints.pop(0)
+        return waypoints[0] if waypoints else goal, path
+
+    # === FLOW FIELDS ===
+    def flow_field(self, goal):
+        """The flow field toward a goal tile, built on first use and kept in an LRU."""
+        field = self.flow_fields.get(goal)
+        if field is not None:
+            self.flow_fields.move_to_end(goal)
+            return field
+        self.flow_builds += 1
+        size = FLOW_RADIUS * 2 + 1
+        x0 = goal[0] - FLOW_RADIUS
+        y0 = goal[1] - FLOW_RADIUS
+        area = self.area((x0, y0, x0 + size, y0 + size))
+        directions = bytearray([NO_DIRECTION]) * (size * size)
+        # Steps cost the same both ways, so the way back to the goal is the way toward it
+        if self.walkable(*goal):
+            self.distances(goal, area, directions)
+        chunks = {(cx, cy)
+                  for cy in range(y0 // self.chunk_size, (y0 + size - 1) // self.chunk_size + 1)
+                  for cx in range(x0 // self.chunk_size, (x0 + size - 1) // self.chunk_size + 1)}
+        field = self.flow_fields[goal] = FlowField(goal, x0, y0, size, directions, chunks)
+        if len(self.flow_fields) > MAX_FLOW_FIELDS:
+            self.flow_fields.popitem(last=False)
+        return field
+
+    def flow_step(self, start, goal):
+        """Tile to head for next from start toward goal by the shared flow field: goal
+        itself if start is outside the field or has no route in it, start if the field
+        isn't built yet and this tick's builds are used up, None if goal is blocked."""
+        if start == goal or self.world.chunk(*self.chunk_of(goal), False) is None:
+            return goal
+        if not self.walkable(*goal):
+            return None
+        if goal not in self.flow_fields:
+            if self.builds_left <= 0:
+                return start
+            self.builds_left -= 1
+        step = self.flow_field(goal).step(*start)
+        return goal if step is None else step
@@ -0,0 +1,96 @@
+import json
+import time
+from collections import deque
+import pygame
+
+PROFILE_FRAMES = 600  # frames kept in the ring buffer (10s at 60 FPS)
+
+class FrameProfiler:
+    """Records the wall time of named phases for each of the last `capacity` frames.
+
+    A frame is split into consecutive phases: phase(name) ends the running phase and
+    starts the next one, so marks can be dropped between the sections of a long loop
+    body without restructuring it. Marks outside begin_frame()/end_frame() are ignored.
+    """
+    def __init__(self, capacity=PROFILE_FRAMES):
+        self.frames = deque(maxlen=capacity)  # [(frame_start, frame_end, [(name, start, end), ...])]
+        self.phase_order = []  # phase names in the order they were first seen
+        self.frame_start = None
+        self.phases = None
+        self.phase_name = None
+        self.phase_start = 0.0
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.phases = []
+        self.phase_name = None
+
+    def phase(self, name):
+        if self.phases is None:
+            return
+        now = time.perf_counter()
+        if self.phase_name is not None:
+            self.phases.append((self.phase_name, self.phase_start, now))
+        if name not in self.phase_order:
+            self.phase_order.append(name)
+        self.phase_name = name
+        self.phase_start = now
+
+    def end_frame(self):
+        if self.phases is None:
+            return
+        now = time.perf_counter()
+        if self.phase_name is not None:
+            self.phases.append((self.phase_name, self.phase_start, now))
+        self.frames.append((self.frame_start, now, self.phases))
+        self.phases = None
+        self.phase_name = None
+
+    def stats(self):
+        """{phase: (last_ms, p95_ms, max_ms)} over the buffered frames, plus "frame" for the total."""
+        durations = {name: [] for name in self.phase_order}
+        durations["frame"] = []
+        last = {}
+        for frame_start, frame_end, phases in self.frames:
+            frame_totals = {}
+            for name, start, end in phases:
+                frame_totals[name] = frame_totals.get(name, 0.0) + end - start
+            frame_totals["frame"] = frame_end - frame_start
+            for name, total in frame_totals.items():
+                durations[name].append(total)
+            last = frame_totals
+        result = {}
+        for name, values in durations.items():
+            if not values:
+                continue
+            values.sort()
+            p95 = values[int(0.95 * (len(values) - 1))]
+            result[name] = (last.get(name, 0.0) * 1000, p95 * 1000, values[-1] * 1000)
+        return result
+
+    def draw_overlay(self, surface, font, pos=(10, 10)):
+        """Draw a table of current/p95/max milliseconds per phase."""
+        rows = [("phase", "cur", "p95", "max")]
+        for name, (current, p95, peak) in self.stats().items():
+            rows.append((name, f"{current:.2f}", f"{p95:.2f}", f"{peak:.2f}"))
+        line_height = font.get_linesize()
+        columns = (0, 170, 240, 310)
+        panel = pygame.Surface((columns[-1] + 80, line_height * len(rows) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            for x, text in zip(columns, row):
+                panel.blit(font.render(text, True, (255, 255, 255)), (5 + x, 5 + i * line_height))
+        surface.blit(panel, pos)
+
+    def dump_chrome_trace(self, path):
+        """Write the buffered frames in Chrome trace format (chrome://tracing, Perfetto)."""
+        events = []
+        for index, (frame_start, frame_end, phases) in enumerate(self.frames):
+            events.append({"name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                           "ts": frame_start * 1e6, "dur": (frame_end - frame_start) * 1e6,
+                           "args": {"index": index}})
+            for name, start, end in phases:
+                events.append({"name": name, "ph": "X", "pid": 0, "tid": 0,
+                               "ts": start * 1e6, "dur": (end - start) * 1e6})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
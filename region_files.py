@@ -0,0 +1,191 @@
+"""Chunk records saved to region files, so unloaded chunks are read back instead of
+regenerated. main.py clears the files at every start, because the rest of the world
+(player, items carried, seed) isn't saved between runs yet: revisited terrain is only
+kept within one session.
+"""
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+REGION_MAGIC = b"SCRG"
+REGION_VERSION = 1
+REGION_SIZE = 32  # chunks per region side
+REGION_HEADER = "<4sII"  # magic, version, region size
+REGION_SLOT = "<QI"  # offset and length of a chunk's latest record, length 0 if not stored
+MAX_OPEN_REGIONS = 16
+COMPACT_MIN_BYTES = 1 << 20  # dead bytes a region file may hold before it's worth compacting
+
+def pack_record(blobs):
+    """Join byte strings into one record, each prefixed with its length."""
+    parts = []
+    for blob in blobs:
+        parts.append(struct.pack("<I", len(blob)))
+        parts.append(bytes(blob))
+    return b"".join(parts)
+
+def unpack_record(data):
+    """The byte strings of a record written by pack_record(), as memoryviews into data."""
+    view = memoryview(data)
+    blobs = []
+    offset = 0
+    while offset < len(view):
+        length, = struct.unpack_from("<I", view, offset)
+        offset += 4
+        blobs.append(view[offset:offset + length])
+        offset += length
+    return blobs
+
+def pack_bits(flags):
+    """A sequence of booleans as a bitset, 8 per byte, first flag in the lowest bit."""
+    bits = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+def unpack_bits(bits, count):
+    return [bool(bits[i >> 3] & (1 << (i & 7))) for i in range(count)]
+
+class Region:
+    """One open region file: its offset table and a read-only map of the file."""
+    def __init__(self, path):
+        self.path = path
+        slots = REGION_SIZE * REGION_SIZE
+        self.table_offset = struct.calcsize(REGION_HEADER)
+        self.slot_size = struct.calcsize(REGION_SLOT)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(struct.pack(REGION_HEADER, REGION_MAGIC, REGION_VERSION, REGION_SIZE))
+                f.write(bytes(self.slot_size * slots))
+        self.file = open(path, "r+b")
+        self.mm = None
+        self.remap()
+        magic, version, size = struct.unpack_from(REGION_HEADER, self.mm, 0)
+        if magic != REGION_MAGIC or version != REGION_VERSION or size != REGION_SIZE:
+            self.close()
+            raise ValueError(f"stale region file {path}")
+        self.slots = [struct.unpack_from(REGION_SLOT, self.mm, self.table_offset + i * self.slot_size)
+                      for i in range(slots)]
+        self.data_start = self.table_offset + self.slot_size * slots
+        self.size = len(self.mm)
+        self.live = sum(length for _, length in self.slots)  # bytes held by the latest records
+
+    def remap(self):
+        if self.mm is not None:
+            self.mm.close()
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, index):
+        offset, length = self.slots[index]
+        if length == 0:
+            return None
+        if offset + length > len(self.mm):
+            self.remap()  # appended to since it was mapped
+        return self.mm[offset:offset + length]
+
+    def write(self, index, data):
+        _, length = self.slots[index]
+        offset = self.size
+        # The record goes in first and the slot is repointed after, so a crash part way
+        # through leaves the chunk's old record in place
+        self.file.seek(offset)
+        self.file.write(data)
+        self.file.flush()
+        self.file.seek(self.table_offset + index * self.slot_size)
+        self.file.write(struct.pack(REGION_SLOT, offset, len(data)))
+        self.file.flush()
+        self.size += len(data)
+        self.slots[index] = (offset, len(data))
+        self.live += len(data) - length
+        dead = self.size - self.data_start - self.live
+        if dead > COMPACT_MIN_BYTES and dead > self.live:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with only the latest record of each chunk, dropping the space
+        left by older ones."""
+        records = [self.read(index) for index in range(len(self.slots))]
+        slots = []
+        offset = self.data_start
+        for record in records:
+            length = 0 if record is None else len(record)
+            slots.append((offset if length else 0, length))
+            offset += length
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(struct.pack(REGION_HEADER, REGION_MAGIC, REGION_VERSION, REGION_SIZE))
+            f.write(b"".join(struct.pack(REGION_SLOT, *slot) for slot in slots))
+            for record in records:
+                if record is not None:
+                    f.write(record)
+        # The old file has to be closed before it can be replaced on Windows
+        self.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "r+b")
+        self.remap()
+        self.slots = slots
+        self.size = offset
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+        self.file.close()
+        self.mm = None
+
+class RegionFiles:
+    """Chunk records stored on disk, grouped into files of REGION_SIZE x REGION_SIZE chunks.
+
+    Each file starts with an offset table holding a slot per chunk. Records are only
+    appended: saving a chunk again appends the new record, then repoints its slot.
+    Once the space left by old records is more than COMPACT_MIN_BYTES and more than
+    the live records take, compact() rewrites the file to a temporary one with only
+    the live records and swaps it in. Reads slice a memory map of the file, which costs microseconds,
+    much less than generating the chunk again. The most recently used MAX_OPEN_REGIONS
+    files are kept open.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.regions = OrderedDict()  # {(region_x, region_y): Region}
+
+    def region(self, cx, cy, create):
+        key = (cx // REGION_SIZE, cy // REGION_SIZE)
+        region = self.regions.get(key)
+        if region is not None:
+            self.regions.move_to_end(key)
+            return region
+        path = os.path.join(self.directory, f"r.{key[0]}.{key[1]}.bin")
+        if not create and not os.path.exists(path):
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        region = self.regions[key] = Region(path)
+        if len(self.regions) > MAX_OPEN_REGIONS:
+            _, oldest = self.regions.popitem(last=False)
+            oldest.close()
+        return region
+
+    def slot(self, cx, cy):
+        return (cy % REGION_SIZE) * REGION_SIZE + cx % REGION_SIZE
+
+    def read(self, cx, cy):
+        """The chunk's latest record, or None if it was never saved."""
+        region = self.region(cx, cy, False)
+        if region is None:
+            return None
+        return region.read(self.slot(cx, cy))
+
+    def write(self, cx, cy, data):
+        self.region(cx, cy, True).write(self.slot(cx, cy), data)
+
+    def close(self):
+        for region in self.regions.values():
+            region.close()
+        self.regions.clear()
+
+    def clear(self):
+        """Close and delete every region file."""
+        self.close()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith("r.") and name.endswith(".bin"):
+                    os.remove(os.path.join(self.directory, name))
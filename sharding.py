@@ -0,0 +1,636 @@
+import itertools
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import time
+import traceback
+from multiprocessing import shared_memory
+import entities
+import world_events
+
+SHARD_CHUNKS = 2  # shard side in chunks
+BUFFER_BYTES = 1 << 20  # starting size of an exchange buffer, grown when a message doesn't fit
+# Workers are started with these set: they import the game without opening a window or
+# audio device, and can tell from WORKER_FLAG that they're workers
+WORKER_FLAG = "SCIENCERVIVAL_SHARD_WORKER"
+WORKER_ENV = {"SDL_VIDEODRIVER": "dummy", "SDL_AUDIODRIVER": "dummy", WORKER_FLAG: "1"}
+
+# Animal fields a step changes, sent back for every animal every step
+ANIMAL_STEP_FIELDS = ("x", "y", "health", "hunger", "state", "state_timer", "patience", "attack_timer",
+                      "recently_damaged", "frame", "frame_timer", "texture_angle")
+# Plant and item fields drawn or interacted with, sent back when a step changes them.
+# The rest (growth and conversion timers) only with ShardHost.fetch().
+SHOWN_FIELDS = {"plant": ("stage", "health"), "item": ("type", "dur")}
+
+def in_worker():
+    """True in a shard worker process."""
+    return os.environ.get(WORKER_FLAG) == "1"
+
+class ShardMap:
+    """Splits the world into square shards of SHARD_CHUNKS x SHARD_CHUNKS chunks, each
+    owned by one of `workers` workers.
+
+    An entity is owned by the worker of the shard it stands in. Workers also see the
+    entities within `halo` pixels of their shards (the boundary entities of the shards
+    around them), so animals near an edge still find food and bump into neighbours.
+    """
+    def __init__(self, workers, chunk_size, tile_size, halo, shard_chunks=SHARD_CHUNKS):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.shard_chunks = shard_chunks
+        self.shard_pixels = shard_chunks * chunk_size * tile_size
+        self.halo = halo
+        self.halo_chunks = math.ceil(halo / (chunk_size * tile_size))
+
+    def worker_of(self, shard):
+        # Spread neighbouring shards over different workers
+        return (shard[0] + shard[1] * 3) % self.workers
+
+    def owner(self, x, y):
+        size = self.shard_pixels
+        return self.worker_of((int(x // size), int(y // size)))
+
+    def chunk_owner(self, chunk):
+        return self.worker_of((chunk[0] // self.shard_chunks, chunk[1] // self.shard_chunks))
+
+    def viewers(self, x, y):
+        """Workers with a shard within halo of a point, the owner included."""
+        size = self.shard_pixels
+        halo = self.halo
+        sx = int(x // size)
+        sy = int(y // size)
+        workers = {self.worker_of((sx, sy))}
+        # Neighbouring shards within halo along each axis, with the gap to them
+        near_x = [(dx, gap) for dx, gap in ((-1, x - sx * size), (1, (sx + 1) * size - x)) if gap <= halo]
+        near_y = [(dy, gap) for dy, gap in ((-1, y - sy * size), (1, (sy + 1) * size - y)) if gap <= halo]
+        for dx, _ in near_x:
+            workers.add(self.worker_of((sx + dx, sy)))
+        for dy, gap_y in near_y:
+            workers.add(self.worker_of((sx, sy + dy)))
+            for dx, gap_x in near_x:
+                if gap_x * gap_x + gap_y * gap_y <= halo * halo:
+                    workers.add(self.worker_of((sx + dx, sy + dy)))
+        return workers
+
+    def chunk_viewers(self, chunk):
+        """Workers that need a chunk's tiles: those with a shard within halo chunks of it."""
+        size = self.shard_chunks
+        halo = self.halo_chunks
+        return {self.worker_of((sx, sy))
+                for sy in range((chunk[1] - halo) // size, (chunk[1] + halo) // size + 1)
+                for sx in range((chunk[0] - halo) // size, (chunk[0] + halo) // size + 1)}
+
+class ExchangeBuffer:
+    """A shared memory block one side pickles messages into. It's replaced by a bigger
+    one when a message doesn't fit; the reader attaches by name, so it notices."""
+    def __init__(self):
+        self.shm = shared_memory.SharedMemory(create=True, size=BUFFER_BYTES)
+
+    def write(self, message):
+        """Pickle message into the block, returns (block name, length) for the reader."""
+        data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.shm.size:
+            self.close()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(len(data) * 2, BUFFER_BYTES))
+        self.shm.buf[:len(data)] = data
+        return self.shm.name, len(data)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+class BufferReader:
+    """Reads messages from the other side's ExchangeBuffer."""
+    def __init__(self):
+        self.shm = None
+
+    def read(self, name, length):
+        if self.shm is None or self.shm.name != name:
+            self.close()
+            # Spawned workers share the game process's resource tracker, which already
+            # knows the block from its writer; the writer unlinks it
+            self.shm = shared_memory.SharedMemory(name=name)
+        with self.shm.buf[:length] as view:
+            return pickle.loads(view)
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+def worker_loop(conn, run):
+    inbox = BufferReader()
+    outbox = ExchangeBuffer()
+    try:
+        while True:
+            header = conn.recv()
+            if header is None:
+                break
+            try:
+                header = outbox.write(("ok", run(inbox.read(*header))))
+            except Exception:
+                header = outbox.write(("error", traceback.format_exc()))
+            conn.send(header)
+    finally:
+        inbox.close()
+        outbox.close()
+
+class ShardPool:
+    """Worker processes, each stepping its share of the world with run(task) -> result.
+
+    Workers are spawned, not forked: a fork would copy this process's SDL state (window,
+    audio, threads), which isn't safe, and fork doesn't exist on Windows. A spawned worker
+    imports run's module itself, with WORKER_ENV set. Tasks and results travel through
+    shared memory: each side pickles into its own block and only (block name, length)
+    goes over a pipe.
+    """
+    def __init__(self, workers, run):
+        context = multiprocessing.get_context("spawn")
+        self.conns = []
+        self.processes = []
+        saved = {key: os.environ.get(key) for key in WORKER_ENV}
+        os.environ.update(WORKER_ENV)
+        try:
+            for _ in range(workers):
+                parent_conn, child_conn = context.Pipe()
+                process = context.Process(target=worker_loop, args=(child_conn, run), daemon=True)
+                process.start()
+                child_conn.close()
+                self.conns.append(parent_conn)
+                self.processes.append(process)
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    del os.environ[key]
+                else:
+                    os.environ[key] = value
+        self.outboxes = [ExchangeBuffer() for _ in range(workers)]
+        self.inboxes = [BufferReader() for _ in range(workers)]
+
+    def send(self, worker, task):
+        self.conns[worker].send(self.outboxes[worker].write(task))
+
+    def receive(self, worker):
+        status, result = self.inboxes[worker].read(*self.conns[worker].recv())
+        if status == "error":
+            raise RuntimeError(f"shard worker failed:\n{result}")
+        return result
+
+    def map(self, tasks):
+        """Run one task per worker at once, returns their results in order."""
+        for worker, task in enumerate(tasks):
+            self.send(worker, task)
+        return [self.receive(worker) for worker in range(len(tasks))]
+
+    def call(self, worker, task):
+        """Run a task on one worker, returns its result."""
+        self.send(worker, task)
+        return self.receive(worker)
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass  # already gone
+        for process in self.processes:
+            process.join(timeout=5)
+        for buffer in self.outboxes + self.inboxes:
+            buffer.close()
+        self.conns = []
+        self.processes = []
+        self.outboxes = []
+        self.inboxes = []
+
+# === SHARD PROTOCOL ===
+# Entities live in the worker that owns them; the game process keeps a mirror of each for
+# input, rendering and saving. A step sends each worker only what changed in the game
+# process (entities added, removed or edited, animals walking into its shards) and its
+# halo: copies of the entities of neighbouring shards its animals can see. Workers send
+# back their animals' new state and the plants and items that visibly changed.
+#
+# Both sides take the game module, and use its entity collections (animals, plants,
+# items), WORLD, WORLD_EVENTS, PATHFINDERS, CHUNKS, sim_time, entity_state(),
+# item_state(), restore_item(), add_entity(), remove_entity(), chunk_of() and the
+# update_animals/plants/items() steps.
+
+def entity_state(game, entity):
+    return game.item_state(entity) if entity.entity == "item" else game.entity_state(entity)
+
+def restore_entity(game, kind, sid, state):
+    """The entity entity_state() was taken from, with its sid."""
+    if kind == "item":
+        entity = game.restore_item(state)
+    elif kind == "plant":
+        entity = entities.Plant(**state)
+    else:
+        entity = entities.Animal(**state)
+    entity.sid = sid
+    return entity
+
+def set_entity_fields(entity, fields):
+    """Set an entity's fields from (name, value) pairs, None unsets a field."""
+    for key, value in fields:
+        if value is not None:
+            setattr(entity, key, value)
+        elif hasattr(entity, key):
+            delattr(entity, key)
+
+def encode_target(target):
+    """An animal target with the entity it points at replaced by its sid."""
+    if target is None or target["type"] == "position":
+        return target
+    return {"type": target["type"], "ref": getattr(target["ref"], "sid", None)}
+
+def new_outbox():
+    return {"adds": [], "replicas": [], "removes": [], "edits": []}
+
+def shown_state(entity):
+    """A plant's or item's SHOWN_FIELDS values."""
+    if entity.entity == "plant":
+        return entity.stage, entity.health
+    return entity.type, getattr(entity, "dur", None)
+
+class ShardHost:
+    """The game process's side: steps animals, plants and items on `workers` worker
+    processes, each running run(task) (ShardWorker.run). Raises OSError or EOFError if
+    the workers don't start."""
+    def __init__(self, game, workers, halo, run):
+        self.game = game
+        self.map = ShardMap(workers, game.CHUNK_SIZE, game.TILE_SIZE, halo)
+        self.pool = ShardPool(workers, run)
+        try:
+            self.pool.map([{"kind": "start", "worker": worker, "workers": workers, "halo": halo,
+                            "seed": random.getrandbits(32)} for worker in range(workers)])
+        except BaseException:
+            self.pool.close()
+            raise
+        self.collections = {"animal": game.animals, "plant": game.plants, "item": game.items}
+        self.sent_chunks = [{} for _ in range(workers)]  # per worker: {chunk: version of the chunk it was sent}
+        self.chunk_versions = {}  # {chunk: version}, changes whenever the chunk is loaded
+        self.last_chunk_version = 0
+        self.tile_edits = []  # tiles changed here since the last step: (chunk, tile_x, tile_y, tile id)
+        self.step_cpu = []  # CPU seconds each worker spent on the last step
+        self.ids = itertools.count(0, workers + 1)  # sids for new entities, every process counts in its own residue class
+        self.entities = {}  # {sid: entity}, every entity the workers step
+        self.owners = {}  # {sid: worker stepping it}
+        self.replicas = {}  # {sid: workers with a halo copy}, plants and items (animals' halos are sent every step)
+        self.outboxes = [new_outbox() for _ in range(workers)]  # per worker: changes made here, sent with its next step
+        self.subscriptions = [
+            (world_events.CHUNK_LOADED, self.chunk_loaded),
+            (world_events.CHUNK_UNLOADED, self.chunk_unloaded),
+            (world_events.TILE_CHANGED, self.queue_tile),
+            (world_events.ENTITY_ADDED, self.track),
+            (world_events.ENTITY_REMOVED, self.untrack),
+            (world_events.ENTITY_CHANGED, self.send_change),
+        ]
+        for event, handler in self.subscriptions:
+            game.WORLD_EVENTS.subscribe(event, handler)
+        for collection in self.collections.values():
+            for entity in collection:
+                self.track(None, entity)
+
+    def close(self):
+        """Bring every entity up to date and stop the workers."""
+        try:
+            self.fetch()
+        except (OSError, EOFError):
+            pass  # the workers are gone already (interrupted), keep what they last sent back
+        self.pool.close()
+        for event, handler in self.subscriptions:
+            self.game.WORLD_EVENTS.unsubscribe(event, handler)
+
+    def chunk_loaded(self, chunk, *args):
+        self.last_chunk_version += 1
+        self.chunk_versions[chunk] = self.last_chunk_version
+
+    def chunk_unloaded(self, chunk):
+        self.chunk_versions.pop(chunk, None)
+
+    def queue_tile(self, chunk, tile_x, tile_y, old_id, new_id):
+        self.tile_edits.append((chunk, tile_x, tile_y, new_id))
+
+    def queue_edit(self, sid, fields):
+        for worker in {self.owners[sid]} | self.replicas.get(sid, set()):
+            self.outboxes[worker]["edits"].append((sid, fields))
+
+    def track(self, chunk, entity):
+        """ENTITY_ADDED: hand an animal, plant or item added here to the worker owning its place,
+        and copy plants and items to the workers with it in their halo."""
+        if entity.entity not in self.collections:
+            return
+        sid = getattr(entity, "sid", None)
+        if self.entities.get(sid) is not entity:
+            sid = entity.sid = next(self.ids)
+            self.entities[sid] = entity
+            owner = self.owners[sid] = self.map.owner(entity.x, entity.y)
+            self.outboxes[owner]["adds"].append((entity.entity, sid, entity_state(self.game, entity), None))
+        if entity.entity != "animal":
+            viewers = self.map.viewers(entity.x, entity.y) - {self.owners[sid]}
+            if viewers:
+                self.replicas[sid] = viewers
+                state = entity_state(self.game, entity)
+                for worker in viewers:
+                    self.outboxes[worker]["replicas"].append((entity.entity, sid, state))
+
+    def untrack(self, chunk, entity):
+        """ENTITY_REMOVED: drop the entity from the workers too."""
+        sid = getattr(entity, "sid", None)
+        if sid is None or self.entities.get(sid) is not entity:
+            return
+        del self.entities[sid]
+        for worker in {self.owners.pop(sid)} | self.replicas.pop(sid, set()):
+            self.outboxes[worker]["removes"].append(sid)
+
+    def send_change(self, chunk, entity, fields):
+        """ENTITY_CHANGED: pass fields set here on to the workers."""
+        sid = getattr(entity, "sid", None)
+        if sid is not None and self.entities.get(sid) is entity:
+            self.queue_edit(sid, [(key, entity.get(key)) for key in fields])
+
+    def fetch(self, chunks=None):
+        """Bring the plants and items of chunks (default: all) up to date from the workers stepping
+        them. Steps only send back SHOWN_FIELDS, this gets the rest, e.g. before saving them."""
+        if chunks is None:
+            results = self.pool.map([{"kind": "fetch", "chunks": None}] * self.map.workers)
+        else:
+            by_owner = {}
+            for chunk in chunks:
+                by_owner.setdefault(self.map.chunk_owner(chunk), []).append(chunk)
+            results = [self.pool.call(worker, {"kind": "fetch", "chunks": owned})
+                       for worker, owned in by_owner.items()]
+        for states in results:
+            for kind, sid, state in states:
+                entity = self.entities.get(sid)
+                if entity is None:
+                    continue
+                fetched = restore_entity(self.game, kind, sid, state)
+                for key in entity.keys():
+                    if key not in fetched:
+                        delattr(entity, key)
+                set_entity_fields(entity, ((key, fetched[key]) for key in fetched.keys()))
+        # Edits made here since the last step haven't reached the workers yet
+        for outbox in self.outboxes:
+            for sid, fields in outbox["edits"]:
+                if sid in self.entities:
+                    set_entity_fields(self.entities[sid], fields)
+
+    def step(self, dt):
+        """update_animals, update_plants and update_items for one step, on the workers."""
+        game = self.game
+        world = game.WORLD
+        workers = self.map.workers
+        # Animals move every step, so their halo copies are sent every step
+        halo_animals = [[] for _ in range(workers)]
+        for animal in game.animals:
+            owner = self.owners[animal.sid]
+            for worker in self.map.viewers(animal.x, animal.y):
+                if worker != owner:
+                    halo_animals[worker].append((animal.sid, animal.type, animal.x, animal.y, animal.health))
+
+        # Workers get the chunks around their shards when they're loaded, then the tiles that change
+        wanted = [set() for _ in range(workers)]
+        for chunk in world.chunks:
+            for worker in self.map.chunk_viewers(chunk):
+                wanted[worker].add(chunk)
+        tasks = []
+        for worker in range(workers):
+            sent_chunks = self.sent_chunks[worker]
+            dropped = [chunk for chunk in sent_chunks if chunk not in wanted[worker]]
+            for chunk in dropped:
+                del sent_chunks[chunk]
+            chunks = {}
+            for chunk in wanted[worker]:
+                version = self.chunk_versions.get(chunk, 0)
+                if sent_chunks.get(chunk) != version:
+                    chunks[chunk] = bytes(world.chunks[chunk])
+                    sent_chunks[chunk] = version
+            tiles = [(tile_x, tile_y, tile_id) for chunk, tile_x, tile_y, tile_id in self.tile_edits
+                     if chunk in sent_chunks and chunk not in chunks]
+            task = {"kind": "step", "dt": dt, "time": game.sim_time, "chunks": chunks, "dropped": dropped,
+                    "tiles": tiles, "halo_animals": halo_animals[worker]}
+            task.update(self.outboxes[worker])
+            self.outboxes[worker] = new_outbox()
+            tasks.append(task)
+        del self.tile_edits[:]
+        results = self.pool.map(tasks)
+        self.step_cpu = [result["cpu"] for result in results]
+
+        # Workers' own entities first, then what they did to their halo copies of others', then removals
+        for worker, result in enumerate(results):
+            for values in result["animals"]:
+                set_entity_fields(self.entities[values[0]], zip(ANIMAL_STEP_FIELDS, values[1:]))
+            for sid, target in result["emigrants"]:
+                animal = self.entities[sid]
+                owner = self.owners[sid] = self.map.owner(animal.x, animal.y)
+                self.outboxes[owner]["adds"].append(("animal", sid, entity_state(game, animal), target))
+            for sid, fields in result["changed"]:
+                set_entity_fields(self.entities[sid], fields)
+                for viewer in self.replicas.get(sid, ()):
+                    self.outboxes[viewer]["edits"].append((sid, fields))
+            for kind, sid, state in result["added"]:
+                entity = restore_entity(game, kind, sid, state)
+                self.entities[sid] = entity
+                owner = self.owners[sid] = self.map.owner(entity.x, entity.y)
+                if owner != worker:
+                    # Landed in another worker's shard
+                    self.outboxes[owner]["adds"].append((kind, sid, entity_state(game, entity), None))
+                game.add_entity(self.collections[kind], entity)
+        for result in results:
+            for sid, change, damaged in result["halo"]["animal"]:
+                animal = self.entities.get(sid)
+                if animal is not None:
+                    animal.health += change
+                    if damaged:
+                        animal.recently_damaged = True
+                    self.queue_edit(sid, [("health", animal.health), ("recently_damaged", animal.get("recently_damaged"))])
+            for sid, change in result["halo"]["plant"]:
+                plant = self.entities.get(sid)
+                if plant is not None:
+                    plant.health += change
+                    if plant.health <= 0:
+                        game.remove_entity(game.plants, plant)
+                    else:
+                        self.queue_edit(sid, [("health", plant.health)])
+            for sid, item_type in result["halo"]["item"]:
+                item = self.entities.get(sid)
+                if item is not None:
+                    item.type = item_type
+                    self.queue_edit(sid, [("type", item_type)])
+        for result in results:
+            for sid in result["removed"]:
+                entity = self.entities.get(sid)
+                if entity is not None:
+                    game.remove_entity(self.collections[entity.entity], entity)
+            for tile_x, tile_y, tile_id in result["tiles"]:
+                world.set(tile_x, tile_y, tile_id)
+
+class ShardWorker:
+    """A worker process's side: keeps the entities of its shards and steps them with the
+    game's own update functions. The game module is imported in the worker as well, but
+    the world it sets up on import is cleared, chunks and entities come with tasks."""
+    def __init__(self, game):
+        self.game = game
+        self.collections = {"animal": game.animals, "plant": game.plants, "item": game.items}
+        self.worker = None  # this worker's index
+        self.map = None
+        self.ids = None
+        self.resident = {kind: {} for kind in self.collections}  # {kind: {sid: entity}} it steps
+        self.halo = {kind: {} for kind in self.collections}  # {kind: {sid: entity}} halo copies
+        self.report = None  # entities the running step added and removed
+        self.tile_changes = []  # tiles changed during a step, sent back to be applied in the game process
+
+    def run(self, task):
+        """A task from ShardHost: "start", "step" or "fetch"."""
+        if task["kind"] == "step":
+            return self.step(task)
+        if task["kind"] == "fetch":
+            return self.fetch(task["chunks"])
+        self.start(task)
+
+    def start(self, task):
+        game = self.game
+        self.worker = task["worker"]
+        self.map = ShardMap(task["workers"], game.CHUNK_SIZE, game.TILE_SIZE, task["halo"])
+        self.ids = itertools.count(self.worker + 1, task["workers"] + 1)
+        random.seed(task["seed"])
+        game.WORLD.clear()
+        for finder in game.PATHFINDERS.values():
+            finder.clear()
+        for collection in self.collections.values():
+            del collection[:]
+        events = game.WORLD_EVENTS
+        events.unsubscribe(world_events.CHUNK_LOADED, game.CHUNKS.on_loaded)
+        events.subscribe(world_events.TILE_CHANGED, self.record_tile_change)
+        events.subscribe(world_events.ENTITY_ADDED, self.record_add)
+        events.subscribe(world_events.ENTITY_REMOVED, self.record_remove)
+
+    def fetch(self, chunks):
+        wanted = None if chunks is None else set(chunks)
+        return [(kind, sid, entity_state(self.game, entity)) for kind in SHOWN_FIELDS
+                for sid, entity in self.resident[kind].items()
+                if wanted is None or self.game.chunk_of(entity.x, entity.y) in wanted]
+
+    def record_tile_change(self, chunk, tile_x, tile_y, old_id, new_id):
+        self.tile_changes.append((tile_x, tile_y, new_id))
+
+    def record_add(self, chunk, entity):
+        """ENTITY_ADDED: an item the step spawned. It's kept if it's in this worker's shards."""
+        entity.sid = next(self.ids)
+        if self.map.owner(entity.x, entity.y) == self.worker:
+            self.resident[entity.entity][entity.sid] = entity
+        self.report["added"].append(entity)
+
+    def record_remove(self, chunk, entity):
+        if self.resident[entity.entity].pop(entity.sid, None) is None:
+            self.halo[entity.entity].pop(entity.sid, None)
+        self.report["removed"].append(entity.sid)
+
+    def find(self, kind, sid):
+        entity = self.resident[kind].get(sid)
+        return self.halo[kind].get(sid) if entity is None else entity
+
+    def step(self, task):
+        """Apply the changes a task brings, then step this worker's entities."""
+        game = self.game
+        world = game.WORLD
+        events = game.WORLD_EVENTS
+        start = time.process_time()
+        game.sim_time = task["time"]
+        for chunk in task["dropped"]:
+            if chunk in world.chunks:
+                world.unload(*chunk)
+                events.publish(world_events.CHUNK_UNLOADED, chunk)
+        for chunk, tiles in task["chunks"].items():
+            # Replaced tiles: drop anything derived from the old ones
+            if chunk in world.chunks:
+                events.publish(world_events.CHUNK_UNLOADED, chunk)
+            world.chunks[chunk] = bytearray(tiles)
+            world.forget_last()
+            events.publish(world_events.CHUNK_LOADED, chunk)
+        for tile_x, tile_y, tile_id in task["tiles"]:
+            world.set(tile_x, tile_y, tile_id)
+        del self.tile_changes[:]
+
+        resident = self.resident
+        halo = self.halo
+        targets = []
+        for kind, sid, state, target in task["adds"]:
+            entity = resident[kind][sid] = restore_entity(game, kind, sid, state)
+            if kind == "animal":
+                targets.append((entity, target))
+        for kind, sid, state in task["replicas"]:
+            halo[kind][sid] = restore_entity(game, kind, sid, state)
+        for sid in task["removes"]:
+            for group in (resident, halo):
+                for by_sid in group.values():
+                    by_sid.pop(sid, None)
+        for sid, fields in task["edits"]:
+            for kind in self.collections:
+                entity = self.find(kind, sid)
+                if entity is not None:
+                    set_entity_fields(entity, fields)
+                    break
+        halo_animals = {}
+        for sid, animal_type, x, y, health in task["halo_animals"]:
+            animal = halo["animal"].get(sid)
+            if animal is None:
+                animal = entities.Animal(type=animal_type, sid=sid)
+            animal.x = x
+            animal.y = y
+            animal.health = health
+            halo_animals[sid] = animal
+        halo["animal"] = halo_animals
+        for animal, target in targets:
+            # Animals walking in from another worker keep their target if this worker has it too
+            if target is not None and target["type"] != "position":
+                ref = self.find(target["type"], target["ref"])
+                target = None if ref is None else {"type": target["type"], "ref": ref}
+            animal.target = target
+
+        shown = {kind: {sid: shown_state(entity) for sid, entity in resident[kind].items()} for kind in SHOWN_FIELDS}
+        halo_health = {kind: {sid: entity.health for sid, entity in halo[kind].items()} for kind in ("animal", "plant")}
+        halo_types = {sid: item.type for sid, item in halo["item"].items()}
+        self.report = {"added": [], "removed": []}
+
+        dt = task["dt"]
+        game.animals[:] = list(resident["animal"].values()) + list(halo["animal"].values())
+        game.plants[:] = list(resident["plant"].values()) + list(halo["plant"].values())
+        game.items[:] = list(resident["item"].values()) + list(halo["item"].values())
+        game.update_animals(dt, list(resident["animal"].values()))
+        # Halo plants and items are stepped by their own worker
+        game.plants[:] = resident["plant"].values()
+        game.update_plants(dt)
+        game.items[:] = resident["item"].values()
+        game.update_items(dt)
+
+        report = self.report
+        result = {"animals": [], "emigrants": [], "changed": [], "removed": report["removed"],
+                  "tiles": list(self.tile_changes)}
+        for sid, animal in list(resident["animal"].items()):
+            result["animals"].append((sid,) + tuple(getattr(animal, key, None) for key in ANIMAL_STEP_FIELDS))
+            if self.map.owner(animal.x, animal.y) != self.worker:
+                # Walked out of this worker's shards, its new owner steps it from now on
+                del resident["animal"][sid]
+                result["emigrants"].append((sid, encode_target(animal.target)))
+        for kind, fields in SHOWN_FIELDS.items():
+            before = shown[kind]
+            for sid, entity in resident[kind].items():
+                values = shown_state(entity)
+                if sid in before and before[sid] != values:
+                    result["changed"].append((sid, list(zip(fields, values))))
+        # Added entities go back whole, with what the rest of the step did to them
+        result["added"] = [(entity.entity, entity.sid, entity_state(game, entity)) for entity in report["added"]
+                           if entity.sid not in result["removed"]]
+        result["halo"] = {
+            "animal": [(sid, animal.health - halo_health["animal"][sid], animal.get("recently_damaged", False))
+                       for sid, animal in halo["animal"].items() if animal.health != halo_health["animal"][sid]],
+            "plant": [(sid, plant.health - halo_health["plant"][sid])
+                      for sid, plant in halo["plant"].items() if plant.health != halo_health["plant"][sid]],
+            "item": [(sid, item.type) for sid, item in halo["item"].items() if item.type != halo_types[sid]],
+        }
+        self.report = None
+        result["cpu"] = time.process_time() - start
+        return result
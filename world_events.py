@@ -0,0 +1,47 @@
+TILE_CHANGED = "tile_changed"      # (chunk, tile_x, tile_y, old_id, new_id)
+ENTITY_ADDED = "entity_added"      # (chunk, entity)
+ENTITY_REMOVED = "entity_removed"  # (chunk, entity)
+ENTITY_MOVED = "entity_moved"      # (chunk, entity, old_chunk), only when it crosses into another chunk
+ENTITY_CHANGED = "entity_changed"  # (chunk, entity, fields), fields set in place outside the world step
+CHUNK_LOADED = "chunk_loaded"      # (chunk,)
+CHUNK_UNLOADED = "chunk_unloaded"  # (chunk,)
+
+class EventBus:
+    """Change notifications for world writes.
+
+    Anything that caches derived world state (renderers, spatial indexes, pathfinding,
+    persistence) subscribes to the changes it depends on instead of recomputing from
+    scratch. Every event's first argument is the (chunk_x, chunk_y) it happened in.
+    """
+    def __init__(self):
+        self.subscribers = {}  # {event: [callback, ...]}
+
+    def subscribe(self, event, callback):
+        self.subscribers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        self.subscribers[event].remove(callback)
+
+    def publish(self, event, *args):
+        for callback in self.subscribers.get(event, ()):
+            callback(*args)
+
+class DirtyChunks:
+    """Chunks with tile or entity changes since the last take(). Each consumer keeps its own."""
+    def __init__(self, bus):
+        self.chunks = set()
+        bus.subscribe(TILE_CHANGED, self.mark)
+        bus.subscribe(ENTITY_ADDED, self.mark)
+        bus.subscribe(ENTITY_REMOVED, self.mark)
+        bus.subscribe(ENTITY_MOVED, self.mark_moved)
+
+    def mark(self, chunk, *args):
+        self.chunks.add(chunk)
+
+    def mark_moved(self, chunk, entity, old_chunk):
+        self.chunks.add(chunk)
+        self.chunks.add(old_chunk)
+
+    def take(self):
+        chunks, self.chunks = self.chunks, set()
+        return chunks
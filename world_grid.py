@@ -0,0 +1,103 @@
+UNLOADED_TILE = 255  # tile id read for chunks that aren't loaded (when not loading them)
+
+class WorldGrid:
+    """Tile ids by world tile coordinates, over chunks stored as row-major bytearrays.
+
+    All tile reads and writes go through here so chunk/local index math lives in one
+    place: floor division and modulo, which map negative tiles to the right chunk.
+    The last chunk looked up is remembered, so runs of accesses to the same chunk skip
+    the dict lookup. Listeners added with add_listener() are called as
+    listener(tile_x, tile_y, old_id, new_id) whenever set() changes a tile, and those
+    added with add_load_listener() as listener(chunk_x, chunk_y) once a chunk that
+    was loaded on demand has been stored, so they can already read its tiles.
+    """
+    def __init__(self, chunks, chunk_size, generate):
+        self.chunks = chunks  # {(chunk_x, chunk_y): bytearray}, shared with the caller
+        self.chunk_size = chunk_size
+        self.generate = generate  # generate(chunk_x, chunk_y) -> bytearray
+        self.listeners = []
+        self.load_listeners = []
+        self.forget_last()
+
+    def forget_last(self):
+        self.last_cx = self.last_cy = None
+        self.last_chunk = None
+
+    def chunk(self, cx, cy, load=True):
+        """The chunk's tile ids, generated if needed (or None if not loaded and load is False)."""
+        if cx == self.last_cx and cy == self.last_cy:
+            return self.last_chunk
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            if not load:
+                return None
+            chunk = self.chunks[(cx, cy)] = self.generate(cx, cy)
+            for listener in self.load_listeners:
+                listener(cx, cy)
+        self.last_cx, self.last_cy, self.last_chunk = cx, cy, chunk
+        return chunk
+
+    def unload(self, cx, cy):
+        del self.chunks[(cx, cy)]
+        if cx == self.last_cx and cy == self.last_cy:
+            self.forget_last()
+
+    def clear(self):
+        self.chunks.clear()
+        self.forget_last()
+
+    def get(self, tile_x, tile_y, load=False):
+        """Tile id at a tile, or None if its chunk isn't loaded (and load is False)."""
+        size = self.chunk_size
+        chunk = self.chunk(tile_x // size, tile_y // size, load)
+        if chunk is None:
+            return None
+        return chunk[(tile_y % size) * size + tile_x % size]
+
+    def get_many(self, tiles, load=False):
+        """Tile ids for a sequence of (tile_x, tile_y), None where not loaded."""
+        get = self.get
+        return [get(tile_x, tile_y, load) for tile_x, tile_y in tiles]
+
+    def get_rect(self, tile_x, tile_y, width, height, load=True):
+        """Tile ids of a width x height rect as a row-major bytearray, copied a chunk row
+        at a time. Tiles of unloaded chunks read as UNLOADED_TILE when load is False."""
+        size = self.chunk_size
+        out = bytearray([UNLOADED_TILE]) * (width * height)
+        end_x = tile_x + width
+        end_y = tile_y + height
+        for cy in range(tile_y // size, (end_y - 1) // size + 1):
+            y0 = max(tile_y, cy * size)
+            y1 = min(end_y, (cy + 1) * size)
+            for cx in range(tile_x // size, (end_x - 1) // size + 1):
+                chunk = self.chunk(cx, cy, load)
+                if chunk is None:
+                    continue
+                x0 = max(tile_x, cx * size)
+                x1 = min(end_x, (cx + 1) * size)
+                for y in range(y0, y1):
+                    src = (y - cy * size) * size - cx * size
+                    dst = (y - tile_y) * width - tile_x
+                    out[dst + x0:dst + x1] = chunk[src + x0:src + x1]
+        return out
+
+    def set(self, tile_x, tile_y, tile_id):
+        """Change a tile (generating its chunk if needed) and notify listeners."""
+        size = self.chunk_size
+        chunk = self.chunk(tile_x // size, tile_y // size)
+        index = (tile_y % size) * size + tile_x % size
+        old_id = chunk[index]
+        if old_id == tile_id:
+            return
+        chunk[index] = tile_id
+        for listener in self.listeners:
+            listener(tile_x, tile_y, old_id, tile_id)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def add_load_listener(self, listener):
+        self.load_listeners.append(listener)